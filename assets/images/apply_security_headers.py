@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 """
 Script para aplicar cabeceras de seguridad a todos los archivos HTML
+Las páginas generadas desde templates/ ya reciben las meta tags del layout;
+el script de seguridad se añade a su plantilla y se renderizan de nuevo
 """
 
 import os
 import re
 import glob
 
+from generate_headers import render_security_meta
+from build_profiler import stage
+from site_refs import read_text, write_text
+from render_pages import TEMPLATES_DIR, PAGES_SUBDIR, list_template_pages, render_all
+
 def add_security_headers_to_html(file_path):
     """Añade cabeceras de seguridad meta tags a un archivo HTML"""
     
@@ -20,14 +27,8 @@ def add_security_headers_to_html(file_path):
     # Buscar la meta tag de viewport
     viewport_pattern = r'(<meta name="viewport"[^>]*>)'
     
-    security_headers = '''    
-    <!-- Security Headers -->
-    <meta http-equiv="X-Frame-Options" content="SAMEORIGIN">
-    <meta http-equiv="X-Content-Type-Options" content="nosniff">
-    <meta http-equiv="Referrer-Policy" content="strict-origin-when-cross-origin">
-    <meta http-equiv="Permissions-Policy" content="geolocation=(), microphone=(), camera=()">
-    <meta http-equiv="Content-Security-Policy" content="default-src 'self'; script-src 'self' 'unsafe-inline' https://code.jquery.com https://cdn.jsdelivr.net; style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data: https:; connect-src 'self';">
-    '''
+    # Meta tags generadas desde la política única (cache_policy.py)
+    security_headers = "    \n    <!-- Security Headers -->\n" + render_security_meta("    ") + "    "
     
     # Reemplazar añadiendo las cabeceras después del viewport
     new_content = re.sub(
@@ -94,6 +95,34 @@ def add_security_script_to_html(file_path):
     
     return False
 
+def add_security_script_to_template(template_path):
+    """Añade el script de seguridad al final del bloque head de una plantilla de página"""
+    
+    content = read_text(template_path)
+    
+    if 'security-headers.js' in content:
+        return False
+    
+    security_script = """
+    <!-- Security Headers Script -->
+    <script src="assets/js/security-headers.js" defer></script>
+"""
+    
+    # Cierre del bloque head: la plantilla no contiene </head> (está en el layout)
+    new_content = re.sub(
+        r'({%\s*block\s+head\s*%}.*?)({%\s*endblock\s*%})',
+        lambda m: m.group(1) + security_script + m.group(2),
+        content,
+        count=1,
+        flags=re.DOTALL
+    )
+    
+    if new_content != content:
+        write_text(template_path, new_content)
+        return True
+    
+    return False
+
 def apply_security_to_all_html():
     """Aplica cabeceras de seguridad a todos los archivos HTML"""
     
@@ -104,6 +133,7 @@ def apply_security_to_all_html():
     os.chdir("../..")
     
     html_files = glob.glob("*.html")
+    templated = set(list_template_pages())
     
     headers_added = 0
     scripts_added = 0
@@ -111,15 +141,29 @@ def apply_security_to_all_html():
     for html_file in html_files:
         print(f"\n📄 Procesando: {html_file}")
         
-        # Añadir meta tags de seguridad
-        if add_security_headers_to_html(html_file):
+        with stage("rewrite", "html", path=html_file) as s:
+            s.bytes_in = os.path.getsize(html_file)
+            if html_file in templated:
+                # Página generada: no se edita, se cambia su plantilla y se renderiza
+                headers_changed = False
+                template = os.path.join(TEMPLATES_DIR, PAGES_SUBDIR, html_file)
+                script_changed = add_security_script_to_template(template)
+                if script_changed:
+                    render_all([html_file])
+            else:
+                headers_changed = add_security_headers_to_html(html_file)
+                script_changed = add_security_script_to_html(html_file)
+            s.bytes_out = os.path.getsize(html_file)
+        
+        # Meta tags de seguridad
+        if headers_changed:
             print("  ✅ Meta tags de seguridad añadidas")
             headers_added += 1
         else:
             print("  ✓ Meta tags de seguridad ya presentes")
         
-        # Añadir script de seguridad
-        if add_security_script_to_html(html_file):
+        # Script de seguridad
+        if script_changed:
             print("  ✅ Script de seguridad añadido")
             scripts_added += 1
         else:
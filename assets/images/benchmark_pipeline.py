@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del pipeline de optimización
+Mide el coste de los scripts de build (codificación de imágenes, escaneo y
+parseo del sitio, generación de las páginas y compresión), guarda un historial
+en JSON y marca las regresiones que superan un umbral respecto a las corridas
+anteriores en la misma máquina. Las métricas medidas sobre el contenido real
+del sitio llevan una huella de ese contenido y solo se comparan con corridas
+sobre el mismo contenido: editar una página no cuenta como regresión
+"""
+
+import io
+import os
+import sys
+import json
+import gzip
+import glob
+import time
+import zlib
+import hashlib
+import platform
+import argparse
+import statistics
+from datetime import datetime, timezone
+
+from site_refs import (ROOT_DIR, iter_site_files, list_html_pages, read_text,
+                       extract_html_refs, extract_css_urls, to_site_path)
+from generate_headers import sync_security_meta, compute_cache_rules
+from render_pages import (PAGE_TRANSFORMS, FragmentCache, Renderer, list_template_pages,
+                          render_all, site_variables)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él se omiten los benchmarks de imágenes
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_HISTORY = os.path.join(ROOT_DIR, ".benchmarks", "history.json")
+
+# (formato PIL, calidades) a medir en la codificación
+ENCODE_MATRIX = [
+    ("WEBP", (75, 80, 85)),
+    ("JPEG", (75, 85)),
+    ("PNG", (None,)),
+]
+
+# Fixtures sintéticos deterministas (nombre, ancho, alto)
+SYNTHETIC_FIXTURES = [
+    ("synthetic-hero", 1920, 1080),
+    ("synthetic-card", 800, 600),
+]
+
+
+def time_call(func, repeat):
+    """Ejecuta func `repeat` veces y devuelve la mediana en segundos"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def corpus_digest(paths):
+    """Huella del contenido medido (rutas relativas a la raíz y sus bytes)"""
+    digest = hashlib.sha256()
+    for rel_path in sorted(paths):
+        digest.update(rel_path.encode("utf-8"))
+        with open(os.path.join(ROOT_DIR, rel_path), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def make_synthetic_image(width, height):
+    """Genera una imagen determinista con degradados y detalle (sin aleatoriedad)"""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    radial = Image.radial_gradient("L").resize((width, height))
+    mandel = Image.effect_mandelbrot((width, height), (-2.0, -1.2, 1.0, 1.2), 64)
+    return Image.merge("RGB", (gradient, radial, mandel))
+
+
+def load_image_fixtures(include_real=True):
+    """Devuelve [(nombre, imagen RGB)] sintéticos más los JPG reales de assets/images"""
+    fixtures = [(name, make_synthetic_image(w, h)) for name, w, h in SYNTHETIC_FIXTURES]
+    if include_real:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, "assets", "images", "*.jpg"))):
+            if os.path.getsize(path) == 0:
+                continue
+            with Image.open(path) as img:
+                img.load()
+                fixtures.append((os.path.basename(path), img.convert("RGB")))
+    return fixtures
+
+
+def bench_image_encode(repeat, include_real=True):
+    """Throughput de codificación (MP/s) por formato y calidad"""
+    results = {}
+    if Image is None:
+        print("  ⚠️ Pillow no instalado: se omiten los benchmarks de imágenes")
+        return results
+
+    fixtures = load_image_fixtures(include_real)
+    groups = {"synthetic": [f for f in fixtures if f[0].startswith("synthetic-")],
+              "real": [f for f in fixtures if not f[0].startswith("synthetic-")]}
+
+    real_paths = [p for p in sorted(glob.glob(os.path.join(ROOT_DIR, "assets", "images", "*.jpg")))
+                  if os.path.getsize(p) > 0]
+    real_corpus = corpus_digest(os.path.relpath(p, ROOT_DIR).replace(os.sep, "/") for p in real_paths)
+
+    for group, images in groups.items():
+        if not images:
+            continue
+        megapixels = sum(img.width * img.height for _, img in images) / 1e6
+        for fmt, qualities in ENCODE_MATRIX:
+            for quality in qualities:
+                options = {"optimize": True}
+                if quality is not None:
+                    options["quality"] = quality
+
+                def encode():
+                    for _, img in images:
+                        img.save(io.BytesIO(), fmt, **options)
+
+                elapsed = time_call(encode, repeat)
+                label = f"q{quality}" if quality is not None else "lossless"
+                results[f"image.encode.{fmt.lower()}.{label}.{group}"] = {
+                    "value": megapixels / elapsed, "unit": "MP/s", "better": "higher",
+                }
+                if group == "real":
+                    results[f"image.encode.{fmt.lower()}.{label}.{group}"]["corpus"] = real_corpus
+
+    # Decodificación + redimensionado como en optimize_image()
+    if include_real and real_paths:
+        def decode_resize():
+            for path in real_paths:
+                with Image.open(path) as img:
+                    if img.width > 1200:
+                        img.resize((1200, int(img.height * 1200 / img.width)), Image.Resampling.LANCZOS)
+                    else:
+                        img.load()
+
+        results["image.decode_resize.real"] = {
+            "value": time_call(decode_resize, repeat) * 1000, "unit": "ms", "better": "lower",
+            "corpus": real_corpus,
+        }
+    return results
+
+
+def scan_and_parse():
+    """Escaneo del árbol y extracción del grafo de referencias (HTML + CSS)"""
+    files = iter_site_files()
+    refs = set()
+    for page in list_html_pages():
+        for _, url, _ in extract_html_refs(read_text(os.path.join(ROOT_DIR, page))):
+            path = to_site_path(url, page)
+            if path:
+                refs.add(path)
+    for css in (f for f in files if f.endswith(".css")):
+        for url in extract_css_urls(read_text(os.path.join(ROOT_DIR, css))):
+            path = to_site_path(url, css)
+            if path:
+                refs.add(path)
+    return files, refs
+
+
+def bench_site(repeat):
+    """Tiempo de escaneo/parseo del sitio y de generación de las páginas"""
+    files, _ = scan_and_parse()
+    templated = set(list_template_pages())
+    pages = list_html_pages()
+    untemplated = {page: read_text(os.path.join(ROOT_DIR, page)) for page in pages if page not in templated}
+    site_vars = site_variables()
+    # Todo lo que sale de templates/ o de las páginas sin plantilla
+    corpus = corpus_digest(files + [p for p in iter_site_files(skip_dirs=("dist", ".cache"))
+                                    if p.startswith("templates/")])
+
+    def build_pages():
+        # Como en el build: las páginas con plantilla se renderizan (sin la caché de
+        # fragmentos en disco, para medir el motor) y el resto se transforma en su sitio
+        renderer = Renderer(cache=FragmentCache(persistent=False), site_vars=site_vars)
+        generated = [html for _, html, _ in render_all(sorted(templated & set(pages)), write=False,
+                                                         renderer=renderer).values()]
+        for page, content in untemplated.items():
+            html = sync_security_meta(content)
+            for _, transform in PAGE_TRANSFORMS:
+                html = transform(html, page)
+            generated.append(html)
+        return generated
+
+    html_bytes = sum(len(html.encode("utf-8")) for html in build_pages())
+
+    return {
+        "site.scan_parse": {"value": time_call(scan_and_parse, repeat) * 1000, "unit": "ms", "better": "lower",
+                            "corpus": corpus},
+        "site.cache_rules": {"value": time_call(lambda: compute_cache_rules(files), repeat) * 1000,
+                             "unit": "ms", "better": "lower", "corpus": corpus},
+        "html.build": {"value": html_bytes / 1e6 / time_call(build_pages, repeat), "unit": "MB/s",
+                       "better": "higher", "corpus": corpus},
+    }
+
+
+def bench_compression(repeat):
+    """Throughput de compresión de los recursos de texto (HTML/CSS/JS/SVG)"""
+    text_files = [f for f in iter_site_files() if f.endswith((".html", ".css", ".js", ".svg"))]
+    payloads = []
+    for rel_path in text_files:
+        with open(os.path.join(ROOT_DIR, rel_path), 'rb') as f:
+            payloads.append(f.read())
+    total_mb = sum(len(p) for p in payloads) / 1e6
+    corpus = corpus_digest(text_files)
+
+    codecs = {
+        "gzip6": lambda data: gzip.compress(data, compresslevel=6),
+        "gzip9": lambda data: gzip.compress(data, compresslevel=9),
+        "zlib1": lambda data: zlib.compress(data, 1),
+    }
+    if brotli is not None:
+        codecs["brotli11"] = lambda data: brotli.compress(data, quality=11)
+
+    results = {}
+    for name, codec in codecs.items():
+        elapsed = time_call(lambda: [codec(p) for p in payloads], repeat)
+        compressed = sum(len(codec(p)) for p in payloads) / 1e6
+        results[f"compress.{name}"] = {"value": total_mb / elapsed, "unit": "MB/s", "better": "higher",
+                                       "corpus": corpus}
+        # El ratio solo depende del contenido: se informa pero no se compara
+        results[f"compress.{name}.ratio"] = {"value": compressed / total_mb, "unit": "ratio", "better": "lower",
+                                             "gate": False}
+    return results
+
+
+def machine_key():
+    """Identifica la máquina/intérprete para comparar solo corridas equivalentes"""
+    return f"{platform.node()}|{platform.machine()}|py{platform.python_version()}"
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_regressions(history, current, threshold, window=5):
+    """
+    Compara las métricas actuales con la mediana de las últimas `window`
+    corridas de la misma máquina. Las métricas con huella de contenido
+    ("corpus") solo se comparan con corridas sobre el mismo contenido y las
+    marcadas con "gate": False no se comparan
+
+    Returns:
+        (lista de tuplas (métrica, base, actual, cambio en %) que empeoran más que
+         `threshold`, métricas sin comparar porque cambió el contenido medido)
+    """
+    previous = [run for run in history if run["machine"] == current["machine"]][-window:]
+    regressions, changed_corpus = [], []
+    for name, metric in current["metrics"].items():
+        if metric.get("gate", True) is False:
+            continue
+        runs = [run for run in previous if name in run["metrics"]]
+        baseline_values = [run["metrics"][name]["value"] for run in runs
+                           if run["metrics"][name].get("corpus") == metric.get("corpus")]
+        if not baseline_values:
+            if runs:
+                changed_corpus.append(name)
+            continue
+        baseline = statistics.median(baseline_values)
+        if baseline == 0:
+            continue
+        change = (metric["value"] - baseline) / baseline * 100
+        worse = -change if metric["better"] == "higher" else change
+        if worse > threshold:
+            regressions.append((name, baseline, metric["value"], change))
+    return regressions, changed_corpus
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline de optimización")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por benchmark (se usa la mediana)")
+    parser.add_argument("--only", choices=("images", "site", "compression"), action="append",
+                        help="Ejecutar solo algunos grupos (repetible)")
+    parser.add_argument("--synthetic-only", action="store_true", help="No usar las imágenes reales de assets/images")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="Archivo JSON de historial")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Umbral de regresión en %%")
+    parser.add_argument("--no-save", action="store_true", help="No añadir esta corrida al historial")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Salir con código 1 si hay regresiones")
+    args = parser.parse_args()
+
+    groups = args.only or ["images", "site", "compression"]
+
+    print("⏱️ BENCHMARKS DEL PIPELINE DE OPTIMIZACIÓN")
+    print("=" * 70)
+
+    metrics = {}
+    if "images" in groups:
+        print("🖼️ Codificación de imágenes...")
+        metrics.update(bench_image_encode(args.repeat, include_real=not args.synthetic_only))
+    if "site" in groups:
+        print("📄 Escaneo, parseo y reescritura de HTML...")
+        metrics.update(bench_site(args.repeat))
+    if "compression" in groups:
+        print("🗜️ Compresión de recursos de texto...")
+        metrics.update(bench_compression(args.repeat))
+
+    current = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_key(),
+        "repeat": args.repeat,
+        "metrics": metrics,
+    }
+
+    print(f"\n{'Métrica':<45}{'Valor':>14}  Unidad")
+    print("-" * 70)
+    for name, metric in sorted(metrics.items()):
+        print(f"{name:<45}{metric['value']:>14.3f}  {metric['unit']}")
+
+    history = load_history(args.history)
+    regressions, changed_corpus = find_regressions(history, current, args.threshold)
+
+    if regressions:
+        print(f"\n🚨 REGRESIONES (> {args.threshold:.0f}% peor que la mediana reciente):")
+        for name, baseline, value, change in regressions:
+            print(f"  ❌ {name}: {baseline:.3f} → {value:.3f} ({change:+.1f}%)")
+    elif any(run["machine"] == current["machine"] for run in history):
+        print(f"\n✅ Sin regresiones por encima del {args.threshold:.0f}%")
+    else:
+        print("\n📌 Primera corrida en esta máquina: se usará como referencia")
+    if changed_corpus:
+        print(f"📌 Sin comparar ({len(changed_corpus)}): el contenido medido cambió desde las corridas anteriores")
+
+    if not args.no_save:
+        history.append(current)
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+        print(f"💾 Historial: {args.history} ({len(history)} corridas)")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Script para construir el artefacto de despliegue en dist/
+Copia solo los recursos alcanzables desde el grafo de referencias de
+HTML/CSS/JS/sw.js (sin originales no usados, scripts .py, .map ni builds
+sin minificar), falla si algún recurso referenciado falta o está vacío y
+muestra el tamaño del despliegue antes y después
+"""
+
+import os
+import sys
+import shutil
+import argparse
+
+from site_refs import ROOT_DIR, UNPUBLISHED_DIRS, iter_site_files, list_html_pages
+from dependency_graph import build_graph
+
+DIST_DIR = os.path.join(ROOT_DIR, "dist")
+
+# Archivos que el hosting necesita aunque ninguna página los referencie
+HOST_FILES = ["CNAME", "robots.txt", "sitemap.xml", "_headers", ".htaccess", "sw.js"]
+
+# Texto: siempre se copia (las etapas posteriores pueden reescribirlo en dist/
+# sin tocar el original a través de un hard-link)
+TEXT_EXTENSIONS = (".html", ".css", ".js", ".svg", ".xml", ".txt", ".json")
+
+FICLONE = 0x40049409  # ioctl de Linux para reflinks (btrfs, XFS, ...)
+
+
+def reflink(src, dst):
+    """Clona un archivo con copy-on-write; lanza OSError si el sistema de archivos no lo admite"""
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+
+
+def place_file(src, dst, mode):
+    """
+    Copia un archivo a dist/ con el método más rápido disponible
+
+    Returns:
+        Método usado: "reflink", "hardlink" o "copy"
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if not src.endswith(TEXT_EXTENSIONS):
+        if mode in ("auto", "reflink"):
+            try:
+                reflink(src, dst)
+                return "reflink"
+            except (OSError, ImportError):
+                if mode == "reflink":
+                    raise
+        if mode in ("auto", "hardlink"):
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except OSError:
+                if mode == "hardlink":
+                    raise
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def collect_deploy_set(root=ROOT_DIR):
+    """
+    Calcula qué archivos se despliegan
+
+    Returns:
+        (archivos alcanzables existentes, referencias a archivos inexistentes,
+         referencias a archivos vacíos, grafo)
+    """
+    files = iter_site_files(root)
+    graph = build_graph(root, files)
+    roots = list_html_pages(root) + [f for f in HOST_FILES if os.path.isfile(os.path.join(root, f))]
+    reachable = graph.reachable(roots)
+
+    deploy, missing, empty = [], [], []
+    for rel_path in sorted(reachable):
+        full_path = os.path.join(root, rel_path)
+        referrers = sorted(graph.used_by.get(rel_path, ()))
+        if rel_path.split("/", 1)[0] in UNPUBLISHED_DIRS:
+            # Una página que enlaza a templates/ o .cache/ queda rota en el despliegue
+            missing.append((rel_path, referrers))
+        elif not os.path.isfile(full_path):
+            missing.append((rel_path, referrers))
+        elif os.path.getsize(full_path) == 0:
+            empty.append((rel_path, referrers))
+        else:
+            deploy.append(rel_path)
+    return deploy, missing, empty, graph
+
+
+def excluded_reason(rel_path, graph):
+    """Clasifica por qué un archivo queda fuera del despliegue"""
+    if rel_path.endswith(".py"):
+        return "scripts"
+    if rel_path.endswith(".map"):
+        return "source maps"
+    if rel_path in graph.outputs and any(o.endswith(".webp") for o in graph.outputs[rel_path]):
+        return "originales con WebP"
+    if rel_path.startswith("vendor/"):
+        return "vendor no usado"
+    return "sin referencias"
+
+
+def total_size(root, paths):
+    return sum(os.path.getsize(os.path.join(root, p)) for p in paths if os.path.isfile(os.path.join(root, p)))
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Construye dist/ solo con los recursos alcanzables")
+    parser.add_argument("--out", default=DIST_DIR, help="Directorio de salida")
+    parser.add_argument("--link", choices=("auto", "reflink", "hardlink", "copy"), default="auto",
+                        help="Método para binarios (auto: reflink → hard-link → copia)")
+    parser.add_argument("--allow-broken", action="store_true",
+                        help="Informar de referencias rotas o vacías sin fallar")
+    parser.add_argument("--list", action="store_true", help="Listar los archivos excluidos")
+    args = parser.parse_args()
+
+    print("📦 CONSTRUCCIÓN DEL ARTEFACTO DE DESPLIEGUE")
+    print("=" * 70)
+
+    deploy, missing, empty, graph = collect_deploy_set()
+
+    for rel_path, referrers in missing:
+        print(f"❌ Falta: {rel_path} (referenciado por {', '.join(referrers) or '?'})")
+    for rel_path, referrers in empty:
+        print(f"❌ Vacío (0 bytes): {rel_path} (referenciado por {', '.join(referrers) or '?'})")
+    if (missing or empty) and not args.allow_broken:
+        print(f"\n🛑 {len(missing)} referencias rotas y {len(empty)} archivos vacíos: no se genera dist/")
+        print("   Corrija las referencias o use --allow-broken para continuar")
+        sys.exit(1)
+
+    out_dir = os.path.abspath(args.out)
+    if out_dir == ROOT_DIR or ROOT_DIR.startswith(out_dir + os.sep):
+        print(f"❌ Directorio de salida no válido: {out_dir}")
+        sys.exit(2)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+
+    methods = {}
+    for rel_path in deploy:
+        method = place_file(os.path.join(ROOT_DIR, rel_path), os.path.join(out_dir, rel_path), args.link)
+        methods[method] = methods.get(method, 0) + 1
+
+    published = iter_site_files()
+    excluded = sorted(set(published) - set(deploy))
+    by_reason = {}
+    for rel_path in excluded:
+        reason = excluded_reason(rel_path, graph)
+        by_reason.setdefault(reason, []).append(rel_path)
+
+    before = total_size(ROOT_DIR, published)
+    after = total_size(ROOT_DIR, deploy)
+
+    print(f"\n📁 Salida: {out_dir}")
+    print(f"📄 Archivos: {len(published)} → {len(deploy)}")
+    print(f"🔗 Métodos: " + ", ".join(f"{m} {n}" for m, n in sorted(methods.items())))
+
+    print(f"\n🗑️ EXCLUIDOS:")
+    for reason, paths in sorted(by_reason.items()):
+        print(f"  • {reason}: {len(paths)} archivos, {total_size(ROOT_DIR, paths) / 1024:.1f} KB")
+        if args.list:
+            for rel_path in paths:
+                print(f"      {rel_path}")
+
+    print(f"\n🎯 TAMAÑO DEL DESPLIEGUE:")
+    print(f"Antes: {before / 1024:.1f} KB")
+    print(f"Después: {after / 1024:.1f} KB")
+    if before:
+        print(f"Reducción: {(before - after) / before * 100:.1f}% ({(before - after) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Instrumentación por etapas de los scripts de build
+Registra tiempo real, tiempo de CPU, bytes de entrada/salida y memoria de
+cada etapa y la exporta como trace-event JSON de Chrome (about://tracing,
+Perfetto). La memoria se mide de dos formas: el pico del heap de Python
+(tracemalloc, que no ve los búferes en C de Pillow) y el máximo de memoria
+residente (RSS) del proceso. Opcionalmente captura cProfile de las etapas
+indicadas.
+
+Uso en los scripts:
+    from build_profiler import stage
+    with stage("encode", "images", path=output) as s:
+        ...
+        s.bytes_out = os.path.getsize(output)
+
+Sin activar no tiene coste apreciable. Para activarlo:
+    python build_profiler.py run --trace trace.json [--memory] [--cprofile encode] optimize_images.py
+o con las variables de entorno SITE_TRACE, SITE_TRACE_MEMORY y SITE_PROFILE_STAGES.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import atexit
+import runpy
+import pstats
+import cProfile
+import argparse
+import threading
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage solo se mide el heap de Python
+    resource = None
+
+ENV_TRACE = "SITE_TRACE"
+ENV_MEMORY = "SITE_TRACE_MEMORY"
+ENV_PROFILE_STAGES = "SITE_PROFILE_STAGES"
+ENV_OWNER_PID = "SITE_TRACE_OWNER_PID"
+
+
+def _max_rss_kb():
+    """Máximo de memoria residente del proceso hasta ahora, en KB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+class StageHandle:
+    """Datos de una etapa en curso; el código instrumentado rellena bytes y args"""
+
+    __slots__ = ("name", "category", "args", "bytes_in", "bytes_out", "child_peak", "concurrent")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.bytes_in = None
+        self.bytes_out = None
+        self.child_peak = 0
+        self.concurrent = False  # se solapó con etapas de otros hilos
+
+
+class _NullStage:
+    """Contexto vacío usado cuando el perfilado está desactivado"""
+
+    def __init__(self):
+        self.handle = StageHandle("", "", {})
+
+    def __enter__(self):
+        return self.handle
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Stage:
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.handle = StageHandle(name, category, args)
+
+    def __enter__(self):
+        p = self.profiler
+        stack = p._stack()
+        stack.append(self.handle)
+        tid = threading.get_ident()
+        with p.lock:
+            # tracemalloc mide todo el proceso: con etapas abiertas en otros hilos el
+            # pico no es atribuible a una sola, y reiniciarlo falsearía el de las demás
+            others = [handle for handle, owner in p.open_stages if owner != tid]
+            for handle in others:
+                handle.concurrent = True
+            self.handle.concurrent = self.handle.concurrent or bool(others)
+            p.open_stages.append((self.handle, tid))
+            if p.memory and not others:
+                tracemalloc.reset_peak()
+        self.rss_start = _max_rss_kb() if p.memory else None
+        self.cprofile = None
+        if self.handle.name in p.profile_stages:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.cpu_start = time.thread_time()
+        self.wall_start = time.perf_counter()
+        return self.handle
+
+    def __exit__(self, exc_type, exc, tb):
+        wall_end = time.perf_counter()
+        cpu = time.thread_time() - self.cpu_start
+        p = self.profiler
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            p._add_cprofile(self.handle.name, self.cprofile)
+        stack = p._stack()
+        stack.pop()
+        with p.lock:
+            p.open_stages.remove((self.handle, threading.get_ident()))
+
+        args = dict(self.handle.args)
+        args["cpu_ms"] = round(cpu * 1000, 3)
+        if self.handle.bytes_in is not None:
+            args["bytes_in"] = self.handle.bytes_in
+        if self.handle.bytes_out is not None:
+            args["bytes_out"] = self.handle.bytes_out
+        if p.memory:
+            # tracemalloc solo ve el heap de Python y tiene un único pico global: se combina
+            # con el de las etapas hijas y es de la etapa solo si no hubo otras en paralelo
+            peak = max(tracemalloc.get_traced_memory()[1], self.handle.child_peak)
+            key = "process_py_heap_peak_kb" if self.handle.concurrent else "py_heap_peak_kb"
+            args[key] = round(peak / 1024, 1)
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            # El RSS incluye la memoria nativa (p. ej. los píxeles decodificados por Pillow).
+            # Su máximo es del proceso; lo que crece durante la etapa se le atribuye a ella
+            rss_end = _max_rss_kb()
+            if rss_end is not None:
+                args["max_rss_kb"] = round(rss_end, 1)
+                if not self.handle.concurrent:
+                    args["rss_growth_kb"] = round(rss_end - self.rss_start, 1)
+        if exc_type is not None:
+            args["error"] = f"{exc_type.__name__}: {exc}"
+
+        p._record({
+            "name": self.handle.name,
+            "cat": self.handle.category,
+            "ph": "X",
+            "ts": (self.wall_start - p.origin) * 1e6 + p.origin_us,
+            "dur": (wall_end - self.wall_start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+        return False
+
+
+class Profiler:
+    """Acumula los eventos de las etapas de un proceso"""
+
+    def __init__(self, memory=False, profile_stages=()):
+        self.memory = memory
+        self.profile_stages = set(profile_stages)
+        self.events = []
+        self.cprofiles = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.open_stages = []  # (StageHandle, hilo) de las etapas en curso de todos los hilos
+        # Base común entre procesos: el reloj de pared en microsegundos
+        self.origin = time.perf_counter()
+        self.origin_us = time.time() * 1e6
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def _record(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def _add_cprofile(self, name, profile):
+        with self.lock:
+            self.cprofiles.setdefault(name, []).append(profile)
+
+    def stage(self, name, category="build", **args):
+        return _Stage(self, name, category, args)
+
+    def trace_events(self):
+        """Eventos en formato Chrome, con metadatos de nombre de proceso/hilo"""
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(),
+                   "args": {"name": os.path.basename(sys.argv[0]) or "python"}}]
+        for thread in threading.enumerate():
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                           "tid": thread.ident, "args": {"name": thread.name}})
+        with self.lock:
+            events.extend(self.events)
+        return events
+
+    def save(self, path):
+        """Escribe el trace JSON y un .prof de pstats por cada etapa perfilada"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        base = os.path.splitext(path)[0]
+        for name, profiles in self.cprofiles.items():
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(f"{base}.{name}.prof")
+
+
+_profiler = None
+_null_stage = _NullStage()
+
+
+def _fragment_path(trace_path):
+    """Los procesos hijos escriben fragmentos <trace>.<pid>.json que se fusionan al final"""
+    owner = os.environ.get(ENV_OWNER_PID)
+    if owner and owner != str(os.getpid()):
+        base, ext = os.path.splitext(trace_path)
+        return f"{base}.{os.getpid()}{ext or '.json'}"
+    return trace_path
+
+
+def get_profiler():
+    """Devuelve el perfilador global (activado por SITE_TRACE) o None"""
+    global _profiler
+    if _profiler is None and os.environ.get(ENV_TRACE):
+        stages = [s for s in os.environ.get(ENV_PROFILE_STAGES, "").split(",") if s]
+        _profiler = Profiler(memory=os.environ.get(ENV_MEMORY) == "1", profile_stages=stages)
+        atexit.register(_profiler.save, _fragment_path(os.environ[ENV_TRACE]))
+    return _profiler
+
+
+def stage(name, category="build", **args):
+    """
+    Contexto que mide una etapa con el perfilador global
+
+    Args:
+        name: Nombre de la etapa (decode, resize, encode, scan, rewrite...)
+        category: Grupo de la etapa en el trace (images, verify, html...)
+        **args: Datos adicionales del elemento procesado (p. ej. path)
+    """
+    profiler = get_profiler()
+    if profiler is None:
+        return _null_stage
+    return profiler.stage(name, category, **args)
+
+
+def merge_traces(trace_path):
+    """Fusiona en trace_path los fragmentos <trace>.<pid>.json de procesos hijos"""
+    base, ext = os.path.splitext(trace_path)
+    fragments = sorted(glob.glob(f"{glob.escape(base)}.*[0-9]{ext or '.json'}"))
+    if not fragments:
+        return 0
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        merged = json.load(f)
+    for fragment in fragments:
+        with open(fragment, 'r', encoding='utf-8') as f:
+            merged["traceEvents"].extend(json.load(f)["traceEvents"])
+        os.unlink(fragment)
+    with open(trace_path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f)
+    return len(fragments)
+
+
+def summarize(trace_path, top=15):
+    """Muestra las etapas con más tiempo acumulado del trace"""
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        events = [e for e in json.load(f)["traceEvents"] if e.get("ph") == "X"]
+
+    totals = {}
+    for event in events:
+        key = (event["cat"], event["name"])
+        t = totals.setdefault(key, {"count": 0, "wall": 0.0, "cpu": 0.0, "in": 0, "out": 0, "peak": 0.0,
+                                    "process_peak": False, "rss": 0.0})
+        t["count"] += 1
+        t["wall"] += event["dur"] / 1000
+        t["cpu"] += event["args"].get("cpu_ms", 0)
+        t["in"] += event["args"].get("bytes_in", 0)
+        t["out"] += event["args"].get("bytes_out", 0)
+        t["peak"] = max(t["peak"], event["args"].get("py_heap_peak_kb", 0))
+        if "process_py_heap_peak_kb" in event["args"]:
+            t["peak"] = max(t["peak"], event["args"]["process_py_heap_peak_kb"])
+            t["process_peak"] = True
+        t["rss"] = max(t["rss"], event["args"].get("rss_growth_kb", 0))
+
+    print(f"\n🔥 ETAPAS MÁS COSTOSAS ({len(events)} eventos)")
+    print(f"{'Etapa':<28}{'n':>6}{'real ms':>11}{'CPU ms':>10}{'KB in':>10}{'KB out':>10}"
+          f"{'heap Py KB':>12}{'+RSS KB':>10}")
+    print("-" * 97)
+    for (cat, name), t in sorted(totals.items(), key=lambda kv: -kv[1]["wall"])[:top]:
+        print(f"{cat + '/' + name:<28}{t['count']:>6}{t['wall']:>11.1f}{t['cpu']:>10.1f}"
+              f"{t['in'] / 1024:>10.1f}{t['out'] / 1024:>10.1f}{t['peak']:>11.1f}{'*' if t['process_peak'] else ' '}"
+              f"{t['rss']:>10.1f}")
+    print("heap Py: pico de tracemalloc (sin memoria nativa); +RSS: crecimiento del RSS máximo en la etapa")
+    if any(t["process_peak"] for t in totals.values()):
+        print("* Pico de todo el proceso: la etapa se ejecutó en paralelo con otras")
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Perfilado por etapas de los scripts de build")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Ejecutar un script con el perfilado activado")
+    run.add_argument("script", help="Script a ejecutar (p. ej. optimize_images.py)")
+    run.add_argument("--trace", default="trace.json", help="Archivo trace-event JSON de salida")
+    run.add_argument("--memory", action="store_true", help="Medir memoria: heap de Python con tracemalloc (más lento) y RSS")
+    run.add_argument("--cprofile", default="", help="Etapas a capturar con cProfile, separadas por comas")
+    run.add_argument("script_args", nargs=argparse.REMAINDER, help="Argumentos del script")
+
+    show = sub.add_parser("summary", help="Resumir un trace existente")
+    show.add_argument("trace")
+
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        summarize(args.trace)
+        return
+
+    trace_path = os.path.abspath(args.trace)
+    os.environ[ENV_TRACE] = trace_path
+    os.environ[ENV_OWNER_PID] = str(os.getpid())
+    os.environ[ENV_MEMORY] = "1" if args.memory else "0"
+    os.environ[ENV_PROFILE_STAGES] = args.cprofile
+
+    # Usar la instancia importable del módulo (no __main__) para compartir
+    # el perfilador con los scripts que hacen `from build_profiler import stage`
+    import build_profiler
+    profiler = build_profiler.get_profiler()
+    script = os.path.abspath(args.script)
+    sys.argv = [script] + args.script_args
+    sys.path.insert(0, os.path.dirname(script))
+    exit_code = None
+    try:
+        with profiler.stage("script", "run", path=os.path.basename(script)):
+            runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        # Se conserva para salir con el mismo código tras guardar el trace
+        exit_code = e.code
+    finally:
+        atexit.unregister(profiler.save)
+        profiler.save(trace_path)
+        merged = build_profiler.merge_traces(trace_path)
+
+    print(f"\n📈 Trace guardado en {trace_path}" + (f" ({merged} procesos hijos)" if merged else ""))
+    print("   Abrir en about://tracing o https://ui.perfetto.dev")
+    for name in profiler.cprofiles:
+        print(f"   cProfile de '{name}': {os.path.splitext(trace_path)[0]}.{name}.prof")
+    summarize(trace_path)
+    if exit_code not in (None, 0):
+        sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Política declarativa de caché y cabeceras de seguridad del sitio
+Fuente única para `_headers`, `.htaccess`, las meta tags de seguridad y
+las estrategias de `sw.js` (ver generate_headers.py). Editar aquí y
+regenerar; no editar a mano los archivos generados.
+"""
+
+ONE_YEAR = 31536000
+
+# Clases de recursos, evaluadas en orden: gana la primera que coincide.
+# - match: patrones glob sobre la ruta relativa a la raíz (el * cruza directorios)
+# - versioned: solo coincide si el sitio siempre se refiere al archivo con
+#   ?v=<versión> en la URL (p. ej. fontawesome-webfont.woff2?v=4.3.0)
+# - cache_control: valor de Cache-Control de la clase
+# Solo las URL versionadas son inmutables: el resto de recursos puede cambiar
+# sin que cambie su URL y se revalida en segundo plano.
+ASSET_CLASSES = [
+    {
+        "name": "service_worker",
+        "description": "El service worker nunca se cachea para que las actualizaciones lleguen en la siguiente visita",
+        "match": ["sw.js"],
+        "cache_control": "no-store",
+    },
+    {
+        "name": "html",
+        "description": "HTML siempre fresco: se guarda pero se revalida (ETag/Last-Modified) en cada uso",
+        "match": ["*.html"],
+        "cache_control": "public, max-age=0, no-cache",
+    },
+    {
+        "name": "versioned",
+        "description": "Recursos con ?v=<versión> en todas sus URL: cada versión tiene su URL, un año sin revalidación",
+        "match": ["*.css", "*.js", "*.webp", "*.jpg", "*.jpeg", "*.png", "*.gif", "*.svg",
+                  "*.woff2", "*.woff", "*.ttf", "*.otf", "*.eot"],
+        "versioned": True,
+        "cache_control": f"public, max-age={ONE_YEAR}, immutable",
+    },
+    {
+        "name": "code",
+        "description": "CSS/JS propios, fuentes y builds de terceros sin versión en la URL: una semana, revalidando en segundo plano",
+        "match": ["*.css", "*.js", "*.map", "assets/fonts/*", "vendor/*"],
+        "cache_control": "public, max-age=604800, stale-while-revalidate=86400",
+    },
+    {
+        "name": "images",
+        "description": "Imágenes: un mes, revalidando en segundo plano",
+        "match": ["*.webp", "*.jpg", "*.jpeg", "*.png", "*.gif", "*.svg", "*.ico"],
+        "cache_control": "public, max-age=2592000, stale-while-revalidate=86400",
+    },
+    {
+        "name": "default",
+        "description": "Resto de archivos (xml, txt, config)",
+        "match": ["*"],
+        "cache_control": "public, max-age=3600",
+    },
+]
+
+# Content-Security-Policy como directivas para poder componerla y ajustarla
+CONTENT_SECURITY_POLICY = {
+    "default-src": ["'self'"],
+    # jQuery y Bootstrap se sirven desde vendor/ (ver vendor_scripts.py)
+    "script-src": ["'self'", "'unsafe-inline'"],
+    "style-src": ["'self'", "'unsafe-inline'", "https://cdn.jsdelivr.net", "https://fonts.googleapis.com"],
+    "font-src": ["'self'", "https://fonts.gstatic.com"],
+    "img-src": ["'self'", "data:", "https:"],
+    "connect-src": ["'self'"],
+}
+
+# Cabeceras de seguridad comunes a todas las respuestas.
+# meta=True: también se inyecta como <meta http-equiv> en las páginas HTML
+SECURITY_HEADERS = [
+    {"name": "X-Frame-Options", "value": "SAMEORIGIN", "meta": True},
+    {"name": "X-Content-Type-Options", "value": "nosniff", "meta": True},
+    {"name": "Referrer-Policy", "value": "strict-origin-when-cross-origin", "meta": True},
+    {"name": "Permissions-Policy", "value": "geolocation=(), microphone=(), camera=()", "meta": True},
+    {"name": "Content-Security-Policy", "value": None, "meta": True},  # se compone desde CONTENT_SECURITY_POLICY
+    {"name": "Strict-Transport-Security", "value": f"max-age={ONE_YEAR}; includeSubDomains; preload", "meta": False},
+]
+
+# Estrategias de caché en tiempo de ejecución del service worker (sw.js).
+# Solo peticiones GET del propio origen; gana la primera ruta que coincide y
+# las que no coinciden con ninguna van directamente a la red.
+# - pattern: expresión regular (compatible con JavaScript) sobre la ruta de la URL
+# - navigate: la ruta también cubre cualquier navegación (request.mode === "navigate")
+# - strategy: network-first | cache-first | stale-while-revalidate
+# - timeout_ms: (network-first) espera máxima a la red antes de servir la copia en caché
+# - max_entries / max_bytes: (cache-first) límite LRU de la caché de la ruta
+SERVICE_WORKER_ROUTES = [
+    {
+        "name": "pages",
+        "description": "HTML: red primero (con navigation preload); la copia en caché solo si la red tarda o falla",
+        "pattern": r"(?:/|\.html)$",
+        "navigate": True,
+        "strategy": "network-first",
+        "timeout_ms": 3000,
+    },
+    {
+        "name": "images",
+        "description": "Imágenes: caché primero con expulsión LRU",
+        "pattern": r"\.(?:png|jpe?g|gif|webp|svg|ico)$",
+        "strategy": "cache-first",
+        "max_entries": 60,
+        "max_bytes": 8 * 1024 * 1024,
+    },
+    {
+        "name": "static",
+        "description": "CSS, JS y fuentes: respuesta inmediata desde caché y actualización en segundo plano",
+        "pattern": r"\.(?:css|js|woff2?|ttf|otf|eot)$",
+        "strategy": "stale-while-revalidate",
+    },
+]
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Script para diferir las diapositivas 2-3 del Modern-Slider
+Deja la diapositiva 1 (imagen LCP) como fondo CSS con preload, mueve el
+fondo de las demás a atributos data-bg en el HTML (custom.js los carga en
+tiempo ocioso antes de que roten) y verifica que la imagen LCP es la única
+del slider en la ruta crítica de cada página. En las páginas generadas desde
+templates/ el cambio lo aplica render_pages.py al renderizar (defer_page)
+"""
+
+import os
+import re
+import sys
+import argparse
+
+from site_refs import (ROOT_DIR, list_html_pages, read_text, write_text,
+                       extract_html_refs, extract_css_urls, to_site_path)
+
+SLIDER_CSS = "assets/css/templatemo-finance-business.css"
+
+# Diapositivas que siguen cargándose con la página (la primera es el LCP)
+EAGER_SLIDES = 1
+
+SLIDE_RULE_PATTERN = re.compile(
+    r'\.Modern-Slider \.item-(\d+) \.img-fill\s*\{\s*background-image:\s*url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\);\s*\}\n*'
+)
+
+SLIDE_MARKUP_PATTERN = r'(<div class="item item-{n}">\s*<div class="img-fill")(?: data-bg="[^"]*")?>'
+
+# Marcas que identifican el cargador de custom.js
+LOADER_MARKERS = ("data-bg", "requestIdleCallback")
+
+
+def find_slider_pages(root=ROOT_DIR):
+    return [p for p in list_html_pages(root) if 'class="Modern-Slider"' in read_text(os.path.join(root, p))]
+
+
+def collect_slides(css_text, pages_html):
+    """
+    Localiza el fondo de cada diapositiva, ya esté en el CSS o en un data-bg
+
+    Returns:
+        {número de diapositiva: ruta relativa a la raíz}
+    """
+    slides = {}
+    for match in SLIDE_RULE_PATTERN.finditer(css_text):
+        path = to_site_path(match.group(2), SLIDER_CSS)
+        if path:
+            slides[int(match.group(1))] = path
+    for page, html in pages_html.items():
+        for match in re.finditer(r'<div class="item item-(\d+)">\s*<div class="img-fill" data-bg="([^"]+)"', html):
+            path = to_site_path(match.group(2), page)
+            if path:
+                slides.setdefault(int(match.group(1)), path)
+    return slides
+
+
+def remove_deferred_rules(css_text):
+    """Quita del CSS los fondos de las diapositivas diferidas"""
+    def replace(match):
+        return match.group(0) if int(match.group(1)) <= EAGER_SLIDES else ""
+    return SLIDE_RULE_PATTERN.sub(replace, css_text)
+
+
+def add_data_bg(html, page, slides):
+    """Añade data-bg a las diapositivas diferidas de una página"""
+    page_dir = os.path.dirname(page)
+    for n, path in sorted(slides.items()):
+        if n <= EAGER_SLIDES:
+            continue
+        url = os.path.relpath(path, page_dir or ".").replace(os.sep, "/")
+        html = re.sub(SLIDE_MARKUP_PATTERN.format(n=n), rf'\1 data-bg="{url}">', html)
+    return html
+
+
+def ensure_preload(html, page, lcp_path):
+    """Garantiza el <link rel="preload"> de la imagen LCP"""
+    url = os.path.relpath(lcp_path, os.path.dirname(page) or ".").replace(os.sep, "/")
+    if re.search(rf'<link rel="preload" href="{re.escape(url)}" as="image"', html):
+        return html
+    tag = f'    <link rel="preload" href="{url}" as="image" fetchpriority="high">\n'
+    return html.replace("</head>", tag + "</head>", 1)
+
+
+def defer_page(html, page, root=ROOT_DIR):
+    """Difiere las diapositivas de una página con slider (transformación de render_pages.py)"""
+    if 'class="Modern-Slider"' not in html:
+        return html
+    slides = collect_slides(read_text(os.path.join(root, SLIDER_CSS)), {page: html})
+    if 1 not in slides:
+        return html
+    return ensure_preload(add_data_bg(html, page, slides), page, slides[1])
+
+
+def stylesheet_urls(css_path, root, seen):
+    """URLs (relativas a la raíz) de una hoja de estilos y de sus @import"""
+    if css_path in seen or not os.path.isfile(os.path.join(root, css_path)):
+        return set()
+    seen.add(css_path)
+    urls = set()
+    for url in extract_css_urls(read_text(os.path.join(root, css_path))):
+        path = to_site_path(url, css_path)
+        if not path:
+            continue
+        if path.endswith(".css"):
+            urls |= stylesheet_urls(path, root, seen)
+        else:
+            urls.add(path)
+    return urls
+
+
+def critical_requests(page, html, root=ROOT_DIR):
+    """
+    Recursos que el navegador pide durante la carga de la página:
+    referencias del HTML (sin los data-bg) y URLs de sus hojas de estilos
+
+    Returns:
+        (conjunto de rutas, scripts cargados por la página)
+    """
+    requests, scripts, seen_css = set(), [], set()
+    for kind, url, _ in extract_html_refs(html):
+        path = to_site_path(url, page)
+        if not path or kind == "lazy-image":
+            continue
+        requests.add(path)
+        if kind == "css":
+            requests |= stylesheet_urls(path, root, seen_css)
+        elif kind == "js":
+            scripts.append(path)
+    return requests, scripts
+
+
+def has_loader(scripts, root=ROOT_DIR):
+    for script in scripts:
+        full_path = os.path.join(root, script)
+        if os.path.isfile(full_path):
+            content = read_text(full_path)
+            if all(marker in content for marker in LOADER_MARKERS):
+                return True
+    return False
+
+
+def verify(pages_html, slides, root=ROOT_DIR):
+    """
+    Comprueba cada página del slider
+
+    Returns:
+        Lista de problemas encontrados (vacía si todo está bien)
+    """
+    problems = []
+    lcp = slides.get(1)
+    slider_images = set(slides.values())
+    for page, html in sorted(pages_html.items()):
+        requests, scripts = critical_requests(page, html, root)
+        on_path = sorted(requests & slider_images)
+        print(f"\n📄 {page}:")
+        print(f"  🎯 Imágenes del slider en la ruta crítica: {', '.join(on_path) or 'ninguna'}")
+        if on_path != [lcp]:
+            problems.append(f"{page}: ruta crítica con {on_path}, se esperaba solo {lcp}")
+        if not re.search(r'<link rel="preload" href="[^"]*' + re.escape(os.path.basename(lcp)) + '" as="image"', html):
+            problems.append(f"{page}: falta el preload de {lcp}")
+        deferred = [n for n in slides if n > EAGER_SLIDES]
+        missing = [n for n in deferred if not re.search(rf'<div class="item item-{n}">\s*<div class="img-fill" data-bg=', html)]
+        if missing:
+            problems.append(f"{page}: diapositivas sin data-bg: {missing}")
+        if deferred and not has_loader(scripts, root):
+            problems.append(f"{page}: ningún script cargado contiene el cargador de data-bg")
+        print(f"  💤 Diferidas: {len(deferred) - len(missing)}/{len(deferred)}")
+    return problems
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Difiere las diapositivas 2-3 del Modern-Slider")
+    parser.add_argument("--check", action="store_true", help="Solo verificar, sin modificar archivos")
+    args = parser.parse_args()
+
+    print("🎞️ CARGA DIFERIDA DEL MODERN-SLIDER")
+    print("=" * 70)
+
+    css_file = os.path.join(ROOT_DIR, SLIDER_CSS)
+    css_text = read_text(css_file)
+    pages = find_slider_pages()
+    pages_html = {page: read_text(os.path.join(ROOT_DIR, page)) for page in pages}
+    slides = collect_slides(css_text, pages_html)
+
+    if 1 not in slides:
+        print(f"❌ No se encontró la diapositiva 1 en {SLIDER_CSS}")
+        sys.exit(1)
+
+    for n, path in sorted(slides.items()):
+        size = os.path.getsize(os.path.join(ROOT_DIR, path)) if os.path.isfile(os.path.join(ROOT_DIR, path)) else 0
+        mode = "eager + preload (LCP)" if n <= EAGER_SLIDES else "diferida"
+        print(f"  {n}. {path}: {size / 1024:.1f} KB, {mode}")
+
+    if not args.check:
+        new_css = remove_deferred_rules(css_text)
+        if new_css != css_text:
+            write_text(css_file, new_css)
+            print(f"\n✅ Fondos diferidos eliminados de {SLIDER_CSS}")
+        # Importación diferida: render_pages importa este módulo
+        from render_pages import update_page
+        for page in pages:
+            html = ensure_preload(add_data_bg(pages_html[page], page, slides), page, slides[1])
+            if html != pages_html[page]:
+                # Los data-bg van a las plantillas: tras quitar los fondos del CSS
+                # el renderizado ya no podría deducirlos
+                if update_page(page, html, edit=lambda text, page=page: add_data_bg(text, page, slides)):
+                    print(f"✅ {page} actualizado")
+                else:
+                    print(f"⚠️ {page}: el renderizado desde templates/ no reproduce el cambio")
+                pages_html[page] = read_text(os.path.join(ROOT_DIR, page))
+
+    problems = verify(pages_html, slides)
+
+    deferred_bytes = sum(os.path.getsize(os.path.join(ROOT_DIR, p)) for n, p in slides.items()
+                         if n > EAGER_SLIDES and os.path.isfile(os.path.join(ROOT_DIR, p)))
+    print(f"\n📊 Bytes fuera de la ruta crítica: {deferred_bytes / 1024:.1f} KB por página con slider")
+
+    if problems:
+        print("\n❌ PROBLEMAS:")
+        for problem in problems:
+            print(f"  • {problem}")
+        sys.exit(1)
+    print("🎉 La imagen LCP es la única del slider en la ruta crítica")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Grafo de dependencias del sitio: archivo → página → salida
+Se construye a partir de las referencias de HTML, CSS y JS (incluida la
+lista de precache de sw.js), de las salidas derivadas (JPG → WebP,
+JS → .min.js) y de las entradas de _headers y sw.js (las páginas y sus
+recursos críticos), y permite saber qué hay que reconstruir cuando cambia
+un archivo
+"""
+
+import os
+import argparse
+from urllib.parse import urlsplit
+
+from site_refs import (ROOT_DIR, iter_site_files, list_html_pages, read_text,
+                       extract_html_refs, extract_css_urls, extract_js_refs, to_site_path)
+from early_hints import critical_resources
+from service_worker import SERVICE_WORKER_FILE
+
+# Salidas derivadas: (sufijo de la fuente, sufijo de la salida).
+# Solo se enlazan cuando la salida ya existe junto a la fuente.
+DERIVED_OUTPUTS = [
+    (".jpg", ".webp"),
+    (".jpeg", ".webp"),
+    (".png", ".webp"),
+    (".js", ".min.js"),
+]
+
+# Archivos generados a partir del contenido de las páginas y de sus recursos
+# críticos: los Early Hints de _headers y el precache (y las versiones) de sw.js
+SITE_OUTPUTS = ("_headers", SERVICE_WORKER_FILE)
+
+
+def extract_refs(rel_path, root=ROOT_DIR):
+    """
+    Devuelve las rutas locales (relativas a la raíz) referenciadas por un archivo
+    HTML, CSS o JS; lista vacía para el resto de tipos
+    """
+    full_path = os.path.join(root, rel_path)
+    if not os.path.isfile(full_path):
+        return []
+    if rel_path.endswith(".html"):
+        urls = [url for _, url, _ in extract_html_refs(read_text(full_path))]
+    elif rel_path.endswith(".css"):
+        urls = extract_css_urls(read_text(full_path))
+    elif rel_path.endswith(".js") and not rel_path.endswith(".min.js") and not rel_path.startswith("vendor/"):
+        urls = extract_js_refs(read_text(full_path))
+    else:
+        return []
+    refs = []
+    for url in urls:
+        path = to_site_path(url, rel_path)
+        if path and path != rel_path and path not in refs:
+            refs.append(path)
+    return refs
+
+
+class DependencyGraph:
+    """Grafo dirigido de usos entre archivos del sitio y de salidas derivadas"""
+
+    def __init__(self):
+        self.uses = {}        # archivo -> archivos que referencia
+        self.used_by = {}     # archivo -> archivos que lo referencian
+        self.outputs = {}     # fuente -> salidas derivadas
+        self.sources = {}     # salida derivada -> fuente
+
+    def set_refs(self, node, refs):
+        """Reemplaza las referencias salientes de un nodo"""
+        for old in self.uses.get(node, ()):
+            self.used_by.get(old, set()).discard(node)
+        self.uses[node] = set(refs)
+        for ref in refs:
+            self.used_by.setdefault(ref, set()).add(node)
+
+    def remove_node(self, node):
+        """Elimina las referencias salientes de un nodo (archivo borrado)"""
+        self.set_refs(node, ())
+        self.uses.pop(node, None)
+
+    def add_output(self, source, output):
+        self.outputs.setdefault(source, set()).add(output)
+        self.sources[output] = source
+
+    def affected(self, changed):
+        """
+        Cierre transitivo de lo afectado por un conjunto de cambios:
+        los propios archivos, sus salidas derivadas y todo lo que los referencia.
+        Las páginas son hojas: que una página cambie no obliga a reconstruir
+        los scripts u otras páginas que la enlazan, solo _headers y sw.js
+        """
+        seen = set()
+        stack = list(changed)
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(self.outputs.get(node, ()))
+            users = self.used_by.get(node, ())
+            if node.endswith(".html"):
+                users = [user for user in users if user in SITE_OUTPUTS]
+            stack.extend(users)
+        return seen
+
+    def pages_affected(self, changed):
+        """Páginas HTML que deben reconstruirse tras los cambios"""
+        return sorted(n for n in self.affected(changed) if n.endswith(".html") and "/" not in n)
+
+    def reachable(self, roots):
+        """Todo lo alcanzable desde `roots` siguiendo referencias"""
+        seen = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(self.uses.get(node, ()))
+        return seen
+
+
+def site_output_refs(root=ROOT_DIR):
+    """Páginas y recursos críticos (early_hints.py) de los que dependen _headers y sw.js"""
+    refs = set()
+    for page in list_html_pages(root):
+        refs.add(page)
+        resources, _, _ = critical_resources(page, root)
+        refs.update(urlsplit(url).path.lstrip("/") for url, _, _ in resources)
+    return refs
+
+
+def link_site_outputs(graph, root=ROOT_DIR):
+    """Enlaza _headers y sw.js con sus entradas; se repite cuando cambian las páginas"""
+    refs = site_output_refs(root)
+    for output in SITE_OUTPUTS:
+        graph.set_refs(output, refs | set(extract_refs(output, root)))
+
+
+def derived_output(path, existing):
+    """Devuelve la salida derivada de `path` si existe en `existing`, o None"""
+    for source_suffix, output_suffix in DERIVED_OUTPUTS:
+        if path.endswith(source_suffix) and not path.endswith(output_suffix):
+            output = path[:-len(source_suffix)] + output_suffix
+            if output in existing:
+                return output
+    return None
+
+
+def build_graph(root=ROOT_DIR, files=None):
+    """Construye el grafo completo del sitio"""
+    files = files if files is not None else iter_site_files(root)
+    existing = set(files)
+    graph = DependencyGraph()
+    for rel_path in files:
+        refs = extract_refs(rel_path, root)
+        if refs:
+            graph.set_refs(rel_path, refs)
+        output = derived_output(rel_path, existing)
+        if output:
+            graph.add_output(rel_path, output)
+    link_site_outputs(graph, root)
+    return graph
+
+
+def main():
+    """Función principal: muestra qué se reconstruiría al cambiar los archivos indicados"""
+    parser = argparse.ArgumentParser(description="Grafo de dependencias del sitio")
+    parser.add_argument("paths", nargs="*", help="Archivos (relativos a la raíz) cuyo impacto mostrar")
+    args = parser.parse_args()
+
+    graph = build_graph()
+    pages = list_html_pages()
+
+    print("🕸️ GRAFO DE DEPENDENCIAS DEL SITIO")
+    print("=" * 60)
+    print(f"📄 Páginas: {len(pages)}")
+    print(f"🔗 Aristas de referencia: {sum(len(v) for v in graph.uses.values())}")
+    print(f"🔁 Salidas derivadas: {sum(len(v) for v in graph.outputs.values())}")
+
+    for path in args.paths:
+        affected = graph.affected([path])
+        print(f"\n✏️ {path}:")
+        for output in sorted(graph.outputs.get(path, ())):
+            print(f"  🖼️ salida derivada: {output}")
+        for page in graph.pages_affected([path]):
+            print(f"  📄 página: {page}")
+        others = sorted(a for a in affected if a != path and not a.endswith(".html")
+                        and a not in graph.outputs.get(path, ()))
+        for other in others:
+            print(f"  🔗 {other}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Cabeceras Link de precarga por página (103 Early Hints)
+Calcula los recursos críticos de cada página a partir del árbol local
+(imagen LCP, CSS del <head>, primeras fuentes y script principal) y los
+convierte en reglas `Link: <...>; rel=preload` para `_headers`, que el
+hosting puede enviar como 103 Early Hints antes de que llegue el HTML.
+Los preconnect se limitan a los orígenes que la CSP permite cargar.
+generate_headers.py incluye estas reglas en cada regeneración
+"""
+
+import os
+import re
+import argparse
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from cache_policy import CONTENT_SECURITY_POLICY
+from site_refs import ROOT_DIR, list_html_pages, read_text, is_local_url, to_site_path
+
+# Máximo de fuentes a precargar por página (las primeras @font-face de su CSS)
+MAX_FONTS = 2
+
+# Elementos del <body> en los que se busca el fondo que actúa como LCP
+HERO_SCAN_LIMIT = 60
+
+FONT_FORMATS = [(".woff2", "font/woff2"), (".woff", "font/woff")]
+
+# Directivas CSP por las que un preconnect declarado en la página puede usarse
+PRECONNECT_DIRECTIVES = ("style-src", "script-src", "font-src")
+
+FONT_FACE_PATTERN = re.compile(r'@font-face\s*\{([^}]*)\}', re.IGNORECASE)
+CLASS_RULE_PATTERN = re.compile(r'(?:^|\})\s*\.([\w-]+)\s*\{([^}]*)\}')
+BACKGROUND_URL_PATTERN = re.compile(r'background(?:-image)?\s*:[^;]*url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)', re.IGNORECASE)
+
+
+class CriticalPathParser(HTMLParser):
+    """Recoge del documento lo que condiciona la ruta crítica"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_head = True
+        self.noscript = 0
+        self.in_style = False
+        self.inline_css = []       # contenido de los <style> del <head> (CSS crítico)
+        self.stylesheets = []      # href de las hojas de estilos del <head>
+        self.preconnects = []      # (href, crossorigin)
+        self.image_preloads = []   # href de <link rel=preload as=image>
+        self.body_elements = []    # (clases, style) de los primeros elementos del <body>
+        self.images = []           # (src, loading) de los <img>
+        self.body_scripts = []     # src de los scripts del <body>
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "noscript":
+            self.noscript += 1
+        elif tag == "style" and self.in_head:
+            self.in_style = True
+        elif tag == "body":
+            self.in_head = False
+        elif tag == "link" and self.in_head and not self.noscript:
+            rel = (attrs.get("rel") or "").lower().split()
+            as_attr = (attrs.get("as") or "").lower()
+            href = attrs.get("href")
+            if "stylesheet" in rel or ("preload" in rel and as_attr == "style"):
+                if href and href not in self.stylesheets:
+                    self.stylesheets.append(href)
+            elif "preload" in rel and as_attr == "image" and href:
+                self.image_preloads.append(href)
+            elif "preconnect" in rel and href:
+                self.preconnects.append((href, "crossorigin" in attrs))
+        elif not self.in_head:
+            if len(self.body_elements) < HERO_SCAN_LIMIT:
+                self.body_elements.append(((attrs.get("class") or "").split(), attrs.get("style") or ""))
+            if tag == "img" and attrs.get("src"):
+                self.images.append((attrs["src"], (attrs.get("loading") or "").lower()))
+            elif tag == "script" and attrs.get("src"):
+                self.body_scripts.append(attrs["src"])
+
+    def handle_endtag(self, tag):
+        if tag == "noscript" and self.noscript:
+            self.noscript -= 1
+        elif tag == "style":
+            self.in_style = False
+        elif tag == "head":
+            self.in_head = False
+
+    def handle_data(self, data):
+        if self.in_style:
+            self.inline_css.append(data)
+
+
+def site_url(url, base_path):
+    """URL absoluta en el sitio conservando la query (debe coincidir con la petición real)"""
+    path = to_site_path(url, base_path)
+    if not path:
+        return None
+    query = urlsplit(url.strip()).query
+    return "/" + path + (f"?{query}" if query else "")
+
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme and parts.netloc else None
+
+
+def csp_allows(origin, directive, policy=CONTENT_SECURITY_POLICY):
+    """Indica si la directiva CSP (o default-src en su defecto) permite cargar desde un origen"""
+    parts = urlsplit(origin)
+    for source in policy.get(directive, policy.get("default-src", [])):
+        if source == "*" or source == f"{parts.scheme}:":
+            return True
+        allowed = urlsplit(source if "://" in source else f"{parts.scheme}://{source}")
+        if allowed.scheme != parts.scheme or not allowed.hostname:
+            continue
+        if allowed.hostname.startswith("*."):
+            if parts.hostname.endswith(allowed.hostname[1:]):
+                return True
+        elif allowed.hostname == parts.hostname:
+            return True
+    return False
+
+
+def class_backgrounds(sources):
+    """
+    {clase: URL de fondo} de las reglas de una sola clase
+
+    Args:
+        sources: [(CSS, ruta base para resolver sus URLs)] en orden de prioridad
+    """
+    backgrounds = {}
+    for text, base_path in sources:
+        for match in CLASS_RULE_PATTERN.finditer(text):
+            background = BACKGROUND_URL_PATTERN.search(match.group(2))
+            if background and not background.group(1).startswith("data:"):
+                backgrounds.setdefault(match.group(1), site_url(background.group(1), base_path))
+    return backgrounds
+
+
+def find_lcp_image(parser, page, css_files, root):
+    """
+    Imagen LCP de la página: la precargada en el <head>, el fondo del primer
+    elemento destacado del <body> (el CSS crítico en línea manda sobre las
+    hojas de estilos) o el primer <img> sin loading=lazy
+    """
+    for href in parser.image_preloads:
+        url = site_url(href, page)
+        if url:
+            return url
+    sources = [(css, page) for css in parser.inline_css]
+    sources.extend((read_text(os.path.join(root, css)), css) for css in css_files)
+    backgrounds = class_backgrounds(sources)
+    for classes, style in parser.body_elements:
+        inline = BACKGROUND_URL_PATTERN.search(style)
+        if inline and is_local_url(inline.group(1)):
+            return site_url(inline.group(1), page)
+        for cls in classes:
+            if backgrounds.get(cls):
+                return backgrounds[cls]
+    for src, loading in parser.images:
+        if loading != "lazy" and is_local_url(src):
+            return site_url(src, page)
+    return None
+
+
+def first_fonts(css_files, root, limit=MAX_FONTS):
+    """[(URL, tipo MIME)] de las primeras @font-face en formato WOFF2/WOFF"""
+    fonts = []
+    for css in css_files:
+        for block in FONT_FACE_PATTERN.findall(read_text(os.path.join(root, css))):
+            urls = re.findall(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)', block)
+            for ext, mime in FONT_FORMATS:
+                match = next((u for u in urls if urlsplit(u).path.lower().endswith(ext)), None)
+                if match:
+                    url = site_url(match, css)
+                    if url and (url, mime) not in fonts:
+                        fonts.append((url, mime))
+                    break
+            if len(fonts) >= limit:
+                return fonts
+    return fonts
+
+
+def _exists(url, root):
+    return os.path.isfile(os.path.join(root, urlsplit(url).path.lstrip("/")))
+
+
+def critical_resources(page, root=ROOT_DIR, policy=CONTENT_SECURITY_POLICY):
+    """
+    Recursos críticos de una página
+
+    Args:
+        page: Página relativa a la raíz
+        root: Raíz del sitio
+        policy: Directivas CSP que deben permitir los orígenes de los preconnect
+
+    Returns:
+        (lista de (URL, as, atributos extra), orígenes para preconnect [(origen, crossorigin)],
+         problemas encontrados)
+    """
+    parser = CriticalPathParser()
+    parser.feed(read_text(os.path.join(root, page)))
+    parser.close()
+
+    problems = []
+    resources = []
+    local_css = [p for p in (to_site_path(h, page) for h in parser.stylesheets) if p]
+    local_css = [p for p in local_css if os.path.isfile(os.path.join(root, p))]
+
+    lcp = find_lcp_image(parser, page, local_css, root)
+    if lcp and _exists(lcp, root):
+        resources.append((lcp, "image", ""))
+    elif lcp:
+        problems.append(f"la imagen LCP {lcp} no existe")
+    else:
+        problems.append("no se encontró la imagen LCP")
+
+    resources.extend(("/" + css, "style", "") for css in local_css)
+
+    for url, mime in first_fonts(local_css, root):
+        if _exists(url, root):
+            resources.append((url, "font", f"; type={mime}; crossorigin"))
+
+    # Script principal: el primero propio del sitio (no las librerías de vendor/)
+    main_script = next((site_url(src, page) for src in parser.body_scripts
+                        if is_local_url(src) and not site_url(src, page).startswith("/vendor/")), None)
+    if main_script and _exists(main_script, root):
+        resources.append((main_script, "script", ""))
+
+    # Orígenes externos: los preconnect declarados, las hojas de estilos externas
+    # y los scripts externos que se cargan antes del script principal. Se omiten
+    # los que la CSP bloquea: la conexión abierta nunca llegaría a usarse
+    preconnects = []
+    candidates = [(href, crossorigin, PRECONNECT_DIRECTIVES) for href, crossorigin in parser.preconnects]
+    candidates.extend((h, False, ("style-src",)) for h in parser.stylesheets if not is_local_url(h))
+    for src in parser.body_scripts:
+        if is_local_url(src) and site_url(src, page) == main_script:
+            break
+        if not is_local_url(src):
+            candidates.append((src, False, ("script-src",)))
+    for href, crossorigin, directives in candidates:
+        origin = origin_of(href)
+        if not origin or origin in [o for o, _ in preconnects]:
+            continue
+        if any(csp_allows(origin, directive, policy) for directive in directives):
+            preconnects.append((origin, crossorigin))
+        else:
+            problem = f"preconnect a {origin} omitido: la CSP ({'/'.join(directives)}) lo bloquea"
+            if problem not in problems:
+                problems.append(problem)
+
+    return resources, preconnects, problems
+
+
+def link_values(resources, preconnects):
+    """Valores de cabecera Link para una página"""
+    values = [f"<{url}>; rel=preload; as={as_type}{extra}" for url, as_type, extra in resources]
+    values.extend(f"<{origin}>; rel=preconnect" + ("; crossorigin" if crossorigin else "")
+                  for origin, crossorigin in preconnects)
+    return values
+
+
+def page_patterns(page):
+    """Rutas en las que se sirve una página (con y sin .html; "/" para index.html)"""
+    patterns = ["/" + page]
+    if page.endswith(".html"):
+        stem = "/" + page[:-len(".html")]
+        if os.path.basename(page) == "index.html":
+            patterns.insert(0, stem[:-len("index")] or "/")
+        else:
+            patterns.append(stem)
+    return patterns
+
+
+def early_hint_rules(root=ROOT_DIR):
+    """Reglas [(patrón, [("Link", valor), ...])] para render_headers_file(extra_rules=...)"""
+    rules = []
+    for page in list_html_pages(root):
+        resources, preconnects, _ = critical_resources(page, root)
+        headers = [("Link", value) for value in link_values(resources, preconnects)]
+        if headers:
+            rules.extend((pattern, headers) for pattern in page_patterns(page))
+    return rules
+
+
+def main():
+    """Función principal: muestra los recursos críticos de cada página"""
+    parser = argparse.ArgumentParser(description="Recursos críticos y cabeceras Link de cada página")
+    parser.parse_args()
+
+    print("⚡ EARLY HINTS: RECURSOS CRÍTICOS POR PÁGINA")
+    print("=" * 70)
+
+    total_problems = 0
+    for page in list_html_pages():
+        resources, preconnects, problems = critical_resources(page)
+        print(f"\n📄 {page} ({', '.join(page_patterns(page))})")
+        for url, as_type, _ in resources:
+            print(f"  🔗 {as_type:<7} {url}")
+        for origin, _ in preconnects:
+            print(f"  🌐 preconnect {origin}")
+        for problem in problems:
+            print(f"  ⚠️ {problem}")
+        total_problems += len(problems)
+
+    print(f"\n💡 Las reglas se escriben en _headers al ejecutar generate_headers.py")
+    if total_problems:
+        print(f"⚠️ {total_problems} avisos: corrija las referencias (imagen LCP) o la CSP (preconnect)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Script para generar `_headers`, `.htaccess`, las meta tags de seguridad
+y el service worker (sw.js) a partir de la política declarativa de cache_policy.py
+"""
+
+import os
+import re
+import sys
+import fnmatch
+import argparse
+
+from cache_policy import ASSET_CLASSES, CONTENT_SECURITY_POLICY, SECURITY_HEADERS
+from site_refs import (ROOT_DIR, iter_site_files, list_html_pages, read_text, write_text,
+                       extract_html_refs, extract_css_urls, extract_js_refs, to_site_path)
+from early_hints import PRECONNECT_DIRECTIVES, csp_allows, early_hint_rules, page_patterns
+from service_worker import SERVICE_WORKER_FILE, render_service_worker
+
+GENERATED_NOTICE = "Generado por assets/images/generate_headers.py desde cache_policy.py - no editar a mano"
+
+# Versión en la query de una URL (fontawesome-webfont.woff2?v=4.3.0)
+VERSION_QUERY_PATTERN = re.compile(r'[?&]v=[^&#]+')
+
+SECURITY_BLOCK_PATTERN = re.compile(
+    r'(<!-- Security Headers -->\n)((?:[ \t]*<meta http-equiv="[^"]*" content="[^"]*">\n)+)'
+)
+
+
+def build_csp(policy=CONTENT_SECURITY_POLICY):
+    """Compone la cabecera Content-Security-Policy a partir de sus directivas"""
+    return " ".join(f"{directive} {' '.join(sources)};" for directive, sources in policy.items())
+
+
+def security_headers(meta_only=False, csp=None):
+    """Devuelve la lista de (cabecera, valor) de seguridad de la política"""
+    headers = []
+    for header in SECURITY_HEADERS:
+        if meta_only and not header["meta"]:
+            continue
+        value = header["value"]
+        if header["name"] == "Content-Security-Policy":
+            value = csp or build_csp()
+        headers.append((header["name"], value))
+    return headers
+
+
+def versioned_files(files, root=ROOT_DIR):
+    """
+    Archivos a los que el sitio (HTML, CSS y JS) siempre se refiere con
+    ?v=<versión>: una versión nueva cambia la URL, así que admiten caché inmutable
+    """
+    versions = {}
+    for rel_path in files:
+        if not rel_path.endswith((".html", ".css", ".js")):
+            continue
+        text = read_text(os.path.join(root, rel_path))
+        if rel_path.endswith(".html"):
+            urls = [url for _, url, _ in extract_html_refs(text)]
+        elif rel_path.endswith(".css"):
+            urls = extract_css_urls(text)
+        else:
+            urls = extract_js_refs(text)
+        for url in urls:
+            path = to_site_path(url, rel_path)
+            if path:
+                versions.setdefault(path, set()).add(bool(VERSION_QUERY_PATTERN.search(url)))
+    return {path for path, versioned in versions.items() if versioned == {True}}
+
+
+def page_aliases(files):
+    """
+    Rutas sin extensión en las que el hosting sirve las páginas de la raíz
+    ("/" para index.html, "/about" para about.html)
+
+    Returns:
+        Lista de tuplas (ruta, página)
+    """
+    return [(pattern, page) for page in files if page.endswith(".html") and "/" not in page
+            for pattern in page_patterns(page) if pattern != "/" + page]
+
+
+def has_whitespace(path):
+    """`_headers` separa la ruta de lo demás con espacios: estos archivos no admiten regla propia"""
+    return bool(re.search(r"\s", path))
+
+
+def classify(path, versioned=()):
+    """Devuelve la clase de recurso (primera coincidencia) de una ruta relativa a la raíz"""
+    for asset_class in ASSET_CLASSES:
+        if asset_class.get("versioned") and path not in versioned:
+            continue
+        if any(fnmatch.fnmatchcase(path, pattern) for pattern in asset_class["match"]):
+            return asset_class
+    raise ValueError(f"Ninguna clase de cache_policy.py cubre {path}")
+
+
+def compute_cache_rules(files, versioned=None):
+    """
+    Agrupa los archivos en el mínimo de patrones de `_headers` sin solapamientos
+
+    Los patrones de `_headers` se acumulan (no gana el más específico), así que
+    cada archivo debe quedar cubierto por una sola regla de Cache-Control.
+
+    Args:
+        files: Archivos publicables (rutas relativas a la raíz)
+        versioned: Archivos referidos siempre con ?v= (por defecto se calculan)
+
+    Returns:
+        Lista de tuplas (patrón, nombre de clase)
+    """
+    files = [f for f in files if not has_whitespace(f)]
+    versioned = versioned_files(files) if versioned is None else versioned
+    classes = {f: classify(f, versioned)["name"] for f in files}
+    rules = []
+    covered = set()
+
+    # Las rutas inmutables van una a una: un comodín extendería la caché
+    # inmutable a archivos futuros que no llevan versión en la URL
+    immutable = {c["name"] for c in ASSET_CLASSES if c.get("versioned")}
+    for f in sorted(files):
+        if classes[f] in immutable:
+            rules.append(("/" + f, classes[f]))
+            covered.add(f)
+
+    def visit(directory, subtree):
+        prefix = f"/{directory}/" if directory else "/"
+        names = {classes[f] for f in subtree}
+
+        # Todo el directorio comparte clase y nada está cubierto aún
+        if directory and len(names) == 1 and not covered.intersection(subtree):
+            rules.append((prefix + "*", names.pop()))
+            covered.update(subtree)
+            return
+
+        # Extensiones homogéneas en todo el subárbol y sin archivos ya cubiertos
+        by_ext = {}
+        for f in subtree:
+            ext = os.path.splitext(f)[1]
+            if ext:
+                by_ext.setdefault(ext, []).append(f)
+        for ext, ext_files in sorted(by_ext.items()):
+            ext_names = {classes[f] for f in ext_files}
+            if len(ext_names) == 1 and not covered.intersection(ext_files):
+                rules.append((f"{prefix}*{ext}", ext_names.pop()))
+                covered.update(ext_files)
+
+        remaining = [f for f in subtree if f not in covered]
+        offset = len(directory) + 1 if directory else 0
+        subdirs = sorted({f[offset:].split("/")[0] for f in remaining if "/" in f[offset:]})
+        for subdir in subdirs:
+            full = f"{directory}/{subdir}" if directory else subdir
+            visit(full, [f for f in subtree if f.startswith(full + "/")])
+        for f in remaining:
+            if "/" not in f[offset:]:
+                rules.append(("/" + f, classes[f]))
+                covered.add(f)
+
+    visit("", list(files))
+    rules.extend((alias, classes[page]) for alias, page in page_aliases(files))
+    return rules
+
+
+def render_headers_file(files, extra_rules=(), csp=None, versioned=None):
+    """
+    Genera el contenido de `_headers`
+
+    Args:
+        files: Archivos publicables (rutas relativas a la raíz)
+        extra_rules: Reglas adicionales [(patrón, [(cabecera, valor), ...])]
+        csp: Content-Security-Policy a usar en lugar de la de la política
+        versioned: Archivos referidos siempre con ?v= (por defecto se calculan)
+    """
+    cache_by_class = {c["name"]: c["cache_control"] for c in ASSET_CLASSES}
+    lines = [f"# {GENERATED_NOTICE}", "", "# Cabeceras de seguridad", "/*"]
+    lines.extend(f"  {name}: {value}" for name, value in security_headers(csp=csp))
+
+    lines.extend(["", "# Caché por clase de recurso"])
+    for pattern, class_name in compute_cache_rules(files, versioned):
+        lines.append(pattern)
+        lines.append(f"  Cache-Control: {cache_by_class[class_name]}")
+
+    for pattern, headers in extra_rules:
+        lines.append("")
+        lines.append(pattern)
+        lines.extend(f"  {name}: {value}" for name, value in headers)
+
+    return "\n".join(lines) + "\n"
+
+
+def _glob_to_regex(pattern):
+    return "".join(".*" if ch == "*" else re.escape(ch) for ch in pattern)
+
+
+def render_htaccess(csp=None, pages=None):
+    """
+    Genera el contenido de `.htaccess` (Apache 2.4)
+
+    Args:
+        csp: Content-Security-Policy a usar en lugar de la de la política
+        pages: Páginas de la raíz, también servidas sin extensión (por defecto list_html_pages())
+    """
+    pages = list_html_pages() if pages is None else pages
+    lines = [
+        f"# {GENERATED_NOTICE}",
+        "",
+        "#==============================================================================",
+        "# 1. CABECERAS DE SEGURIDAD",
+        "#==============================================================================",
+        "<IfModule mod_headers.c>",
+    ]
+    lines.extend(f'  Header always set {name} "{value}"' for name, value in security_headers(csp=csp))
+    lines.extend([
+        "</IfModule>",
+        "",
+        "#==============================================================================",
+        "# 2. POLÍTICA DE CACHÉ (Cache-Control por clase de recurso)",
+        "#==============================================================================",
+        "# Las clases se evalúan de menor a mayor prioridad: la última que coincide gana.",
+        "<IfModule mod_headers.c>",
+    ])
+    page_class = classify("index.html")["name"]
+    for asset_class in reversed(ASSET_CLASSES):
+        alternatives = [_glob_to_regex(p) for p in asset_class["match"]]
+        if asset_class["name"] == page_class:
+            # Rutas sin extensión de las páginas ("/" sirve index.html)
+            alternatives[:0] = [_glob_to_regex(alias[1:]) for alias, _ in page_aliases(pages)]
+        condition = f"%{{REQUEST_URI}} =~ m#^/(?:{'|'.join(alternatives)})$#"
+        if asset_class.get("versioned"):
+            condition += " && %{QUERY_STRING} =~ m#(?:^|&)v=#"
+        lines.append(f"  # {asset_class['name']}: {asset_class['description']}")
+        lines.append(f'  <If "{condition}">')
+        lines.append(f'    Header set Cache-Control "{asset_class["cache_control"]}"')
+        lines.append("  </If>")
+    lines.extend([
+        "  Header append Vary \"Accept-Encoding\"",
+        "</IfModule>",
+        "",
+        "#==============================================================================",
+        "# 3. COMPRESIÓN GZIP",
+        "#==============================================================================",
+        "<IfModule mod_deflate.c>",
+        "  AddOutputFilterByType DEFLATE text/plain text/html text/xml text/css",
+        "  AddOutputFilterByType DEFLATE application/xml application/xhtml+xml application/rss+xml",
+        "  AddOutputFilterByType DEFLATE application/javascript application/x-javascript image/svg+xml",
+        "</IfModule>",
+        "",
+        "#==============================================================================",
+        "# 4. FORZAR HTTPS",
+        "#==============================================================================",
+        "<IfModule mod_rewrite.c>",
+        "  RewriteEngine On",
+        "  RewriteCond %{HTTPS} off",
+        "  RewriteRule ^(.*)$ https://%{HTTP_HOST}%{REQUEST_URI} [L,R=301]",
+        "</IfModule>",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+def render_security_meta(indent="    ", csp=None):
+    """Genera las meta tags http-equiv de seguridad (una por línea)"""
+    return "".join(f'{indent}<meta http-equiv="{name}" content="{value}">\n'
+                   for name, value in security_headers(meta_only=True, csp=csp))
+
+
+def sync_security_meta(content, csp=None):
+    """Sustituye el bloque <!-- Security Headers --> de un HTML por el de la política"""
+    def replace(match):
+        indent = re.match(r'[ \t]*', match.group(2)).group(0)
+        return match.group(1) + render_security_meta(indent, csp=csp)
+    return SECURITY_BLOCK_PATTERN.sub(replace, content, count=1)
+
+
+def check_cache_rules(headers_text, files, versioned=None):
+    """
+    Comprueba que cada archivo (y cada página sin extensión) recibe exactamente
+    el Cache-Control de su clase al aplicar las reglas generadas como lo haría el hosting
+
+    Returns:
+        Lista de errores (vacía si todo es correcto)
+    """
+    from preview_server import parse_headers_rules, headers_for_path
+
+    files = [f for f in files if not has_whitespace(f)]
+    versioned = versioned_files(files) if versioned is None else versioned
+    rules = parse_headers_rules(headers_text)
+    errors = []
+    for url, path in [("/" + f, f) for f in files] + page_aliases(files):
+        expected = classify(path, versioned)["cache_control"]
+        values = [v for n, v in headers_for_path(rules, url) if n.lower() == "cache-control"]
+        if values != [expected]:
+            errors.append(f"{url}: {values} (esperado: {expected})")
+    return errors
+
+
+def check_preconnects(headers_text, policy=CONTENT_SECURITY_POLICY):
+    """
+    Comprueba que ninguna cabecera Link de _headers abre conexiones previas
+    a orígenes que la CSP no permite usar
+
+    Returns:
+        Lista de errores (vacía si todo es correcto)
+    """
+    from preview_server import parse_headers_rules
+
+    errors = []
+    for pattern, headers in parse_headers_rules(headers_text):
+        for name, value in headers:
+            match = re.match(r'<([^>]+)>;\s*rel=preconnect\b', value)
+            if name.lower() != "link" or not match:
+                continue
+            if not any(csp_allows(match.group(1), d, policy) for d in PRECONNECT_DIRECTIVES):
+                errors.append(f"{pattern}: preconnect a {match.group(1)} bloqueado por la CSP")
+    return errors
+
+
+def generate(write=True, extra_rules=(), csp=None):
+    """
+    Genera todos los artefactos de la política. `_headers` incluye siempre
+    las cabeceras Link de Early Hints de cada página (early_hints.py) y
+    sw.js las estrategias de SERVICE_WORKER_ROUTES (service_worker.py)
+
+    Returns:
+        Diccionario {ruta relativa: (contenido actual, contenido generado)}
+    """
+    files = iter_site_files()
+    versioned = versioned_files(files)
+    rules = early_hint_rules() + list(extra_rules)
+    outputs = {
+        "_headers": render_headers_file(files, rules, csp=csp, versioned=versioned),
+        ".htaccess": render_htaccess(csp=csp),
+    }
+    # Las páginas con plantilla reciben las meta tags como variable del layout: se
+    # renderizan de nuevo. Importación diferida: render_pages importa este módulo
+    from render_pages import Renderer, list_template_pages, site_variables, render_all
+    templated = set(list_template_pages())
+    rendered = render_all([p for p in list_html_pages() if p in templated], write=False,
+                          renderer=Renderer(site_vars=site_variables(csp)))
+    for page in list_html_pages():
+        if page in rendered:
+            outputs[page] = rendered[page][1]
+        else:
+            outputs[page] = sync_security_meta(read_text(os.path.join(ROOT_DIR, page)), csp=csp)
+
+    errors = check_cache_rules(outputs["_headers"], files, versioned) + check_preconnects(outputs["_headers"])
+    if errors:
+        raise ValueError("Reglas de _headers inconsistentes:\n  " + "\n  ".join(errors))
+
+    results = {}
+    for rel_path, generated in outputs.items():
+        full_path = os.path.join(ROOT_DIR, rel_path)
+        current = read_text(full_path) if os.path.exists(full_path) else None
+        results[rel_path] = (current, generated)
+        if write and current != generated:
+            write_text(full_path, generated)
+
+    # La versión de las cachés de sw.js depende del contenido de las páginas:
+    # se genera después de escribirlas
+    full_path = os.path.join(ROOT_DIR, SERVICE_WORKER_FILE)
+    current = read_text(full_path) if os.path.exists(full_path) else None
+    generated = render_service_worker()
+    results[SERVICE_WORKER_FILE] = (current, generated)
+    if write and current != generated:
+        write_text(full_path, generated)
+    return results
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Genera _headers, .htaccess, meta tags y sw.js desde cache_policy.py")
+    parser.add_argument("--check", action="store_true",
+                        help="No escribir; salir con código 1 si algún archivo está desactualizado")
+    args = parser.parse_args()
+
+    print("🛡️ GENERACIÓN DE POLÍTICA DE CACHÉ Y SEGURIDAD")
+    print("=" * 70)
+
+    try:
+        results = generate(write=not args.check)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    stale = [path for path, (current, generated) in results.items() if current != generated]
+    for path, (current, generated) in results.items():
+        if current == generated:
+            print(f"  ✓ {path}: al día")
+        elif args.check:
+            print(f"  ❌ {path}: desactualizado")
+        else:
+            print(f"  ✅ {path}: regenerado")
+
+    print(f"\n📋 CLASES DE RECURSOS:")
+    for asset_class in ASSET_CLASSES:
+        print(f"  • {asset_class['name']:<15} {asset_class['cache_control']}")
+
+    if args.check and stale:
+        print(f"\n🔧 Ejecute: python generate_headers.py")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
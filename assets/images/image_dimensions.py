@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Script para añadir width/height a todas las etiquetas <img>
+Lee las dimensiones de la cabecera de cada imagen (PNG, GIF, JPEG, WebP,
+SVG) sin decodificarla, con una caché en disco y un sondeo en paralelo,
+e inyecta los atributos que faltan (o aspect-ratio en los contenedores con
+fondo en línea) para evitar saltos de maquetación. Informa de las imágenes
+que no se pudieron resolver. render_pages.py inyecta las dimensiones de las
+imágenes locales al renderizar; las de las externas (--remote) se escriben en
+las plantillas de templates/
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import argparse
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from site_refs import ROOT_DIR, list_html_pages, read_text, extract_css_urls, to_site_path
+
+DEFAULT_CACHE = os.path.join(ROOT_DIR, ".cache", "image-dimensions.json")
+
+# Bytes a leer de cada imagen: suficiente para las cabeceras de casi todas. En los
+# JPEG con EXIF/ICC grandes el SOF queda más allá y se sigue leyendo por bloques
+PROBE_BYTES = 64 * 1024
+
+REMOTE_TIMEOUT = 10
+
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+ATTR_PATTERN = r'\s{name}\s*=\s*"([^"]*)"'
+BACKGROUND_TAG_PATTERN = re.compile(r'<[a-z][a-z0-9]*\b[^>]*\sstyle="([^"]*background(?:-image)?\s*:[^"]*url\([^"]*)"[^>]*>',
+                                    re.IGNORECASE)
+
+# Marcadores JPEG Start Of Frame (todos los C0-CF salvo DHT, JPG y DAC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _exif_orientation(segment):
+    """Devuelve la orientación EXIF de un segmento APP1 (1 si no hay)"""
+    if not segment.startswith(b"Exif\x00\x00"):
+        return 1
+    tiff = segment[6:]
+    if len(tiff) < 8:
+        return 1
+    endian = "<" if tiff[:2] == b"II" else ">"
+    offset = struct.unpack(endian + "I", tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return 1
+    count = struct.unpack(endian + "H", tiff[offset:offset + 2])[0]
+    for i in range(count):
+        entry = offset + 2 + i * 12
+        if entry + 12 > len(tiff):
+            break
+        tag, _, _ = struct.unpack(endian + "HHI", tiff[entry:entry + 8])
+        if tag == 0x0112:
+            return struct.unpack(endian + "H", tiff[entry + 8:entry + 10])[0]
+    return 1
+
+
+def _jpeg_size(data):
+    orientation = 1
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # relleno
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if marker == 0xE1:
+            orientation = _exif_orientation(data[pos + 4:pos + 2 + length])
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            # Los navegadores aplican la orientación EXIF (image-orientation: from-image)
+            return (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+        pos += 2 + length
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = struct.unpack("<I", data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _svg_length(value):
+    match = re.fullmatch(r'\s*([0-9.]+)\s*(px)?\s*', value or "")
+    return float(match.group(1)) if match else None
+
+
+def _svg_size(data):
+    match = re.search(rb'<svg\b[^>]*>', data, re.IGNORECASE)
+    if not match:
+        return None
+    tag = match.group(0).decode("utf-8", errors="replace")
+    attrs = dict(re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag))
+    width, height = _svg_length(attrs.get("width")), _svg_length(attrs.get("height"))
+    if width and height:
+        return round(width), round(height)
+    view_box = attrs.get("viewBox", "").replace(",", " ").split()
+    if len(view_box) == 4:
+        vb_width, vb_height = float(view_box[2]), float(view_box[3])
+        if vb_width > 0 and vb_height > 0:
+            # Con un solo lado fijado, el otro sigue la proporción del viewBox
+            if width:
+                return round(width), round(width * vb_height / vb_width)
+            if height:
+                return round(height * vb_width / vb_height), round(height)
+            return round(vb_width), round(vb_height)
+    return None
+
+
+def image_size(data):
+    """
+    Dimensiones (ancho, alto) a partir de los primeros bytes de una imagen
+
+    Returns:
+        Tupla (ancho, alto) o None si el formato no se reconoce
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:2] == b"\xff\xd8":
+        return _jpeg_size(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _webp_size(data)
+    if b"<svg" in data[:4096].lower():
+        return _svg_size(data)
+    return None
+
+
+def read_image_size(stream):
+    """
+    Dimensiones de una imagen leída de un flujo binario por bloques de PROBE_BYTES
+
+    Returns:
+        Tupla (dimensiones o None, bytes leídos)
+    """
+    data = stream.read(PROBE_BYTES)
+    size = image_size(data)
+    # Solo un JPEG puede tener la cabecera con el tamaño más allá del primer bloque
+    while size is None and data[:2] == b"\xff\xd8":
+        chunk = stream.read(PROBE_BYTES)
+        if not chunk:
+            break
+        data += chunk
+        size = image_size(data)
+    return size, data
+
+
+class DimensionProbe:
+    """Sondeo de dimensiones con caché en disco, locales y (opcionalmente) remotas"""
+
+    def __init__(self, root=ROOT_DIR, cache_path=DEFAULT_CACHE, remote=False, workers=8):
+        self.root = root
+        self.cache_path = cache_path
+        self.remote = remote
+        self.workers = workers
+        self.cache = {}
+        self.hits = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+
+    def _local_key(self, rel_path):
+        stat = os.stat(os.path.join(self.root, rel_path))
+        return f"{rel_path}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def _probe_local(self, rel_path):
+        full_path = os.path.join(self.root, rel_path)
+        if not os.path.isfile(full_path):
+            return None, "no existe"
+        if os.path.getsize(full_path) == 0:
+            return None, "vacía (0 bytes)"
+        with open(full_path, 'rb') as f:
+            size, _ = read_image_size(f)
+        return (size, None) if size else (None, "formato no reconocido")
+
+    def _probe_remote(self, url):
+        headers = {"User-Agent": "image-dimensions-probe"}
+        request = urllib.request.Request(url, headers=dict(headers, Range=f"bytes=0-{PROBE_BYTES - 1}"))
+        try:
+            with urllib.request.urlopen(request, timeout=REMOTE_TIMEOUT) as response:
+                partial = response.status == 206
+                size, data = read_image_size(response)
+            if size is None and partial and data[:2] == b"\xff\xd8":
+                # El servidor respetó el Range y el SOF del JPEG está más allá: se pide entero
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers),
+                                            timeout=REMOTE_TIMEOUT) as response:
+                    size, _ = read_image_size(response)
+        except (OSError, ValueError) as e:
+            return None, f"error de red ({type(e).__name__})"
+        return (size, None) if size else (None, "formato no reconocido")
+
+    def _resolve(self, source):
+        """source es una ruta relativa a la raíz o una URL absoluta"""
+        if source.startswith(("http://", "https://", "//")):
+            if not self.remote:
+                return source, None, "externa (use --remote)"
+            url = "https:" + source if source.startswith("//") else source
+            key = f"url|{url}"
+            if key in self.cache:
+                self.hits += 1
+                return source, tuple(self.cache[key]), None
+            size, error = self._probe_remote(url)
+        else:
+            if not os.path.isfile(os.path.join(self.root, source)):
+                return source, None, "no existe"
+            key = self._local_key(source)
+            if key in self.cache:
+                self.hits += 1
+                return source, tuple(self.cache[key]), None
+            size, error = self._probe_local(source)
+        if size:
+            with self.lock:
+                self.cache[key] = list(size)
+                self.dirty = True
+        return source, size, error
+
+    def probe_all(self, sources):
+        """
+        Sondea en paralelo un conjunto de imágenes
+
+        Returns:
+            (dimensiones {fuente: (ancho, alto)}, errores {fuente: motivo})
+        """
+        sizes, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for source, size, error in pool.map(self._resolve, sorted(set(sources))):
+                if size:
+                    sizes[source] = size
+                else:
+                    errors[source] = error
+        return sizes, errors
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self.lock:
+            cache = dict(self.cache)
+            self.dirty = False
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        # Escritura atómica: las páginas se renderizan en paralelo
+        temp_path = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.cache_path)
+
+
+_shared_probe = None
+_shared_probe_lock = threading.Lock()
+
+
+def shared_probe():
+    """Sondeo de las imágenes locales compartido por los renderizados, con la caché en disco"""
+    global _shared_probe
+    with _shared_probe_lock:
+        if _shared_probe is None:
+            _shared_probe = DimensionProbe()
+        return _shared_probe
+
+
+def _attr(tag, name):
+    match = re.search(ATTR_PATTERN.format(name=name), tag, re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def image_source(url, page):
+    """Clave de sondeo de una URL: ruta relativa a la raíz, URL externa o None"""
+    url = (url or "").strip()
+    if not url or url.startswith("data:"):
+        return None
+    path = to_site_path(url, page)
+    if path:
+        return path
+    return url if url.startswith(("http://", "https://", "//")) else None
+
+
+def pending_sources(html, page=""):
+    """Imágenes de <img> sin dimensiones completas y de fondos en línea sin aspect-ratio"""
+    sources = []
+    for tag in IMG_TAG_PATTERN.findall(html):
+        if _attr(tag, "width") is None or _attr(tag, "height") is None:
+            source = image_source(_attr(tag, "src"), page)
+            if source:
+                sources.append(source)
+    for match in BACKGROUND_TAG_PATTERN.finditer(html):
+        style = match.group(1)
+        if "aspect-ratio" not in style and not re.search(r'(^|;)\s*height\s*:', style):
+            urls = extract_css_urls(style)
+            source = image_source(urls[0], page) if urls else None
+            if source:
+                sources.append(source)
+    return sources
+
+
+def _add_dimensions(tag, size):
+    width, height = _attr(tag, "width"), _attr(tag, "height")
+    if width is not None and height is not None:
+        return tag
+    # Si ya hay un lado fijado, el otro se calcula con la proporción intrínseca
+    if width is not None and width.isdigit():
+        attrs = f' height="{round(int(width) * size[1] / size[0])}"'
+    elif height is not None and height.isdigit():
+        attrs = f' width="{round(int(height) * size[0] / size[1])}"'
+    elif width is None and height is None:
+        attrs = f' width="{size[0]}" height="{size[1]}"'
+    else:
+        return tag
+    self_closing = tag.endswith("/>")
+    body = (tag[:-2] if self_closing else tag[:-1]).rstrip()
+    return body + attrs + (" />" if self_closing else ">")
+
+
+def inject_dimensions(html, page="", sizes=None):
+    """
+    Añade width/height a los <img> y aspect-ratio a los fondos en línea
+
+    Args:
+        html: Contenido de la página
+        page: Ruta de la página relativa a la raíz (para resolver URLs relativas)
+        sizes: Dimensiones ya sondeadas; si es None se sondean solo las locales
+            (con la caché en disco, por mtime y tamaño)
+    """
+    if sizes is None:
+        sources = [s for s in pending_sources(html, page) if not is_remote(s)]
+        probe = shared_probe()
+        sizes, _ = probe.probe_all(sources)
+        if probe.dirty:
+            probe.save()
+
+    def replace_img(match):
+        tag = match.group(0)
+        size = sizes.get(image_source(_attr(tag, "src"), page))
+        return _add_dimensions(tag, size) if size and size[0] and size[1] else tag
+
+    def replace_background(match):
+        tag, style = match.group(0), match.group(1)
+        if "aspect-ratio" in style or re.search(r'(^|;)\s*height\s*:', style):
+            return tag
+        urls = extract_css_urls(style)
+        size = sizes.get(image_source(urls[0], page)) if urls else None
+        if not size or not size[0] or not size[1]:
+            return tag
+        new_style = style.rstrip().rstrip(";") + f"; aspect-ratio: {size[0]} / {size[1]};"
+        return tag.replace(f'style="{style}"', f'style="{new_style}"', 1)
+
+    html = IMG_TAG_PATTERN.sub(replace_img, html)
+    return BACKGROUND_TAG_PATTERN.sub(replace_background, html)
+
+
+def is_remote(source):
+    return "://" in source or source.startswith("//")
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Añade width/height a las etiquetas <img> del sitio")
+    parser.add_argument("--check", action="store_true", help="Solo informar, sin modificar las páginas")
+    parser.add_argument("--remote", action="store_true",
+                        help="Sondear también imágenes externas (petición Range de los primeros 64 KB; "
+                             "el archivo entero si el tamaño de un JPEG queda más allá)")
+    parser.add_argument("--workers", type=int, default=8, help="Sondeos en paralelo")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Archivo JSON de caché de dimensiones")
+    args = parser.parse_args()
+
+    print("📐 DIMENSIONES INTRÍNSECAS DE LAS IMÁGENES")
+    print("=" * 70)
+
+    pages = {page: read_text(os.path.join(ROOT_DIR, page)) for page in list_html_pages()}
+    pending = {page: pending_sources(html, page) for page, html in pages.items()}
+    all_sources = [s for sources in pending.values() for s in sources]
+
+    probe = DimensionProbe(cache_path=args.cache, remote=args.remote, workers=args.workers)
+    sizes, errors = probe.probe_all(all_sources)
+    probe.save()
+    print(f"🔍 {len(set(all_sources))} imágenes sin dimensiones: {len(sizes)} resueltas "
+          f"({probe.hits} desde caché), {len(errors)} sin resolver")
+
+    # Importación diferida: render_pages importa este módulo
+    from render_pages import update_page
+    remote_sizes = {source: size for source, size in sizes.items() if is_remote(source)}
+
+    total_injected = 0
+    for page, html in sorted(pages.items()):
+        new_html = inject_dimensions(html, page, sizes)
+        injected = len(pending[page]) - len(pending_sources(new_html, page))
+        total_injected += injected
+        if injected:
+            print(f"  📄 {page}: {injected} de {len(pending[page])} etiquetas completadas")
+            edit = lambda text, page=page: inject_dimensions(text, page, remote_sizes)
+            if not args.check and not update_page(page, new_html, edit=edit):
+                print(f"  ⚠️ {page}: el renderizado desde templates/ no reproduce el cambio")
+        elif pending[page]:
+            print(f"  📄 {page}: {len(pending[page])} etiquetas sin resolver")
+
+    if errors:
+        print(f"\n⚠️ IMÁGENES SIN RESOLVER:")
+        by_reason = {}
+        for source, reason in sorted(errors.items()):
+            by_reason.setdefault(reason, []).append(source)
+        for reason, sources in sorted(by_reason.items()):
+            print(f"  • {reason}: {len(sources)}")
+            for source in sources:
+                print(f"      {source}")
+
+    verb = "por completar" if args.check else "completadas"
+    print(f"\n🎯 Etiquetas {verb}: {total_injected}")
+    if args.check and total_injected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Script para incrustar recursos pequeños como data URIs en dist/
+Sustituye por data URIs las imágenes y fuentes por debajo de un umbral
+referenciadas desde CSS o HTML, salvo las compartidas por varios archivos
+(que seguirían duplicándose en cada uno y dejarían de cachearse), e informa
+por página de las peticiones eliminadas frente a los bytes añadidos
+"""
+
+import os
+import re
+import sys
+import base64
+import argparse
+from urllib.parse import quote
+
+from cache_policy import CONTENT_SECURITY_POLICY
+from site_refs import (CSS_URL_PATTERN, iter_site_files, read_text, write_text,
+                       extract_html_refs, extract_css_urls, to_site_path)
+from build_dist import DIST_DIR
+
+DEFAULT_THRESHOLD = 4096
+
+# Tipos que se pueden incrustar. De las fuentes solo WOFF/WOFF2: los formatos
+# heredados (EOT, TTF, SVG) quedan como URL y los navegadores actuales no los piden
+INLINE_TYPES = {
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+    ".woff2": "font/woff2",
+    ".woff": "font/woff",
+}
+
+FONT_TYPES = (".woff2", ".woff")
+
+IMG_SRC_PATTERN = re.compile(r'(<img\b[^>]*?\ssrc=")([^"]+)(")', re.IGNORECASE)
+STYLE_ATTR_PATTERN = re.compile(r'(\sstyle=")([^"]*)(")', re.IGNORECASE)
+STYLE_BLOCK_PATTERN = re.compile(r'(<style\b[^>]*>)(.*?)(</style>)', re.IGNORECASE | re.DOTALL)
+
+
+def csp_allows_data(directive, policy=CONTENT_SECURITY_POLICY):
+    """Indica si la directiva CSP (o default-src en su defecto) admite data:"""
+    sources = policy.get(directive, policy.get("default-src", []))
+    return "data:" in sources
+
+
+def data_uri(path):
+    """Codifica un archivo como data URI (SVG como texto escapado, el resto en base64)"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'rb') as f:
+        data = f.read()
+    if ext == ".svg":
+        text = data.decode("utf-8").replace("\r\n", "\n")
+        return f"data:{INLINE_TYPES[ext]},{quote(text, safe=' =:/;,()!*@$-._~')}"
+    return f"data:{INLINE_TYPES[ext]};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def _inlinable_url(url):
+    """Las URLs con fragmento (sprites SVG, #iefix) apuntan a una parte del archivo"""
+    return "#" not in url and os.path.splitext(url.split("?")[0])[1].lower() in INLINE_TYPES
+
+
+def html_asset_urls(html):
+    """URLs incrustables de un HTML: src de <img>, atributos style y bloques <style>"""
+    urls = [m.group(2) for m in IMG_SRC_PATTERN.finditer(html)]
+    for m in STYLE_ATTR_PATTERN.finditer(html):
+        urls.extend(extract_css_urls(m.group(2)))
+    for m in STYLE_BLOCK_PATTERN.finditer(html):
+        urls.extend(extract_css_urls(m.group(2)))
+    return [u for u in urls if _inlinable_url(u)]
+
+
+def css_asset_urls(css):
+    return [u for u in extract_css_urls(css) if _inlinable_url(u)]
+
+
+def scan(root):
+    """
+    Recorre los HTML y CSS de `root`
+
+    Returns:
+        (usos {recurso: contenedores que lo referencian},
+         hojas de estilos de cada página {página: [css, ...]})
+    """
+    files = iter_site_files(root, skip_dirs=())
+    usage = {}
+    page_css = {}
+    for rel_path in files:
+        if rel_path.endswith(".html"):
+            text = read_text(os.path.join(root, rel_path))
+            urls = html_asset_urls(text)
+            page_css[rel_path] = [p for p in (to_site_path(u, rel_path) for kind, u, _ in extract_html_refs(text)
+                                              if kind == "css") if p]
+        elif rel_path.endswith(".css"):
+            urls = css_asset_urls(read_text(os.path.join(root, rel_path)))
+        else:
+            continue
+        for url in urls:
+            path = to_site_path(url, rel_path)
+            if path:
+                usage.setdefault(path, set()).add(rel_path)
+    return usage, page_css
+
+
+def choose_assets(root, usage, page_css, threshold, max_shared):
+    """
+    Decide qué recursos se incrustan
+
+    Returns:
+        (incrustados {recurso: data URI}, descartados {recurso: motivo})
+    """
+    inline, skipped = {}, {}
+    fonts_allowed = csp_allows_data("font-src")
+    images_allowed = csp_allows_data("img-src")
+    for path, containers in sorted(usage.items()):
+        full_path = os.path.join(root, path)
+        if not os.path.isfile(full_path) or os.path.getsize(full_path) == 0:
+            skipped[path] = "no existe o está vacío"
+            continue
+        size = os.path.getsize(full_path)
+        pages = pages_using(path, containers, page_css)
+        if size > threshold:
+            continue
+        if len(containers) > max_shared:
+            # Incrustado se repetiría en cada contenedor en lugar de cachearse una vez
+            skipped[path] = f"compartido por {len(containers)} archivos ({len(pages)} páginas)"
+        elif path.endswith(FONT_TYPES) and not fonts_allowed:
+            skipped[path] = "la CSP no admite data: en font-src"
+        elif not path.endswith(FONT_TYPES) and not images_allowed:
+            skipped[path] = "la CSP no admite data: en img-src"
+        else:
+            inline[path] = data_uri(full_path)
+    return inline, skipped
+
+
+def pages_using(path, containers, page_css):
+    """Páginas que cargan el recurso, directamente o a través de sus hojas de estilos"""
+    return {page for page, css_files in page_css.items()
+            if page in containers or containers.intersection(css_files)}
+
+
+def rewrite_css(css, base_path, inline):
+    def replace(match):
+        url = match.group(2).strip()
+        path = to_site_path(url, base_path) if _inlinable_url(url) else None
+        return f'url("{inline[path]}")' if path in inline else match.group(0)
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def rewrite_html(html, page, inline):
+    def replace_src(match):
+        path = to_site_path(match.group(2), page) if _inlinable_url(match.group(2)) else None
+        return match.group(1) + inline[path] + match.group(3) if path in inline else match.group(0)
+
+    def replace_css(match):
+        # En atributos style el data URI va entre comillas simples para no cerrar el atributo
+        css = rewrite_css(match.group(2), page, inline)
+        if match.group(1).lstrip().startswith("style"):
+            css = css.replace('url("data:', "url('data:").replace('")', "')")
+        return match.group(1) + css + match.group(3)
+
+    html = IMG_SRC_PATTERN.sub(replace_src, html)
+    html = STYLE_ATTR_PATTERN.sub(replace_css, html)
+    return STYLE_BLOCK_PATTERN.sub(replace_css, html)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Incrusta recursos pequeños como data URIs en dist/")
+    parser.add_argument("--dir", default=DIST_DIR, help="Directorio a transformar (por defecto dist/)")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help="Tamaño máximo en bytes de un recurso incrustable")
+    parser.add_argument("--max-shared", type=int, default=1,
+                        help="Máximo de archivos HTML/CSS que pueden referenciar un recurso incrustado")
+    parser.add_argument("--check", action="store_true", help="Solo informar, sin modificar archivos")
+    args = parser.parse_args()
+
+    print("🧩 INCRUSTACIÓN DE RECURSOS PEQUEÑOS (DATA URIs)")
+    print("=" * 70)
+
+    root = os.path.abspath(args.dir)
+    if not os.path.isdir(root):
+        print(f"❌ No existe {root}: ejecute antes build_dist.py")
+        sys.exit(1)
+
+    usage, page_css = scan(root)
+    inline, skipped = choose_assets(root, usage, page_css, args.threshold, args.max_shared)
+
+    print(f"📏 Umbral: {args.threshold} bytes, máximo {args.max_shared} archivo(s) por recurso")
+    for path, uri in sorted(inline.items()):
+        size = os.path.getsize(os.path.join(root, path))
+        print(f"  ✅ {path}: {size} B → {len(uri)} B en {', '.join(sorted(usage[path]))}")
+    for path, reason in sorted(skipped.items()):
+        print(f"  ⏭️ {path}: {reason}")
+
+    # Crecimiento de cada contenedor reescrito
+    growth = {}
+    for container in sorted({c for path in inline for c in usage[path]}):
+        full_path = os.path.join(root, container)
+        content = read_text(full_path)
+        if container.endswith(".css"):
+            new_content = rewrite_css(content, container, inline)
+        else:
+            new_content = rewrite_html(content, container, inline)
+        growth[container] = len(new_content.encode("utf-8")) - len(content.encode("utf-8"))
+        if not args.check and new_content != content:
+            write_text(full_path, new_content)
+
+    print(f"\n📄 IMPACTO POR PÁGINA (primera visita):")
+    print(f"{'Página':<28}{'Peticiones':>12}{'Bytes añadidos':>18}")
+    print("-" * 58)
+    total_requests = 0
+    for page, css_files in sorted(page_css.items()):
+        removed = [p for p in inline if page in pages_using(p, usage[p], {page: css_files})]
+        added = sum(growth.get(c, 0) for c in set([page] + css_files))
+        total_requests += len(removed)
+        print(f"{page:<28}{-len(removed):>12}{added:>+18,}")
+
+    verb = "se incrustarían" if args.check else "incrustados"
+    print(f"\n🎯 {len(inline)} recursos {verb}; {total_requests} peticiones menos en total")
+    if not inline:
+        print("   Ningún recurso cumple el umbral sin estar compartido")
+
+
+if __name__ == "__main__":
+    main()
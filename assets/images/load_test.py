@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Generador de carga HTTP para el sitio (solo localhost)
+Reproduce cargas de página realistas: pide cada HTML y después todo su grafo
+de subrecursos (CSS, JS, imágenes, fuentes, url() dentro del CSS) con
+concurrencia configurable y caché de navegador fría o caliente.
+Informa latencias p50/p95/p99, throughput y bytes por página para comparar
+configuraciones de caché y compresión de `_headers` con números reales.
+"""
+
+import sys
+import json
+import gzip
+import time
+import socket
+import asyncio
+import argparse
+import ipaddress
+import threading
+import zlib
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from site_refs import list_html_pages, extract_html_refs, extract_css_urls, to_site_path
+
+MAX_CONNECTIONS_PER_PAGE = 6  # Igual que un navegador con HTTP/1.1
+
+
+def percentile(values, pct):
+    """Percentil con interpolación lineal (pct entre 0 y 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def ensure_localhost(base_url):
+    """Verifica que la URL objetivo resuelva únicamente a direcciones de loopback"""
+    parts = urlsplit(base_url)
+    if parts.scheme != "http":
+        raise ValueError(f"Solo se admite http:// contra localhost (recibido: {base_url})")
+    host = parts.hostname or ""
+    port = parts.port or 80
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise ValueError(f"No se pudo resolver {host}: {e}")
+    for info in infos:
+        address = info[4][0].split("%")[0]
+        if not ipaddress.ip_address(address).is_loopback:
+            raise ValueError(f"{host} resuelve a {address}: la prueba de carga solo se ejecuta contra localhost")
+    return host, port
+
+
+class Response:
+    """Respuesta HTTP ya leída del socket"""
+
+    def __init__(self, status, headers, body, wire_bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.wire_bytes = wire_bytes
+
+    def decoded_body(self):
+        encoding = self.headers.get("content-encoding", "")
+        if encoding == "gzip":
+            return gzip.decompress(self.body)
+        if encoding == "deflate":
+            return zlib.decompress(self.body)
+        return self.body
+
+
+class Connection:
+    """Conexión HTTP/1.1 keep-alive sobre asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, path, headers):
+        if self.writer is None:
+            await self._open()
+
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Conexión cerrada por el servidor")
+        wire_bytes = len(status_line)
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            wire_bytes += len(line)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size_line = await self.reader.readline()
+                wire_bytes += len(size_line)
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    wire_bytes += len(await self.reader.readline())
+                    break
+                chunk = await self.reader.readexactly(size + 2)
+                wire_bytes += len(chunk)
+                chunks.append(chunk[:-2])
+            body = b"".join(chunks)
+        elif "content-length" in response_headers:
+            body = await self.reader.readexactly(int(response_headers["content-length"]))
+            wire_bytes += len(body)
+        else:
+            body = await self.reader.read()
+            wire_bytes += len(body)
+            self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+
+        return Response(status, response_headers, body, wire_bytes)
+
+
+class ConnectionPool:
+    """Limita las conexiones simultáneas por origen como lo hace un navegador"""
+
+    def __init__(self, host, port, size=MAX_CONNECTIONS_PER_PAGE):
+        self.host = host
+        self.port = port
+        self.idle = asyncio.Queue()
+        self.slots = asyncio.Semaphore(size)
+        self.all = []
+
+    async def request(self, path, headers):
+        async with self.slots:
+            conn = self.idle.get_nowait() if not self.idle.empty() else None
+            if conn is None:
+                conn = Connection(self.host, self.port)
+                self.all.append(conn)
+            try:
+                response = await conn.request(path, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Conexión keep-alive cerrada por el servidor: reintentar una vez
+                conn.close()
+                response = await conn.request(path, headers)
+            self.idle.put_nowait(conn)
+            return response
+
+    def close(self):
+        for conn in self.all:
+            conn.close()
+
+
+class BrowserCache:
+    """Caché HTTP simplificada de navegador (max-age, no-cache, no-store, validadores)"""
+
+    def __init__(self):
+        self.entries = {}
+
+    @staticmethod
+    def _parse_cache_control(value):
+        directives = {}
+        for item in value.split(","):
+            name, _, arg = item.strip().partition("=")
+            if name:
+                directives[name.lower()] = arg.strip('"')
+        return directives
+
+    def lookup(self, path, now):
+        """Devuelve ("fresh" | "stale" | None, entrada)"""
+        entry = self.entries.get(path)
+        if entry is None:
+            return None, None
+        if not entry["no_cache"] and now - entry["stored_at"] < entry["freshness"]:
+            return "fresh", entry
+        return "stale", entry
+
+    def store(self, path, headers, body, now):
+        directives = self._parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives:
+            self.entries.pop(path, None)
+            return
+        freshness = 0
+        if "max-age" in directives:
+            try:
+                freshness = int(directives["max-age"])
+            except ValueError:
+                freshness = 0
+        elif "last-modified" in headers:
+            # Frescura heurística del navegador: 10% de la antigüedad del recurso
+            try:
+                age = now - parsedate_to_datetime(headers["last-modified"]).timestamp()
+                freshness = max(0, age * 0.1)
+            except (TypeError, ValueError):
+                freshness = 0
+        self.entries[path] = {
+            "stored_at": now,
+            "freshness": freshness,
+            "no_cache": "no-cache" in directives,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "headers": headers,
+            "body": body,
+            "content_type": headers.get("content-type", ""),
+        }
+
+    def refresh(self, path, headers, now):
+        """Actualiza una entrada tras un 304 combinando las cabeceras nuevas"""
+        entry = self.entries.get(path)
+        if entry is not None:
+            self.store(path, {**entry["headers"], **headers}, entry["body"], now)
+
+
+class PageLoad:
+    """Resultado de una carga completa de página"""
+
+    def __init__(self, page):
+        self.page = page
+        self.elapsed = 0.0
+        self.requests = 0
+        self.wire_bytes = 0
+        self.from_cache = 0
+        self.not_modified = 0
+        self.errors = []
+        self.request_latencies = []
+        self.statuses = {}
+        self.skipped_external = 0
+
+
+async def fetch(pool, cache, path, result, accept_encoding):
+    """Obtiene un recurso pasando por la caché del navegador; devuelve (cuerpo, content-type)"""
+    now = time.time()
+    state, entry = cache.lookup(path, now)
+    if state == "fresh":
+        result.from_cache += 1
+        return entry["body"], entry["content_type"]
+
+    headers = {"Accept": "*/*", "User-Agent": "site-load-test/1.0"}
+    if accept_encoding:
+        headers["Accept-Encoding"] = accept_encoding
+    if state == "stale":
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    started = time.perf_counter()
+    response = await pool.request("/" + path, headers)
+    result.request_latencies.append(time.perf_counter() - started)
+    result.requests += 1
+    result.wire_bytes += response.wire_bytes
+    result.statuses[response.status] = result.statuses.get(response.status, 0) + 1
+
+    if response.status == 304 and entry is not None:
+        result.not_modified += 1
+        cache.refresh(path, response.headers, time.time())
+        return entry["body"], entry["content_type"]
+    if response.status >= 400:
+        result.errors.append(f"{response.status} /{path}")
+        return b"", ""
+
+    body = response.decoded_body()
+    cache.store(path, response.headers, body, time.time())
+    return body, response.headers.get("content-type", "")
+
+
+async def load_page(pool, cache, page, accept_encoding):
+    """Carga un HTML y todo su grafo de subrecursos locales"""
+    result = PageLoad(page)
+    started = time.perf_counter()
+    seen = {page}
+
+    async def fetch_graph(path):
+        try:
+            body, content_type = await fetch(pool, cache, path, result, accept_encoding)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            result.errors.append(f"{type(e).__name__} /{path}")
+            return
+        children = []
+        if path.endswith(".css") or content_type.startswith("text/css"):
+            children = extract_css_urls(body.decode("utf-8", errors="replace"))
+        elif path.endswith(".html") or content_type.startswith("text/html"):
+            # Los fondos diferidos (data-bg) se piden después del evento load
+            children = [url for kind, url, _ in extract_html_refs(body.decode("utf-8", errors="replace"))
+                        if kind != "lazy-image"]
+        pending = []
+        for url in children:
+            child = to_site_path(url, path)
+            if child is None:
+                result.skipped_external += 1
+                continue
+            if child not in seen:
+                seen.add(child)
+                pending.append(fetch_graph(child))
+        if pending:
+            await asyncio.gather(*pending)
+
+    await fetch_graph(page)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def run_load(host, port, pages, iterations, concurrency, mode, accept_encoding):
+    """
+    Ejecuta la prueba de carga
+
+    Returns:
+        Tupla (lista de PageLoad medidas, segundos de la fase medida)
+    """
+    jobs = asyncio.Queue()
+    for _ in range(iterations):
+        for page in pages:
+            jobs.put_nowait(page)
+
+    results = []
+    warmed = 0
+    measuring = asyncio.Event()
+    started = time.perf_counter()
+
+    async def virtual_user():
+        nonlocal warmed, started
+        cache = BrowserCache()
+        pool = ConnectionPool(host, port)
+        try:
+            if mode == "warm":
+                # Visita de calentamiento (no se mide) para poblar la caché; la fase
+                # medida empieza cuando todos los usuarios la han terminado
+                for page in pages:
+                    await load_page(pool, cache, page, accept_encoding)
+                warmed += 1
+                if warmed == concurrency:
+                    started = time.perf_counter()
+                    measuring.set()
+                await measuring.wait()
+            while not jobs.empty():
+                page = jobs.get_nowait()
+                if mode == "cold":
+                    pool.close()
+                    cache = BrowserCache()
+                    pool = ConnectionPool(host, port)
+                results.append(await load_page(pool, cache, page, accept_encoding))
+        finally:
+            pool.close()
+
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, wall_time):
+    """Agrega las métricas de la prueba"""
+    page_latencies = [r.elapsed for r in results]
+    request_latencies = [lat for r in results for lat in r.request_latencies]
+    total_bytes = sum(r.wire_bytes for r in results)
+    total_requests = sum(r.requests for r in results)
+
+    per_page = {}
+    for r in results:
+        stats = per_page.setdefault(r.page, {"loads": 0, "latencies": [], "bytes": 0, "requests": 0,
+                                             "from_cache": 0, "not_modified": 0})
+        stats["loads"] += 1
+        stats["latencies"].append(r.elapsed)
+        stats["bytes"] += r.wire_bytes
+        stats["requests"] += r.requests
+        stats["from_cache"] += r.from_cache
+        stats["not_modified"] += r.not_modified
+
+    statuses = {}
+    for r in results:
+        for status, count in r.statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+
+    return {
+        "page_loads": len(results),
+        "wall_time_s": wall_time,
+        "page_latency_ms": {
+            "p50": percentile(page_latencies, 50) * 1000,
+            "p95": percentile(page_latencies, 95) * 1000,
+            "p99": percentile(page_latencies, 99) * 1000,
+            "max": max(page_latencies, default=0) * 1000,
+        },
+        "request_latency_ms": {
+            "p50": percentile(request_latencies, 50) * 1000,
+            "p95": percentile(request_latencies, 95) * 1000,
+            "p99": percentile(request_latencies, 99) * 1000,
+        },
+        "throughput": {
+            "pages_per_s": len(results) / wall_time if wall_time else 0,
+            "requests_per_s": total_requests / wall_time if wall_time else 0,
+            "mb_per_s": total_bytes / wall_time / 1024 / 1024 if wall_time else 0,
+        },
+        "statuses": statuses,
+        "errors": sorted({e for r in results for e in r.errors}),
+        "pages": {
+            page: {
+                "loads": s["loads"],
+                "p50_ms": percentile(s["latencies"], 50) * 1000,
+                "p95_ms": percentile(s["latencies"], 95) * 1000,
+                "bytes_per_load": s["bytes"] / s["loads"],
+                "requests_per_load": s["requests"] / s["loads"],
+                "cache_hits_per_load": s["from_cache"] / s["loads"],
+                "revalidations_per_load": s["not_modified"] / s["loads"],
+            }
+            for page, s in sorted(per_page.items())
+        },
+    }
+
+
+def print_report(summary, mode, concurrency):
+    """Muestra el reporte de latencias, throughput y bytes por página"""
+    print(f"\n📊 RESULTADOS ({mode} cache, concurrencia {concurrency})")
+    print("=" * 70)
+    lat = summary["page_latency_ms"]
+    req = summary["request_latency_ms"]
+    thr = summary["throughput"]
+    print(f"📄 Cargas de página medidas: {summary['page_loads']} en {summary['wall_time_s']:.2f} s")
+    print(f"⏱️ Carga completa (ms): p50 {lat['p50']:.1f} | p95 {lat['p95']:.1f} | p99 {lat['p99']:.1f} | máx {lat['max']:.1f}")
+    print(f"⏱️ Por petición (ms):   p50 {req['p50']:.2f} | p95 {req['p95']:.2f} | p99 {req['p99']:.2f}")
+    print(f"📈 Throughput: {thr['pages_per_s']:.1f} páginas/s | {thr['requests_per_s']:.1f} peticiones/s | {thr['mb_per_s']:.2f} MB/s")
+    print(f"🔢 Códigos de estado: {summary['statuses']}")
+
+    print(f"\n{'Página':<26}{'p50 ms':>9}{'p95 ms':>9}{'KB/carga':>11}{'pet.':>7}{'caché':>7}{'304':>6}")
+    print("-" * 75)
+    for page, s in summary["pages"].items():
+        print(f"{page:<26}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['bytes_per_load'] / 1024:>11.1f}"
+              f"{s['requests_per_load']:>7.1f}{s['cache_hits_per_load']:>7.1f}{s['revalidations_per_load']:>6.1f}")
+
+    if summary["errors"]:
+        print(f"\n⚠️ Recursos con error ({len(summary['errors'])}):")
+        for error in summary["errors"][:20]:
+            print(f"  ❌ {error}")
+
+
+def start_preview_server(port, headers_file, compress):
+    """Arranca el servidor de previsualización en un hilo en segundo plano"""
+    from preview_server import create_server
+
+    server = create_server("127.0.0.1", port, headers_file, compress=compress)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Prueba de carga del sitio contra localhost")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base del servidor local")
+    parser.add_argument("--pages", nargs="*", help="Páginas a cargar (por defecto todas las *.html)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Usuarios virtuales simultáneos")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="Cargas medidas por página")
+    parser.add_argument("--mode", choices=("cold", "warm"), default="cold",
+                        help="cold: visitante nuevo en cada carga; warm: caché del navegador poblada")
+    parser.add_argument("--accept-encoding", default="gzip", help="Cabecera Accept-Encoding ('' para desactivar)")
+    parser.add_argument("--serve", action="store_true", help="Arrancar el servidor de previsualización en --url")
+    parser.add_argument("--headers", dest="headers_file", default=None, help="Archivo _headers para --serve")
+    parser.add_argument("--gzip", action="store_true", help="Activar gzip en el servidor de --serve")
+    parser.add_argument("--json", dest="json_path", help="Guardar el resumen en JSON")
+    args = parser.parse_args()
+
+    try:
+        host, port = ensure_localhost(args.url)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    pages = args.pages or list_html_pages()
+
+    print("🚀 PRUEBA DE CARGA DEL SITIO")
+    print("=" * 70)
+    print(f"🎯 Objetivo: {args.url} | páginas: {len(pages)} | modo: {args.mode}")
+
+    server = start_preview_server(port, args.headers_file, args.gzip) if args.serve else None
+    try:
+        results, wall_time = asyncio.run(run_load(host, port, pages, args.iterations, args.concurrency,
+                                                  args.mode, args.accept_encoding))
+    except OSError as e:
+        print(f"❌ No se pudo conectar con {args.url}: {e}")
+        sys.exit(1)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    summary = summarize(results, wall_time)
+    summary["config"] = {
+        "url": args.url, "mode": args.mode, "concurrency": args.concurrency,
+        "iterations": args.iterations, "accept_encoding": args.accept_encoding,
+        "headers_file": args.headers_file, "gzip": args.gzip if args.serve else None,
+    }
+    print_report(summary, args.mode, args.concurrency)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Resumen guardado en {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,16 @@ Convierte JPG a WebP con alta compresión manteniendo buena calidad
 from PIL import Image
 import os
 
+from build_profiler import stage
+
+# Imágenes a optimizar: (original, salida WebP, calidad)
+IMAGES_TO_OPTIMIZE = [
+    ("slide_01.jpg", "slide_01.webp", 85),  # LCP - calidad alta
+    ("slide_02.jpg", "slide_02.webp", 80),  # Calidad buena
+    ("slide_03.jpg", "slide_03.webp", 80),  # Calidad buena
+]
+DEFAULT_QUALITY = 80
+
 def optimize_image(input_path, output_path, quality=80, max_width=1200):
     """
     Optimiza una imagen convirtiéndola a WebP
@@ -18,16 +28,21 @@ def optimize_image(input_path, output_path, quality=80, max_width=1200):
         max_width: Ancho máximo de la imagen
     """
     try:
-        # Abrir la imagen original
-        with Image.open(input_path) as img:
+        # Abrir y decodificar la imagen original
+        with stage("decode", "images", path=input_path) as s:
+            img = Image.open(input_path)
+            img.load()
+            s.bytes_in = os.path.getsize(input_path)
+        with img:
             print(f"Procesando {input_path}")
             print(f"Tamaño original: {img.size}")
             
             # Redimensionar si es necesario
             if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+                with stage("resize", "images", path=input_path, size=f"{img.width}x{img.height}"):
+                    ratio = max_width / img.width
+                    new_height = int(img.height * ratio)
+                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
                 print(f"Redimensionado a: {img.size}")
             
             # Convertir a RGB si es necesario (para WebP)
@@ -35,7 +50,9 @@ def optimize_image(input_path, output_path, quality=80, max_width=1200):
                 img = img.convert("RGB")
             
             # Guardar como WebP optimizado
-            img.save(output_path, "WebP", quality=quality, optimize=True)
+            with stage("encode", "images", path=output_path, quality=quality) as s:
+                img.save(output_path, "WebP", quality=quality, optimize=True)
+                s.bytes_out = os.path.getsize(output_path)
             
             # Mostrar estadísticas
             original_size = os.path.getsize(input_path)
@@ -56,17 +73,10 @@ def main():
     print("🔥 OPTIMIZACIÓN DE IMÁGENES CRÍTICAS")
     print("=" * 50)
     
-    # Lista de imágenes a optimizar
-    images_to_optimize = [
-        ("slide_01.jpg", "slide_01.webp", 85),  # LCP - calidad alta
-        ("slide_02.jpg", "slide_02.webp", 80),  # Calidad buena
-        ("slide_03.jpg", "slide_03.webp", 80),  # Calidad buena
-    ]
-    
     total_original = 0
     total_optimized = 0
     
-    for input_file, output_file, quality in images_to_optimize:
+    for input_file, output_file, quality in IMAGES_TO_OPTIMIZE:
         if os.path.exists(input_file):
             original_size = os.path.getsize(input_file)
             total_original += original_size
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Servidor de previsualización local
+Sirve el sitio desde la raíz del proyecto aplicando las reglas de `_headers`
+(como lo hace el hosting) con compresión gzip y ETag opcionales, para poder
+medir configuraciones de caché/compresión en localhost
+"""
+
+import os
+import re
+import gzip
+import argparse
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+
+from site_refs import ROOT_DIR
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/xml",
+    "image/svg+xml", "application/vnd.ms-fontobject", "font/ttf", "font/otf",
+)
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("font/woff2", ".woff2")
+mimetypes.add_type("font/woff", ".woff")
+mimetypes.add_type("font/ttf", ".ttf")
+mimetypes.add_type("font/otf", ".otf")
+mimetypes.add_type("application/javascript", ".js")
+
+
+def parse_headers_rules(text):
+    """
+    Interpreta el contenido de un archivo `_headers` (formato Netlify/Cloudflare Pages)
+
+    Returns:
+        Lista de tuplas (patrón, [(cabecera, valor), ...]) en orden de aparición
+    """
+    rules = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if not line[0].isspace():
+            rules.append((stripped, []))
+        elif rules and ":" in stripped:
+            name, value = stripped.split(":", 1)
+            rules[-1][1].append((name.strip(), value.strip()))
+    return rules
+
+
+def load_headers_rules(headers_path):
+    """Lee las reglas de un archivo `_headers` (lista vacía si no existe)"""
+    if not os.path.exists(headers_path):
+        return []
+    with open(headers_path, 'r', encoding='utf-8') as f:
+        return parse_headers_rules(f.read())
+
+
+def _pattern_to_regex(pattern):
+    """Convierte un patrón de ruta de `_headers` en una expresión regular"""
+    parts = []
+    for token in re.split(r'(\*|:[A-Za-z_]\w*)', pattern):
+        if token == "*":
+            parts.append(".*")
+        elif token.startswith(":") and len(token) > 1:
+            parts.append("[^/]+")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("^" + "".join(parts) + "$")
+
+
+def headers_for_path(rules, url_path):
+    """
+    Calcula las cabeceras que aplican a una ruta según las reglas de `_headers`
+    Las cabeceras repetidas entre reglas se combinan separadas por comas
+    """
+    merged = {}
+    for pattern, headers in rules:
+        if not _pattern_to_regex(pattern).match(url_path):
+            continue
+        for name, value in headers:
+            key = name.lower()
+            if key in merged:
+                merged[key] = (merged[key][0], merged[key][1] + ", " + value)
+            else:
+                merged[key] = (name, value)
+    return list(merged.values())
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP que sirve archivos estáticos con las reglas de `_headers`"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "PreviewServer/1.0"
+    root = ROOT_DIR
+    rules = []
+    compress = False
+    etags = True
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _resolve(self, url_path):
+        path = os.path.normpath(unquote(url_path).lstrip("/"))
+        if path.startswith(".."):
+            return None
+        full_path = os.path.join(self.root, path) if path != "." else self.root
+        if os.path.isdir(full_path):
+            full_path = os.path.join(full_path, "index.html")
+        return full_path if os.path.isfile(full_path) else None
+
+    def _send_error(self, code, message):
+        body = message.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url_path = urlsplit(self.path).path or "/"
+        full_path = self._resolve(url_path)
+        if full_path is None:
+            self._send_error(404, "Not Found")
+            return
+
+        stat = os.stat(full_path)
+        content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        etag = f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        extra_headers = headers_for_path(self.rules, url_path)
+
+        # Peticiones condicionales (revalidación del navegador)
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        not_modified = False
+        if self.etags and if_none_match:
+            not_modified = etag in [t.strip() for t in if_none_match.split(",")]
+        elif if_modified_since:
+            try:
+                not_modified = int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+
+        if not_modified:
+            self.send_response(304)
+            if self.etags:
+                self.send_header("ETag", etag)
+            for name, value in extra_headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with open(full_path, 'rb') as f:
+            body = f.read()
+
+        encoding = None
+        accept_encoding = self.headers.get("Accept-Encoding", "")
+        if (self.compress and "gzip" in accept_encoding
+                and content_type.startswith(COMPRESSIBLE_TYPES) and len(body) > 256):
+            body = gzip.compress(body, compresslevel=6)
+            encoding = "gzip"
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", last_modified)
+        if self.etags:
+            self.send_header("ETag", etag)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Vary", "Accept-Encoding")
+        for name, value in extra_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+def create_server(host="127.0.0.1", port=8000, headers_file=None, compress=False,
+                  etags=True, quiet=True, root=ROOT_DIR):
+    """Crea (sin arrancar) un servidor de previsualización configurado"""
+    headers_file = headers_file or os.path.join(root, "_headers")
+    handler = type("ConfiguredPreviewHandler", (PreviewHandler,), {
+        "root": root,
+        "rules": load_headers_rules(headers_file),
+        "compress": compress,
+        "etags": etags,
+        "quiet": quiet,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Servidor de previsualización local con reglas de _headers")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz de escucha (solo local)")
+    parser.add_argument("--port", type=int, default=8000, help="Puerto de escucha")
+    parser.add_argument("--headers", dest="headers_file", default=None,
+                        help="Archivo _headers a aplicar (por defecto el de la raíz)")
+    parser.add_argument("--gzip", action="store_true", help="Comprimir respuestas de texto con gzip")
+    parser.add_argument("--no-etag", action="store_true", help="No enviar ETag (solo Last-Modified)")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar cada petición")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.headers_file, compress=args.gzip,
+                           etags=not args.no_etag, quiet=not args.verbose)
+
+    print("🌐 SERVIDOR DE PREVISUALIZACIÓN")
+    print("=" * 50)
+    print(f"📁 Raíz: {ROOT_DIR}")
+    print(f"📄 Reglas _headers: {len(server.RequestHandlerClass.rules)}")
+    print(f"🗜️ Compresión gzip: {'sí' if args.gzip else 'no'}")
+    print(f"🔗 http://{args.host}:{args.port}/")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ Servidor detenido")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
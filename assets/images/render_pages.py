@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Renderizado de las páginas desde plantillas con layout y parciales compartidos
+Cada página de templates/pages/ extiende templates/layouts/base.html y
+rellena sus bloques (head, content, scripts...); la cabecera, la navegación,
+el pie, las meta tags de seguridad y los scripts comunes salen de
+templates/partials/. Lo que cambia de una página a otra (marca, textos del
+pie, etiquetas del menú) son variables con su valor por defecto en el layout
+que cada página puede redefinir con {% set %}, y los bloques footer, scripts,
+page_scripts y service_worker permiten sustituir esas partes enteras.
+Los fragmentos renderizados se cachean por el hash de sus entradas (fuentes y
+variables que usan) en memoria y en .cache/fragments/, y las páginas se
+renderizan en paralelo.
+
+Las páginas de la raíz que tienen plantilla son un artefacto: los scripts de
+optimización no las editan, sino que aplican sus cambios en tiempo de
+renderizado (PAGE_TRANSFORMS) o en las plantillas (update_page).
+
+Sintaxis (subconjunto de Jinja):
+    {{ variable }}
+    {% extends "layouts/base.html" %}           primera línea de una página
+    {% set variable = "valor" %}
+    {% set variable %}HTML de varias líneas{% endset %}
+    {% block nombre %}...{% endblock %}
+    {% include "partials/x.html" clave="valor" otra=variable %}
+    {% if variable == "valor" %}...{% else %}...{% endif %}
+    {%- ... -%}                                 el guion quita los espacios y saltos de ese lado
+Una línea que solo contiene etiquetas {% %} no deja línea en blanco.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from site_refs import ROOT_DIR, read_text, write_text
+from generate_headers import render_security_meta
+from image_dimensions import inject_dimensions
+from defer_slides import defer_page
+
+TEMPLATES_DIR = os.path.join(ROOT_DIR, "templates")
+PAGES_SUBDIR = "pages"
+FRAGMENT_CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "fragments")
+
+# Cambiar al modificar el motor para invalidar los fragmentos cacheados
+ENGINE_VERSION = "3"
+
+TAG_PATTERN = re.compile(r'{{\s*(\w+)\s*}}|{%\s*(.*?)\s*%}', re.DOTALL)
+TRIM_LEFT_PATTERN = re.compile(r'\s*{%-')
+TRIM_RIGHT_PATTERN = re.compile(r'-%}\s*')
+STATEMENT_LINE_PATTERN = re.compile(r'^[ \t]*((?:{%.*?%}[ \t]*)+)\n', re.MULTILINE)
+INCLUDE_PATTERN = re.compile(r'include\s+"([^"]+)"((?:\s+\w+=(?:"[^"]*"|\w+))*)$')
+ARG_PATTERN = re.compile(r'(\w+)=(?:"([^"]*)"|(\w+))')
+CONDITION_PATTERN = re.compile(r'^(\w+)(?:\s*(==|!=)\s*(?:"([^"]*)"|(\w+)))?$')
+SET_PATTERN = re.compile(r'^set\s+(\w+)(?:\s*=\s*"([^"]*)")?$')
+
+# Transformaciones que se aplican a cada página renderizada (contenido, página → contenido)
+PAGE_TRANSFORMS = [
+    ("defer-slides", defer_page),
+    ("image-dimensions", inject_dimensions),
+]
+
+
+class TemplateError(Exception):
+    """Error de sintaxis o de renderizado en una plantilla"""
+
+
+class Template:
+    """Plantilla analizada: árbol de nodos, hash de su fuente y dependencias directas"""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.sha = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self.extends = None
+        self.includes = set()
+        self.names = set()
+        source = TRIM_RIGHT_PATTERN.sub("%}", TRIM_LEFT_PATTERN.sub("{%", source))
+        self.nodes = self._parse(STATEMENT_LINE_PATTERN.sub(r'\1', source))
+
+    def _parse(self, source):
+        root = []
+        stack = [("root", root, None)]
+        pos = 0
+        for match in TAG_PATTERN.finditer(source):
+            current = stack[-1][1]
+            if match.start() > pos:
+                current.append(("text", source[pos:match.start()]))
+            pos = match.end()
+            if match.group(1):
+                self.names.add(match.group(1))
+                current.append(("var", match.group(1)))
+                continue
+            statement = match.group(2)
+            keyword = statement.split()[0] if statement else ""
+            if keyword == "extends":
+                extends = re.match(r'extends\s+"([^"]+)"$', statement)
+                if not extends or root or len(stack) > 1:
+                    raise TemplateError(f"{self.name}: 'extends' debe ser la primera etiqueta")
+                self.extends = extends.group(1)
+            elif keyword == "include":
+                include = INCLUDE_PATTERN.match(statement)
+                if not include:
+                    raise TemplateError(f"{self.name}: include inválido: {statement}")
+                self.includes.add(include.group(1))
+                args = ARG_PATTERN.findall(include.group(2))
+                literals = {key: value for key, value, ref in args if not ref}
+                refs = {key: ref for key, _, ref in args if ref}
+                self.names.update(refs.values())
+                current.append(("include", include.group(1), literals, refs))
+            elif keyword == "set":
+                assignment = SET_PATTERN.match(statement)
+                if not assignment:
+                    raise TemplateError(f"{self.name}: set inválido: {statement}")
+                if assignment.group(2) is not None:
+                    current.append(("set", assignment.group(1), [("text", assignment.group(2))]))
+                else:
+                    # {% set nombre %}...{% endset %}: el valor es el contenido renderizado
+                    node = ("set", assignment.group(1), [])
+                    current.append(node)
+                    stack.append(("set", node[2], node))
+            elif keyword == "block":
+                node = ("block", statement.split()[1], [])
+                current.append(node)
+                stack.append(("block", node[2], node))
+            elif keyword == "if":
+                condition = CONDITION_PATTERN.match(statement[2:].strip())
+                if not condition:
+                    raise TemplateError(f"{self.name}: condición inválida: {statement}")
+                self.names.add(condition.group(1))
+                if condition.group(4):
+                    self.names.add(condition.group(4))
+                node = ("if", condition.groups(), [], [])
+                current.append(node)
+                stack.append(("if", node[2], node))
+            elif keyword == "else":
+                if stack[-1][0] != "if":
+                    raise TemplateError(f"{self.name}: 'else' fuera de un if")
+                stack[-1] = ("else", stack[-1][2][3], stack[-1][2])
+            elif keyword in ("endblock", "endif", "endset"):
+                expected = {"endblock": ("block",), "endif": ("if", "else"), "endset": ("set",)}[keyword]
+                if stack[-1][0] not in expected:
+                    raise TemplateError(f"{self.name}: '{keyword}' sin apertura")
+                stack.pop()
+            else:
+                raise TemplateError(f"{self.name}: etiqueta desconocida: {statement}")
+        if len(stack) > 1:
+            raise TemplateError(f"{self.name}: falta cerrar '{stack[-1][0]}'")
+        if pos < len(source):
+            root.append(("text", source[pos:]))
+        return root
+
+    def blocks(self):
+        return {node[1]: node[2] for node in self.nodes if node[0] == "block"}
+
+    def assignments(self):
+        """{variable: nodos de su valor} de los {% set %} de primer nivel"""
+        return {node[1]: node[2] for node in self.nodes if node[0] == "set"}
+
+
+class FragmentCache:
+    """Fragmentos renderizados por clave de entrada, en memoria y en disco"""
+
+    def __init__(self, cache_dir=FRAGMENT_CACHE_DIR, persistent=True):
+        self.cache_dir = cache_dir
+        self.persistent = persistent
+        self.memory = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.memory:
+                self.hits += 1
+                return self.memory[key]
+        path = os.path.join(self.cache_dir, key + ".html")
+        if self.persistent and os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                text = f.read()
+            with self.lock:
+                self.memory[key] = text
+                self.hits += 1
+            return text
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, text):
+        with self.lock:
+            self.memory[key] = text
+        if self.persistent:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = os.path.join(self.cache_dir, f"{key}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            os.replace(tmp_path, os.path.join(self.cache_dir, key + ".html"))
+
+
+class Renderer:
+    """Carga plantillas de un directorio y renderiza páginas con caché de fragmentos"""
+
+    def __init__(self, templates_dir=TEMPLATES_DIR, cache=None, site_vars=None):
+        self.templates_dir = templates_dir
+        self.cache = cache or FragmentCache()
+        self.site_vars = site_vars or {}
+        self.templates = {}
+        self.lock = threading.Lock()
+
+    def load(self, name):
+        with self.lock:
+            if name in self.templates:
+                return self.templates[name]
+        path = os.path.join(self.templates_dir, name)
+        if not os.path.isfile(path):
+            raise TemplateError(f"No existe la plantilla {name}")
+        template = Template(name, read_text(path))
+        with self.lock:
+            self.templates[name] = template
+        return template
+
+    def invalidate(self, names):
+        """Olvida las plantillas modificadas para volver a leerlas (modo watch)"""
+        with self.lock:
+            for name in names:
+                self.templates.pop(name, None)
+
+    def closure(self, name, seen=None):
+        """(hashes de la plantilla y de todo lo que incluye, variables que usan)"""
+        seen = seen if seen is not None else set()
+        if name in seen:
+            raise TemplateError(f"Inclusión circular de {name}")
+        seen = seen | {name}
+        template = self.load(name)
+        shas, names = [(name, template.sha)], set(template.names)
+        for include in sorted(template.includes):
+            sub_shas, sub_names = self.closure(include, seen)
+            shas.extend(sub_shas)
+            names |= sub_names
+        return shas, names
+
+    def dependencies(self, name):
+        """Plantillas de las que depende una página (ella, su layout y los parciales)"""
+        template = self.load(name)
+        names = {n for n, _ in self.closure(name)[0]}
+        if template.extends:
+            names |= self.dependencies(template.extends)
+        return names
+
+    def fragment(self, name, context):
+        """Renderiza un parcial, reutilizando el fragmento si sus entradas no han cambiado"""
+        shas, names = self.closure(name)
+        key_data = {"engine": ENGINE_VERSION, "sources": shas,
+                    "vars": {n: context.get(n) for n in sorted(names)}}
+        key = hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+        text = self.cache.get(key)
+        if text is None:
+            text = self._render_nodes(self.load(name).nodes, context, {}, name)
+            self.cache.put(key, text)
+        return text
+
+    def _render_nodes(self, nodes, context, blocks, name):
+        out = []
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                out.append(node[1])
+            elif kind == "var":
+                if node[1] not in context:
+                    raise TemplateError(f"{name}: variable no definida '{node[1]}'")
+                out.append(str(context[node[1]]))
+            elif kind == "include":
+                args = dict(node[2])
+                for key, ref in node[3].items():
+                    if ref not in context:
+                        raise TemplateError(f"{name}: variable no definida '{ref}'")
+                    args[key] = context[ref]
+                out.append(self.fragment(node[1], {**context, **args}))
+            elif kind == "block":
+                out.append(self._render_nodes(blocks.get(node[1], node[2]), context, blocks, name))
+            elif kind == "if":
+                left, op, literal, right = node[1]
+                value = context.get(left)
+                if op:
+                    other = literal if literal is not None else context.get(right)
+                    result = (value == other) if op == "==" else (value != other)
+                else:
+                    result = bool(value)
+                out.append(self._render_nodes(node[2] if result else node[3], context, blocks, name))
+        return "".join(out)
+
+    def render_page(self, page):
+        """Renderiza templates/pages/<page> dentro de su layout"""
+        name = f"{PAGES_SUBDIR}/{page}"
+        template = self.load(name)
+        if not template.extends:
+            raise TemplateError(f"{name}: una página debe empezar con {{% extends %}}")
+        layout = self.load(template.extends)
+        context = {**self.site_vars, "page": page, "nav_active": page}
+        # Los {% set %} del layout son los valores por defecto; los de la página mandan
+        for source in (layout, template):
+            for variable, nodes in source.assignments().items():
+                context[variable] = self._render_nodes(nodes, context, {}, source.name)
+        return self._render_nodes(layout.nodes, context, template.blocks(), template.extends)
+
+
+def list_template_pages(templates_dir=TEMPLATES_DIR):
+    pages_dir = os.path.join(templates_dir, PAGES_SUBDIR)
+    if not os.path.isdir(pages_dir):
+        return []
+    return sorted(n for n in os.listdir(pages_dir) if n.endswith(".html"))
+
+
+def site_variables(csp=None):
+    """Variables globales de todas las páginas (lo que sale de la política del sitio)"""
+    return {"security_meta": render_security_meta(csp=csp).rstrip("\n")}
+
+
+def pages_affected(changed_templates, renderer, pages=None):
+    """Páginas que dependen de alguna de las plantillas modificadas (rutas relativas a templates/)"""
+    pages = pages if pages is not None else list_template_pages(renderer.templates_dir)
+    changed = set(changed_templates)
+    return [p for p in pages if renderer.dependencies(f"{PAGES_SUBDIR}/{p}") & changed]
+
+
+def render_all(pages=None, write=True, jobs=None, renderer=None, root=ROOT_DIR):
+    """
+    Renderiza las páginas en paralelo y aplica las transformaciones de página
+
+    Returns:
+        {página: (contenido actual, contenido generado, ms de renderizado)}
+    """
+    renderer = renderer or Renderer(site_vars=site_variables())
+    pages = pages if pages is not None else list_template_pages(renderer.templates_dir)
+
+    def render(page):
+        started = time.perf_counter()
+        generated = renderer.render_page(page)
+        for _, transform in PAGE_TRANSFORMS:
+            generated = transform(generated, page)
+        elapsed = (time.perf_counter() - started) * 1000
+        full_path = os.path.join(root, page)
+        current = read_text(full_path) if os.path.exists(full_path) else None
+        if write and current != generated:
+            write_text(full_path, generated)
+        return page, (current, generated, elapsed)
+
+    with ThreadPoolExecutor(max_workers=jobs or min(8, len(pages) or 1)) as executor:
+        return dict(executor.map(render, pages))
+
+
+def update_page(page, html, edit=None, renderer=None, root=ROOT_DIR):
+    """
+    Guarda una página modificada por un script de optimización
+
+    Si la página sale de templates/ no se edita: `edit` (texto → texto) se
+    aplica a las plantillas de las que depende y la página se renderiza de
+    nuevo. Si el resultado no coincide con `html`, el cambio no está en las
+    plantillas ni en PAGE_TRANSFORMS y se perdería en el próximo renderizado
+
+    Returns:
+        True si la página queda con el contenido `html`
+    """
+    renderer = renderer or Renderer(site_vars=site_variables())
+    if page not in list_template_pages(renderer.templates_dir):
+        write_text(os.path.join(root, page), html)
+        return True
+    if edit:
+        edited = []
+        for name in sorted(renderer.dependencies(f"{PAGES_SUBDIR}/{page}")):
+            path = os.path.join(renderer.templates_dir, name)
+            text = read_text(path)
+            new_text = edit(text)
+            if new_text != text:
+                write_text(path, new_text)
+                edited.append(name)
+        renderer.invalidate(edited)
+    _, generated, _ = render_all([page], renderer=renderer, root=root)[page]
+    return generated == html
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Renderiza las páginas desde templates/")
+    parser.add_argument("pages", nargs="*", help="Páginas a renderizar (por defecto todas)")
+    parser.add_argument("--check", action="store_true",
+                        help="No escribir; salir con código 1 si alguna página no coincide con su plantilla")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Páginas renderizadas en paralelo")
+    parser.add_argument("--no-cache", action="store_true", help="No leer ni guardar fragmentos en .cache/")
+    args = parser.parse_args()
+
+    print("🧱 RENDERIZADO DE PÁGINAS DESDE PLANTILLAS")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    renderer = Renderer(cache=FragmentCache(persistent=not args.no_cache), site_vars=site_variables())
+    try:
+        results = render_all(args.pages or None, write=not args.check, jobs=args.jobs, renderer=renderer)
+    except TemplateError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    total_ms = (time.perf_counter() - started) * 1000
+
+    stale = []
+    for page, (current, generated, elapsed) in sorted(results.items()):
+        if current == generated:
+            print(f"  ✓ {page}: al día ({elapsed:.1f} ms)")
+        else:
+            stale.append(page)
+            print(f"  {'❌' if args.check else '✅'} {page}: {'desactualizada' if args.check else 'renderizada'} ({elapsed:.1f} ms)")
+
+    cache = renderer.cache
+    print(f"\n🧩 Fragmentos: {cache.hits} reutilizados, {cache.misses} renderizados")
+    print(f"⏱️ {len(results)} páginas en {total_ms:.1f} ms")
+
+    if args.check and stale:
+        print(f"\n🔧 Ejecute: python render_pages.py")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Generador del service worker (sw.js) con estrategias por ruta
+Compone sw.js a partir de SERVICE_WORKER_ROUTES (cache_policy.py): red
+primero con tiempo límite y navigation preload para el HTML, caché primero
+con límite LRU para las imágenes y stale-while-revalidate para CSS/JS.
+generate_headers.py lo regenera junto con `_headers`; este script comprueba
+las rutas y el resultado contra el servidor de previsualización local
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import threading
+import subprocess
+import urllib.request
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+from cache_policy import SERVICE_WORKER_ROUTES
+from site_refs import (ROOT_DIR, list_html_pages, read_text, extract_html_refs,
+                       extract_css_urls, is_local_url, to_site_path)
+from early_hints import critical_resources, site_url
+
+SERVICE_WORKER_FILE = "sw.js"
+
+CACHE_PREFIX = "josetraderx"
+
+STRATEGIES = ("network-first", "cache-first", "stale-while-revalidate")
+
+SW_NOTICE = "Generado por assets/images/generate_headers.py desde cache_policy.py - no editar a mano"
+
+SW_TEMPLATE = """\
+// __NOTICE__
+// Estrategias por ruta: SERVICE_WORKER_ROUTES en assets/images/cache_policy.py
+
+const CACHE_PREFIX = '__PREFIX__';
+const ROUTES = __ROUTES__;
+const PRECACHE = __PRECACHE__;
+const SIZE_HEADER = 'x-sw-size';
+
+for (const route of ROUTES) {
+  route.regexp = new RegExp(route.pattern);
+}
+
+function routeFor(request, url) {
+  return ROUTES.find(route =>
+    (route.navigate && request.mode === 'navigate') || route.regexp.test(url.pathname)) || null;
+}
+
+function cacheName(route) {
+  return `${CACHE_PREFIX}-${route.name}-${route.version}`;
+}
+
+// Guarda una copia con su tamaño en bytes (necesario para el límite LRU)
+async function putEntry(cache, request, response) {
+  const body = await response.blob();
+  const headers = new Headers(response.headers);
+  headers.set(SIZE_HEADER, String(body.size));
+  await cache.put(request, new Response(body, {
+    status: response.status,
+    statusText: response.statusText,
+    headers
+  }));
+}
+
+// Expulsa las entradas menos usadas: cache.keys() respeta el orden de inserción
+// y cada acierto se vuelve a insertar al final
+async function trimCache(route) {
+  if (!route.max_entries && !route.max_bytes) {
+    return;
+  }
+  const cache = await caches.open(cacheName(route));
+  const keys = await cache.keys();
+  const sizes = await Promise.all(keys.map(async key => {
+    const response = await cache.match(key);
+    return Number(response && response.headers.get(SIZE_HEADER)) || 0;
+  }));
+  let entries = keys.length;
+  let bytes = sizes.reduce((total, size) => total + size, 0);
+  for (let i = 0; i < keys.length; i++) {
+    if ((!route.max_entries || entries <= route.max_entries) && (!route.max_bytes || bytes <= route.max_bytes)) {
+      break;
+    }
+    await cache.delete(keys[i]);
+    entries -= 1;
+    bytes -= sizes[i];
+  }
+}
+
+async function cacheResponse(route, request, response) {
+  if (!response || !response.ok || response.type !== 'basic') {
+    return;
+  }
+  const cache = await caches.open(cacheName(route));
+  await putEntry(cache, request, response);
+  await trimCache(route);
+}
+
+function networkFirst(event, route) {
+  const request = event.request;
+  const network = Promise.resolve(event.preloadResponse)
+    .then(preloaded => preloaded || fetch(request));
+  // La copia se guarda aunque la respuesta llegue después del tiempo límite
+  event.waitUntil(network
+    .then(response => cacheResponse(route, request, response.clone()))
+    .catch(() => undefined));
+  const cached = caches.open(cacheName(route)).then(cache => cache.match(request));
+
+  // La copia en caché solo se usa si la red no responde a tiempo o falla
+  const timeout = new Promise(resolve => setTimeout(resolve, route.timeout_ms));
+  const fallback = timeout.then(() => cached).then(response => response || network);
+  return Promise.race([network, fallback])
+    .catch(() => cached.then(response => response || Response.error()));
+}
+
+async function cacheFirst(event, route) {
+  const request = event.request;
+  const cache = await caches.open(cacheName(route));
+  const cached = await cache.match(request);
+  if (cached) {
+    // Acierto: se reinserta para marcarlo como usado recientemente. La copia se
+    // toma antes de devolver la respuesta, cuyo cuerpo empieza a leerse enseguida
+    const copy = cached.clone();
+    event.waitUntil(cache.delete(request).then(() => cache.put(request, copy)));
+    return cached;
+  }
+  const response = await fetch(request);
+  event.waitUntil(cacheResponse(route, request, response.clone()));
+  return response;
+}
+
+async function staleWhileRevalidate(event, route) {
+  const request = event.request;
+  const cache = await caches.open(cacheName(route));
+  const cached = await cache.match(request);
+  const network = fetch(request).then(response => {
+    return cacheResponse(route, request, response.clone()).then(() => response);
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  return network;
+}
+
+const HANDLERS = {
+  'network-first': networkFirst,
+  'cache-first': cacheFirst,
+  'stale-while-revalidate': staleWhileRevalidate
+};
+
+self.addEventListener('install', event => {
+  event.waitUntil(Promise.all(ROUTES.map(async route => {
+    const cache = await caches.open(cacheName(route));
+    await Promise.all((PRECACHE[route.name] || []).map(async url => {
+      const request = new Request(url, { cache: 'reload' });
+      const response = await fetch(request);
+      if (!response.ok) {
+        throw new Error(`Precache: ${url} respondió ${response.status}`);
+      }
+      await putEntry(cache, request, response);
+    }));
+  })).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+  const current = ROUTES.map(cacheName);
+  event.waitUntil((async () => {
+    if (self.registration.navigationPreload) {
+      await self.registration.navigationPreload.enable();
+    }
+    const names = await caches.keys();
+    await Promise.all(names
+      .filter(name => name.startsWith(`${CACHE_PREFIX}-`) && !current.includes(name))
+      .map(name => caches.delete(name)));
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') {
+    return;
+  }
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+  const route = routeFor(request, url);
+  if (route) {
+    event.respondWith(HANDLERS[route.strategy](event, route));
+  }
+});
+"""
+
+
+def match_route(url_path, navigate=False, routes=SERVICE_WORKER_ROUTES):
+    """Ruta del service worker que atiende una URL (misma lógica que routeFor en sw.js)"""
+    for route in routes:
+        if (route.get("navigate") and navigate) or re.search(route["pattern"], url_path):
+            return route
+    return None
+
+
+def validate_routes(routes=SERVICE_WORKER_ROUTES):
+    """Errores de configuración de las rutas (vacío si son válidas)"""
+    errors = []
+    names = [route["name"] for route in routes]
+    for route in routes:
+        if route.get("strategy") not in STRATEGIES:
+            errors.append(f"{route['name']}: estrategia desconocida {route.get('strategy')!r}")
+        if route.get("strategy") == "network-first" and not route.get("timeout_ms"):
+            errors.append(f"{route['name']}: network-first requiere timeout_ms")
+        try:
+            re.compile(route["pattern"])
+        except re.error as e:
+            errors.append(f"{route['name']}: patrón inválido ({e})")
+        if re.search(r'\(\?[P<#]|\\[AZz]', route["pattern"]):
+            errors.append(f"{route['name']}: el patrón usa sintaxis exclusiva de Python")
+        if names.count(route["name"]) > 1:
+            errors.append(f"{route['name']}: nombre de ruta duplicado")
+    return errors
+
+
+def precache_urls(root=ROOT_DIR):
+    """
+    URLs a precargar en la instalación: las páginas y sus recursos críticos
+    (early_hints.py), solo los que existen
+
+    Returns:
+        {nombre de ruta: [URL, ...]}
+    """
+    urls = []
+    for page in list_html_pages(root):
+        urls.append("/" + page)
+        resources, _, _ = critical_resources(page, root)
+        for url, _, _ in resources:
+            if url not in urls:
+                urls.append(url)
+    if "/index.html" in urls:
+        urls.insert(0, "/")
+
+    precache = {}
+    for url in urls:
+        path = urlsplit(url).path
+        full_path = os.path.join(root, path.lstrip("/") or "index.html")
+        route = match_route(path, navigate=path.endswith(".html") or path == "/")
+        if route and os.path.isfile(full_path):
+            precache.setdefault(route["name"], []).append(url)
+    return precache
+
+
+def route_versions(precache, root=ROOT_DIR, routes=SERVICE_WORKER_ROUTES):
+    """
+    Versión de la caché de cada ruta: hash de su configuración y del contenido
+    de sus URLs precargadas; solo se descartan las cachés que han cambiado
+    """
+    versions = {}
+    for route in routes:
+        digest = hashlib.sha256(json.dumps(route, sort_keys=True).encode("utf-8"))
+        for url in precache.get(route["name"], []):
+            path = urlsplit(url).path.lstrip("/") or "index.html"
+            digest.update(url.encode("utf-8"))
+            with open(os.path.join(root, path), 'rb') as f:
+                digest.update(f.read())
+        versions[route["name"]] = digest.hexdigest()[:10]
+    return versions
+
+
+def render_service_worker(root=ROOT_DIR, routes=SERVICE_WORKER_ROUTES):
+    """Contenido de sw.js para la configuración de rutas"""
+    errors = validate_routes(routes)
+    if errors:
+        raise ValueError("Rutas del service worker inválidas:\n  " + "\n  ".join(errors))
+    precache = precache_urls(root)
+    versions = route_versions(precache, root, routes)
+    js_routes = [{
+        "name": route["name"],
+        "pattern": route["pattern"],
+        "navigate": bool(route.get("navigate")),
+        "strategy": route["strategy"],
+        "timeout_ms": route.get("timeout_ms"),
+        "max_entries": route.get("max_entries"),
+        "max_bytes": route.get("max_bytes"),
+        "version": versions[route["name"]],
+    } for route in routes]
+    return (SW_TEMPLATE
+            .replace("__NOTICE__", SW_NOTICE)
+            .replace("__PREFIX__", CACHE_PREFIX)
+            .replace("__ROUTES__", json.dumps(js_routes, indent=2, ensure_ascii=False))
+            .replace("__PRECACHE__", json.dumps(precache, indent=2)))
+
+
+def site_requests(root=ROOT_DIR):
+    """
+    Peticiones del propio origen que hacen las páginas
+
+    Returns:
+        {URL: navegación (True para los enlaces a páginas)}
+    """
+    requests = {}
+    for page in list_html_pages(root):
+        requests["/" + page] = True
+        html = read_text(os.path.join(root, page))
+        for kind, url, _ in extract_html_refs(html):
+            if not is_local_url(url):
+                continue
+            local = site_url(url, page)
+            if not local:
+                continue
+            requests.setdefault(local, kind == "page")
+            path = to_site_path(url, page)
+            if kind == "css" and path and os.path.isfile(os.path.join(root, path)):
+                for css_url in extract_css_urls(read_text(os.path.join(root, path))):
+                    if is_local_url(css_url) and site_url(css_url, path):
+                        requests.setdefault(site_url(css_url, path), False)
+    return requests
+
+
+def fetch(base_url, path):
+    """(código, cabeceras, cuerpo) de una petición GET"""
+    try:
+        with urllib.request.urlopen(base_url + path, timeout=10) as response:
+            return response.status, response.headers, response.read()
+    except HTTPError as e:
+        return e.code, e.headers, b""
+
+
+def verify_with_preview_server(expected, precache):
+    """
+    Sirve el sitio con preview_server.py en un puerto libre y comprueba sw.js
+    y las URLs precargadas tal como las pediría el navegador
+
+    Returns:
+        Lista de problemas encontrados
+    """
+    from preview_server import create_server
+
+    problems = []
+    server = create_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        status, headers, body = fetch(base_url, "/" + SERVICE_WORKER_FILE)
+        cache_control = headers.get("Cache-Control", "")
+        content_type = headers.get("Content-Type", "")
+        print(f"  /{SERVICE_WORKER_FILE}: {status}, {content_type}, Cache-Control: {cache_control}")
+        if status != 200:
+            problems.append(f"/{SERVICE_WORKER_FILE} respondió {status}")
+        if "javascript" not in content_type:
+            problems.append(f"/{SERVICE_WORKER_FILE} se sirve como {content_type or 'sin tipo'}")
+        if "no-cache" not in cache_control and "no-store" not in cache_control:
+            problems.append(f"/{SERVICE_WORKER_FILE} es cacheable por HTTP ({cache_control or 'sin Cache-Control'})")
+        if body.decode("utf-8").replace("\r\n", "\n") != expected:
+            problems.append(f"/{SERVICE_WORKER_FILE} servido no coincide con el generado")
+
+        total = 0
+        for name, urls in precache.items():
+            for url in urls:
+                status, _, _ = fetch(base_url, url)
+                total += 1
+                if status != 200:
+                    problems.append(f"precache {url} respondió {status}: la instalación fallaría")
+        print(f"  {total} URLs precargadas comprobadas")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return problems
+
+
+def check_syntax(path):
+    """Valida la sintaxis de sw.js con node si está disponible (None si no lo está)"""
+    node = shutil.which("node")
+    if not node:
+        return None
+    result = subprocess.run([node, "--check", path], capture_output=True, text=True)
+    return result.stderr.strip() if result.returncode else ""
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Comprueba las rutas de sw.js contra el servidor de previsualización")
+    parser.parse_args()
+
+    print("🧭 SERVICE WORKER: ESTRATEGIAS POR RUTA")
+    print("=" * 70)
+
+    try:
+        expected = render_service_worker()
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    problems = []
+    sw_path = os.path.join(ROOT_DIR, SERVICE_WORKER_FILE)
+    if not os.path.isfile(sw_path) or read_text(sw_path) != expected:
+        problems.append(f"{SERVICE_WORKER_FILE} desactualizado: ejecute generate_headers.py")
+
+    print("\n📋 RUTAS:")
+    for route in SERVICE_WORKER_ROUTES:
+        limits = []
+        if route.get("timeout_ms"):
+            limits.append(f"timeout {route['timeout_ms']} ms")
+        if route.get("max_entries"):
+            limits.append(f"máx. {route['max_entries']} entradas")
+        if route.get("max_bytes"):
+            limits.append(f"máx. {route['max_bytes'] / 1024 / 1024:.0f} MB")
+        print(f"  • {route['name']:<8} {route['strategy']:<23} {route['pattern']}"
+              + (f" ({', '.join(limits)})" if limits else ""))
+
+    # Reparto de las peticiones reales del sitio entre las rutas
+    counts, unrouted = {}, []
+    for url, navigate in sorted(site_requests().items()):
+        route = match_route(urlsplit(url).path, navigate=navigate)
+        if route:
+            counts[route["name"]] = counts.get(route["name"], 0) + 1
+        else:
+            unrouted.append(url)
+    print("\n🔀 PETICIONES DEL SITIO POR RUTA:")
+    for route in SERVICE_WORKER_ROUTES:
+        print(f"  {route['name']:<8} {counts.get(route['name'], 0):>4}")
+    for url in unrouted:
+        print(f"  ⏭️ solo red: {url}")
+
+    precache = precache_urls()
+    for route in SERVICE_WORKER_ROUTES:
+        urls = precache.get(route["name"], [])
+        if route.get("max_entries") and len(urls) > route["max_entries"]:
+            problems.append(f"{route['name']}: {len(urls)} URLs precargadas superan max_entries")
+        if route.get("max_bytes"):
+            size = sum(os.path.getsize(os.path.join(ROOT_DIR, urlsplit(u).path.lstrip("/"))) for u in urls)
+            if size > route["max_bytes"]:
+                problems.append(f"{route['name']}: {size} bytes precargados superan max_bytes")
+
+    print("\n🌐 SERVIDOR DE PREVISUALIZACIÓN:")
+    problems.extend(verify_with_preview_server(expected, precache))
+
+    syntax = check_syntax(sw_path)
+    if syntax is None:
+        print("  ⏭️ node no está instalado: sintaxis de sw.js sin comprobar")
+    elif syntax:
+        problems.append(f"error de sintaxis en {SERVICE_WORKER_FILE}: {syntax}")
+    else:
+        print(f"  ✓ Sintaxis de {SERVICE_WORKER_FILE} válida (node --check)")
+
+    if problems:
+        print("\n❌ PROBLEMAS:")
+        for problem in problems:
+            print(f"  • {problem}")
+        sys.exit(1)
+    print(f"\n🎉 {SERVICE_WORKER_FILE} al día y coherente con el servidor local")
+
+
+if __name__ == "__main__":
+    main()
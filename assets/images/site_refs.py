@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Utilidades compartidas para localizar las páginas del sitio y extraer
+las referencias a recursos (CSS, JS, imágenes, fuentes) desde HTML y CSS
+"""
+
+import os
+import re
+import glob
+import fnmatch
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, unquote
+
+# Raíz del proyecto (los scripts viven en assets/images/)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# Orígenes que apuntan al propio sitio (p. ej. og:image absoluto)
+SITE_ORIGINS = ("https://www.josetraderx.com", "https://josetraderx.com")
+
+# Directorios de la raíz que no se publican: el artefacto, la caché de los
+# scripts y las plantillas de las que render_pages.py genera las páginas
+UNPUBLISHED_DIRS = ("dist", ".cache", "templates")
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+CSS_IMPORT_PATTERN = re.compile(r'@import\s+([\'"])([^\'"]+)\1')
+# Rutas del sitio escritas como literales en JS (p. ej. la lista de precache de sw.js)
+JS_PATH_PATTERN = re.compile(
+    r'[\'"`](/?(?:assets|vendor)/[^\'"`\s]+|/[\w.-]*\.html|/)[\'"`]'
+)
+
+
+def list_html_pages(root=ROOT_DIR):
+    """Devuelve las páginas HTML de la raíz del sitio, ordenadas"""
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(root, "*.html")))
+
+
+def load_gitignore_patterns(root=ROOT_DIR):
+    """Lee los patrones simples del .gitignore de la raíz (sin negaciones)"""
+    path = os.path.join(root, ".gitignore")
+    if not os.path.exists(path):
+        return []
+    patterns = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith(("#", "!")):
+                patterns.append(line.rstrip("/"))
+    return patterns
+
+
+def is_ignored(rel_path, patterns):
+    """Indica si una ruta relativa coincide con algún patrón de .gitignore"""
+    name = rel_path.rsplit("/", 1)[-1]
+    for pattern in patterns:
+        if pattern.startswith("/"):
+            if fnmatch.fnmatchcase(rel_path, pattern[1:]):
+                return True
+        elif fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(rel_path, pattern):
+            return True
+    return False
+
+
+def iter_site_files(root=ROOT_DIR, skip_dirs=UNPUBLISHED_DIRS):
+    """
+    Recorre los archivos publicables del sitio
+
+    Returns:
+        Rutas relativas a la raíz con "/" como separador, ordenadas.
+        Omite archivos y directorios ocultos, __pycache__, lo ignorado
+        por .gitignore y skip_dirs (de la raíz).
+    """
+    ignored = load_gitignore_patterns(root)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        dirnames[:] = [d for d in dirnames
+                       if not d.startswith(".") and d != "__pycache__"
+                       and not (rel_dir == "." and d in skip_dirs)]
+        for name in filenames:
+            if name.startswith("."):
+                continue
+            rel_path = os.path.normpath(os.path.join(rel_dir, name)).replace(os.sep, "/")
+            if not is_ignored(rel_path, ignored):
+                found.append(rel_path)
+    return sorted(found)
+
+
+def read_text(path):
+    """Lee un archivo de texto en UTF-8 tolerando bytes inválidos"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def detect_newline(path):
+    """Devuelve el fin de línea usado por un archivo ("\r\n" o "\n")"""
+    with open(path, 'rb') as f:
+        return "\r\n" if b"\r\n" in f.read(65536) else "\n"
+
+
+def write_text(path, content, newline=None):
+    """
+    Escribe un archivo de texto en UTF-8 conservando su fin de línea original
+
+    Args:
+        path: Ruta del archivo
+        content: Contenido con saltos de línea "\n"
+        newline: Fin de línea a forzar; por defecto el del archivo existente
+    """
+    if newline is None:
+        newline = detect_newline(path) if os.path.exists(path) else "\n"
+    with open(path, 'w', encoding='utf-8', newline=newline) as f:
+        f.write(content)
+
+
+def is_local_url(url):
+    """Indica si una URL apunta a un recurso servido por el propio sitio"""
+    url = url.strip()
+    if not url or url.startswith(("#", "data:", "mailto:", "tel:", "javascript:", "about:")):
+        return False
+    if url.startswith(SITE_ORIGINS):
+        return True
+    parts = urlsplit(url)
+    return not parts.scheme and not parts.netloc
+
+
+def to_site_path(url, base_path=""):
+    """
+    Convierte una referencia en una ruta relativa a la raíz del sitio
+
+    Args:
+        url: Referencia tal como aparece en el HTML/CSS
+        base_path: Ruta (relativa a la raíz) del archivo que contiene la referencia
+
+    Returns:
+        Ruta normalizada sin query ni fragmento (p. ej. "assets/css/owl.css"),
+        o None si la referencia no es local
+    """
+    if not is_local_url(url):
+        return None
+    url = url.strip()
+    for origin in SITE_ORIGINS:
+        if url.startswith(origin):
+            url = url[len(origin):] or "/"
+            break
+    path = unquote(urlsplit(url).path)
+    if not path:
+        return None
+    if path.startswith("/"):
+        resolved = path.lstrip("/")
+    else:
+        resolved = os.path.join(os.path.dirname(base_path), path)
+    resolved = os.path.normpath(resolved).replace(os.sep, "/")
+    if resolved.startswith(".."):
+        return None
+    if resolved in ("", "."):
+        return "index.html"
+    return resolved
+
+
+def extract_css_urls(css_text):
+    """Extrae las URLs de url(...) e @import de una hoja de estilos"""
+    urls = [m.group(2).strip() for m in CSS_URL_PATTERN.finditer(css_text)]
+    urls.extend(m.group(2).strip() for m in CSS_IMPORT_PATTERN.finditer(css_text))
+    return [u for u in urls if not u.startswith("data:")]
+
+
+def extract_js_refs(js_text):
+    """Extrae las rutas locales escritas como literales en un script (assets/, vendor/, *.html)"""
+    return [m.group(1) for m in JS_PATH_PATTERN.finditer(js_text)]
+
+
+class ResourceRefParser(HTMLParser):
+    """Recorre un documento HTML y recoge las referencias a subrecursos"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.refs = []
+        self._in_style = False
+
+    def _add(self, kind, url, tag):
+        if url and url.strip():
+            self.refs.append((kind, url.strip(), tag))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "link":
+            rel = (attrs.get("rel") or "").lower()
+            as_attr = (attrs.get("as") or "").lower()
+            if "stylesheet" in rel or as_attr == "style":
+                self._add("css", attrs.get("href"), tag)
+            elif "preload" in rel or "icon" in rel or "manifest" in rel:
+                self._add(as_attr or "other", attrs.get("href"), tag)
+        elif tag == "script":
+            self._add("js", attrs.get("src"), tag)
+        elif tag in ("img", "source", "video", "audio", "input"):
+            self._add("image", attrs.get("src"), tag)
+            self._add("image", attrs.get("poster"), tag)
+            srcset = attrs.get("srcset") or ""
+            for candidate in srcset.split(","):
+                self._add("image", candidate.strip().split(" ")[0], tag)
+        elif tag == "meta":
+            prop = (attrs.get("property") or attrs.get("name") or "").lower()
+            if prop in ("og:image", "twitter:image"):
+                self._add("image", attrs.get("content"), tag)
+        elif tag == "style":
+            self._in_style = True
+        style = attrs.get("style")
+        if style:
+            for url in extract_css_urls(style):
+                self._add("image", url, tag)
+        # Fondos diferidos que un script aplica tras la carga (p. ej. el Modern-Slider)
+        self._add("lazy-image", attrs.get("data-bg"), tag)
+
+    def handle_endtag(self, tag):
+        if tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            for url in extract_css_urls(data):
+                self._add("image", url, "style")
+
+
+def extract_html_refs(html_text):
+    """
+    Extrae las referencias a subrecursos de un documento HTML
+
+    Returns:
+        Lista de tuplas (tipo, url, etiqueta) en orden de aparición
+    """
+    parser = ResourceRefParser()
+    parser.feed(html_text)
+    parser.close()
+    return parser.refs
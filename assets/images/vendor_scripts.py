@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Script para servir jQuery y Bootstrap desde vendor/ en lugar de los CDN
+Analiza qué API de jQuery usan los scripts del sitio (ajax, efectos...),
+elige la compilación local más pequeña que las cubre (p. ej. jquery.slim),
+reescribe las etiquetas <script> de los CDN a la copia local, quita las
+copias remotas de librerías que el sitio ya incluye empaquetadas e informa
+de los bytes y conexiones ahorrados y de los orígenes que sobran en la CSP.
+No reescribe un script a una copia local más antigua que la del CDN. En las
+páginas generadas desde templates/ la reescritura se hace en las plantillas
+"""
+
+import os
+import re
+import sys
+import argparse
+import urllib.request
+from urllib.error import URLError
+from urllib.parse import urlsplit
+
+from cache_policy import CONTENT_SECURITY_POLICY
+from site_refs import (ROOT_DIR, list_html_pages, read_text,
+                       extract_html_refs, is_local_url, to_site_path)
+from render_pages import update_page
+
+# Scripts de librerías servidos desde CDN: (librería, patrón de la URL con la versión)
+REMOTE_SCRIPTS = [
+    ("jquery", re.compile(r'^https://code\.jquery\.com/jquery-(\d+\.\d+\.\d+)(?:\.slim)?(?:\.min)?\.js$')),
+    ("jquery-ui", re.compile(r'^https://code\.jquery\.com/ui/(\d+\.\d+\.\d+)/jquery-ui(?:\.effects)?(?:\.min)?\.js$')),
+    ("bootstrap", re.compile(r'^https://cdn\.jsdelivr\.net/npm/bootstrap@(\d+\.\d+\.\d+)/dist/js/bootstrap(?:\.bundle)?(?:\.min)?\.js$')),
+]
+
+# Compilaciones locales candidatas. Los módulos excluidos de jQuery se leen de
+# la cabecera del archivo ("/*! jQuery v3.7.1 -ajax,-effects,... |")
+LOCAL_BUILDS = {
+    "jquery": [
+        {"path": "vendor/jquery/jquery.slim.min.js"},
+        {"path": "vendor/jquery/jquery.min.js"},
+    ],
+    "bootstrap": [
+        {"path": "vendor/bootstrap/js/bootstrap.min.js", "excludes": ["popper"]},
+        {"path": "vendor/bootstrap/js/bootstrap.bundle.min.js", "excludes": []},
+    ],
+}
+
+# Librerías que el sitio ya incluye empaquetadas en un script propio: la copia
+# remota sobra en las páginas que cargan ese script (accordions.js lleva jQuery UI)
+BUNDLED_LIBRARIES = {
+    "jquery-ui": ["assets/js/accordions.js", "assets/js/accordions.min.js"],
+}
+
+VERSION_PATTERNS = {
+    "jquery": re.compile(r'jQuery v(\d+\.\d+\.\d+)'),
+    "jquery-ui": re.compile(r'jQuery UI - v(\d+\.\d+\.\d+)'),
+    "bootstrap": re.compile(r'Bootstrap v(\d+\.\d+\.\d+)'),
+}
+
+# API de jQuery 1.x/2.x eliminadas en jQuery 3 que una librería empaquetada
+# no puede usar si se sustituye su copia remota por la del script propio
+JQUERY3_REMOVED_APIS = re.compile(r'\.(?:size|andSelf)\(\s*\)|\.(?:context|selector)\b(?!\s*[:=])'
+                                  r'|\.(?:load|unload|error)\(\s*function\b|\.toggle\(\s*function\b'
+                                  r'|(?:\$|jQuery)\.(?:browser|sub)\b|jQuery\.event\.(?:props|fixHooks)\b')
+
+# Módulos renombrados en compilaciones posteriores (jQuery 3.5 movió los alias
+# .ajaxStart()... de event/ajax a deprecated/ajax-event-alias)
+MODULE_ALIASES = {
+    "event/ajax": ["deprecated/ajax-event-alias"],
+}
+
+JQUERY_HEADER_PATTERN = re.compile(r'/\*!\s*jQuery v[\d.]+((?:\s*,?-[\w/]+)*)\s*\|')
+
+# Uso de cada módulo opcional de jQuery en el código fuente
+JQUERY_MODULE_USAGE = {
+    "ajax": re.compile(r'(?:\$|jQuery)\.(?:ajax|get|post|getJSON|getScript|ajaxSetup|ajaxPrefilter|ajaxTransport)\s*\('
+                       r'|\.load\(\s*[\'"]'),
+    "event/ajax": re.compile(r'\.ajax(?:Start|Stop|Complete|Error|Success|Send)\s*\('),
+    "effects": re.compile(r'\.(?:animate|fadeIn|fadeOut|fadeTo|fadeToggle|slideUp|slideDown|slideToggle'
+                          r'|stop|finish|delay)\s*\('
+                          r'|\.(?:show|hide|toggle)\(\s*(?:[\'"](?:slow|fast)|\d|\{)'
+                          r'|(?:\$|jQuery)\.(?:fx|speed|Animation|Tween)\b|:animated\b'),
+}
+
+# Plugins de Bootstrap que necesitan Popper (solo incluido en bootstrap.bundle)
+POPPER_USAGE = re.compile(r'data-toggle="(?:dropdown|tooltip|popover)"|\.(?:dropdown|tooltip|popover)\s*\(')
+
+# Código propio del sitio (las librerías como jQuery UI definen sus propios .tooltip())
+SITE_SCRIPTS = ["assets/js/custom.js"]
+
+SCRIPT_TAG_PATTERN = re.compile(r'[ \t]*<script\b[^>]*?\ssrc="([^"]+)"[^>]*>\s*</script>[ \t]*\n?', re.IGNORECASE)
+INLINE_SCRIPT_PATTERN = re.compile(r'<script\b(?![^>]*\ssrc=)[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+
+
+def identify_script(url, page):
+    """
+    Librería a la que corresponde un script
+
+    Returns:
+        (librería o None, versión remota o None)
+    """
+    for library, pattern in REMOTE_SCRIPTS:
+        match = pattern.match(url)
+        if match:
+            return library, match.group(1)
+    path = to_site_path(url, page) if is_local_url(url) else None
+    for library, builds in LOCAL_BUILDS.items():
+        if path in [build["path"] for build in builds]:
+            return library, None
+    return None, None
+
+
+def build_excludes(build, root=ROOT_DIR):
+    """Módulos que le faltan a una compilación local"""
+    if "excludes" in build:
+        return set(build["excludes"])
+    with open(os.path.join(root, build["path"]), 'r', encoding='utf-8') as f:
+        match = JQUERY_HEADER_PATTERN.search(f.read(512))
+    if not match:
+        return set()
+    return {m.strip().lstrip("-") for m in match.group(1).split(",") if m.strip()}
+
+
+def local_version(library, path, root=ROOT_DIR):
+    pattern = VERSION_PATTERNS.get(library)
+    with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+        match = pattern.search(f.read(512)) if pattern else None
+    return match.group(1) if match else None
+
+
+def is_older(version, other):
+    """Indica si `version` es anterior a `other` ("3.3.1" < "3.5.1")"""
+    return tuple(map(int, version.split("."))) < tuple(map(int, other.split(".")))
+
+
+def bundled_incompatibilities(path, root=ROOT_DIR):
+    """Usos en un script empaquetado de API que jQuery 3 ya no tiene: [(línea, código)]"""
+    text = read_text(os.path.join(root, source_for(path, root)))
+    return [(line, code) for _, line, code in _usages(JQUERY3_REMOVED_APIS, text, path)]
+
+
+def source_for(path, root=ROOT_DIR):
+    """Para un .min.js con su fuente al lado se analiza la fuente (conserva `$` y `jQuery`)"""
+    if path.endswith(".min.js"):
+        source = path[:-len(".min.js")] + ".js"
+        if os.path.isfile(os.path.join(root, source)):
+            return source
+    return path
+
+
+def _usages(pattern, text, name):
+    usages = []
+    for match in pattern.finditer(text):
+        line = text.count("\n", 0, match.start()) + 1
+        usages.append((name, line, match.group(0).strip()))
+    return usages
+
+
+def analyze_usage(pages_html, root=ROOT_DIR):
+    """
+    Busca en los scripts que cargan las páginas (propios y de librerías, no
+    jQuery/Bootstrap) y en los scripts en línea las API opcionales que usan
+
+    Returns:
+        ({módulo: [(archivo, línea, código)]}, scripts remotos desconocidos)
+    """
+    sources, unknown = {}, set()
+    for page, html in pages_html.items():
+        for match in INLINE_SCRIPT_PATTERN.finditer(html):
+            sources.setdefault(f"{page} (en línea)", []).append(match.group(1))
+        for match in SCRIPT_TAG_PATTERN.finditer(html):
+            url = match.group(1)
+            library, _ = identify_script(url, page)
+            if library:
+                continue
+            if not is_local_url(url):
+                unknown.add(url)
+                continue
+            path = to_site_path(url, page)
+            if path and not path.startswith("vendor/") and os.path.isfile(os.path.join(root, path)):
+                source = source_for(path, root)
+                sources.setdefault(source, [read_text(os.path.join(root, source))])
+
+    usage = {}
+    for name, texts in sorted(sources.items()):
+        for text in texts:
+            for module, pattern in JQUERY_MODULE_USAGE.items():
+                usage.setdefault(module, []).extend(_usages(pattern, text, name))
+            if name in SITE_SCRIPTS or name.endswith("(en línea)"):
+                usage.setdefault("popper", []).extend(_usages(POPPER_USAGE, text, name))
+    for page, html in pages_html.items():
+        usage.setdefault("popper", []).extend(_usages(POPPER_USAGE, INLINE_SCRIPT_PATTERN.sub("", html), page))
+    return {module: found for module, found in usage.items() if found}, sorted(unknown)
+
+
+def _satisfies(excludes, required):
+    modules = set(required)
+    for module in required:
+        modules.update(MODULE_ALIASES.get(module, []))
+    return not any(e == m or e.startswith(m + "/") for e in excludes for m in modules)
+
+
+def choose_builds(required, conservative=False, root=ROOT_DIR):
+    """
+    Compilación local más pequeña de cada librería que cubre los módulos usados
+
+    Args:
+        required: Módulos necesarios
+        conservative: Hay scripts remotos sin analizar: se elige la compilación completa
+    """
+    chosen = {}
+    for library, builds in LOCAL_BUILDS.items():
+        candidates = sorted((b for b in builds if os.path.isfile(os.path.join(root, b["path"]))),
+                            key=lambda b: os.path.getsize(os.path.join(root, b["path"])))
+        if not candidates:
+            continue
+        if conservative and library == "jquery":
+            chosen[library] = min(candidates, key=lambda b: len(build_excludes(b, root)))["path"]
+            continue
+        chosen[library] = next((b["path"] for b in candidates if _satisfies(build_excludes(b, root), required)),
+                               candidates[-1]["path"])
+    return chosen
+
+
+def loaded_scripts(page, html):
+    """Scripts locales (rutas relativas a la raíz) que carga una página"""
+    return {to_site_path(m.group(1), page) for m in SCRIPT_TAG_PATTERN.finditer(html) if is_local_url(m.group(1))}
+
+
+def rewrite_page(page, html, chosen, root=ROOT_DIR, loaded=None):
+    """
+    Reescribe los <script> de jQuery/Bootstrap a la compilación elegida y quita
+    las copias remotas de librerías empaquetadas en scripts que la página ya carga.
+    Un script del CDN no se reescribe si la copia local es más antigua (acción
+    "anterior"): volvería a servir versiones con vulnerabilidades ya corregidas
+
+    Args:
+        loaded: Scripts locales de la página completa, si `html` es solo una
+            de sus plantillas (por defecto, los que carga `html`)
+
+    Returns:
+        (nuevo HTML, [(acción, URL anterior, URL nueva)])
+    """
+    loaded = loaded if loaded is not None else loaded_scripts(page, html)
+    page_dir = os.path.dirname(page) or "."
+    changes = []
+
+    def replace(match):
+        url = match.group(1)
+        library, version = identify_script(url, page)
+        if library in chosen:
+            new_url = os.path.relpath(chosen[library], page_dir).replace(os.sep, "/")
+            local = local_version(library, chosen[library], root)
+            if version and (not local or is_older(local, version)):
+                changes.append(("anterior", url, f"{chosen[library]} (v{local or '?'})"))
+                return match.group(0)
+            if new_url != url:
+                changes.append(("local", url, new_url))
+                return match.group(0).replace(f'src="{url}"', f'src="{new_url}"')
+        elif library in BUNDLED_LIBRARIES and loaded.intersection(BUNDLED_LIBRARIES[library]):
+            changes.append(("duplicado", url, None))
+            return ""
+        return match.group(0)
+
+    return SCRIPT_TAG_PATTERN.sub(replace, html), changes
+
+
+def remote_size(url):
+    """Tamaño de un recurso remoto con una petición HEAD (None si no se puede obtener)"""
+    try:
+        request = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(request, timeout=10) as response:
+            length = response.headers.get("Content-Length")
+            return int(length) if length else None
+    except (URLError, OSError, ValueError):
+        return None
+
+
+def script_size(url, page, remote=False, root=ROOT_DIR):
+    """
+    Bytes de un script: el archivo local, el remoto (con --remote) o, para
+    jQuery/Bootstrap, la copia local de la misma variante como estimación
+    """
+    if is_local_url(url):
+        path = to_site_path(url, page)
+        full_path = os.path.join(root, path) if path else None
+        return os.path.getsize(full_path) if full_path and os.path.isfile(full_path) else None
+    if remote:
+        return remote_size(url)
+    library, _ = identify_script(url, page)
+    if library in LOCAL_BUILDS:
+        name = re.sub(r'-\d+\.\d+\.\d+', "", os.path.basename(urlsplit(url).path))
+        equivalent = os.path.join(root, os.path.dirname(LOCAL_BUILDS[library][0]["path"]), name)
+        if os.path.isfile(equivalent):
+            return os.path.getsize(equivalent)
+    return None
+
+
+def external_origins(html, scripts_only=False):
+    origins = set()
+    for kind, url, _ in extract_html_refs(html):
+        if scripts_only and kind != "js":
+            continue
+        if not is_local_url(url) and urlsplit(url).scheme in ("http", "https"):
+            origins.add(f"{urlsplit(url).scheme}://{urlsplit(url).netloc}")
+    return origins
+
+
+def page_scripts(html):
+    return [m.group(1) for m in SCRIPT_TAG_PATTERN.finditer(html)]
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Sirve jQuery/Bootstrap desde vendor/ con la compilación mínima")
+    parser.add_argument("--check", action="store_true", help="Solo informar, sin modificar archivos")
+    parser.add_argument("--remote", action="store_true",
+                        help="Medir los scripts de los CDN con peticiones HEAD (requiere red)")
+    args = parser.parse_args()
+
+    print("📦 JQUERY Y BOOTSTRAP DESDE VENDOR/")
+    print("=" * 70)
+
+    pages = list_html_pages()
+    pages_html = {page: read_text(os.path.join(ROOT_DIR, page)) for page in pages}
+
+    usage, unknown = analyze_usage(pages_html)
+    print("\n🔍 API OPCIONALES EN USO:")
+    for module in list(JQUERY_MODULE_USAGE) + ["popper"]:
+        found = usage.get(module, [])
+        print(f"  {'✓' if found else '·'} {module:<12} {len(found)} usos")
+        for name, line, code in found[:3]:
+            print(f"      {name}:{line}  {code}")
+    for url in unknown:
+        print(f"  ⚠️ Script remoto sin analizar: {url} (se mantiene jQuery completo)")
+
+    chosen = choose_builds(set(usage), conservative=bool(unknown))
+    print("\n✅ COMPILACIONES ELEGIDAS:")
+    for library, path in chosen.items():
+        size = os.path.getsize(os.path.join(ROOT_DIR, path))
+        print(f"  • {library:<10} {path} ({size / 1024:.1f} KB, v{local_version(library, path) or '?'})")
+
+    problems = []
+    totals = {"before": 0, "after": 0, "connections": 0, "unknown": 0, "changed": 0}
+    remote_versions = {}
+    refused = []
+    print(f"\n📄 POR PÁGINA:")
+    print(f"{'Página':<28}{'JS antes':>12}{'JS después':>12}{'Ahorro':>10}{'Conexiones':>12}")
+    print("-" * 74)
+    new_pages = {}
+    for page in pages:
+        html = pages_html[page]
+        new_html, changes = rewrite_page(page, html, chosen)
+        new_pages[page] = new_html
+        for url in page_scripts(html):
+            library, version = identify_script(url, page)
+            if version:
+                remote_versions.setdefault(library, set()).add(version)
+
+        sizes_before = [script_size(u, page, args.remote) for u in page_scripts(html)]
+        sizes_after = [script_size(u, page, args.remote) for u in page_scripts(new_html)]
+        before = sum(s for s in sizes_before if s)
+        after = sum(s for s in sizes_after if s)
+        totals["unknown"] += sizes_before.count(None)
+        connections = len(external_origins(html) - external_origins(new_html))
+        totals["before"] += before
+        totals["after"] += after
+        totals["connections"] += connections
+        print(f"{page:<28}{before / 1024:>10.1f}KB{after / 1024:>10.1f}KB{(before - after) / 1024:>8.1f}KB{-connections:>12}")
+        for action, old, new in changes:
+            if action == "anterior":
+                refused.append((page, old, new))
+                print(f"    ⛔ {old} (la copia local {new} es anterior)")
+                continue
+            totals["changed"] += 1
+            print(f"    {'🔁' if action == 'local' else '🗑️'} {old}" + (f" → {new}" if new else " (ya incluido en un script local)"))
+
+    for page, old, new in refused:
+        problems.append(f"{page}: {old} no se reescribe, la copia local {new} es anterior; "
+                        f"actualice vendor/ a la versión del CDN o posterior")
+
+    # Librerías que las páginas reciben empaquetadas en un script propio: deben
+    # funcionar con el jQuery que se carga (antes lo garantizaba la copia del CDN)
+    site_scripts = {to_site_path(u, page) for page in pages for u in page_scripts(new_pages[page]) if is_local_url(u)}
+    for library, scripts in sorted(BUNDLED_LIBRARIES.items()):
+        if not site_scripts.intersection(scripts):
+            continue
+        bundled = scripts[0]
+        version = local_version(library, bundled)
+        remote = f"v{', v'.join(sorted(remote_versions[library]))} del CDN → " if library in remote_versions else ""
+        print(f"\n📎 {library}: {remote}v{version or '?'} empaquetada en {bundled}")
+        jquery = local_version("jquery", chosen["jquery"]) if "jquery" in chosen else None
+        incompatible = bundled_incompatibilities(bundled)
+        for line, code in incompatible[:5]:
+            print(f"  ❌ {source_for(bundled)}:{line}  {code}")
+        if incompatible:
+            problems.append(f"{bundled} usa {len(incompatible)} API eliminadas en jQuery 3 (se carga jQuery v{jquery})")
+        else:
+            print(f"  ✓ Sin API eliminadas en jQuery 3 (se carga jQuery v{jquery or '?'})")
+
+    # La CSP solo debe admitir los orígenes de los scripts que siguen siendo remotos
+    script_origins = set()
+    for html in new_pages.values():
+        script_origins |= external_origins(html, scripts_only=True)
+    allowed = [s for s in CONTENT_SECURITY_POLICY.get("script-src", []) if s.startswith("https://")]
+    print(f"\n🛡️ CSP script-src:")
+    for source in allowed:
+        if source in script_origins:
+            print(f"  ✓ {source}: en uso")
+        else:
+            print(f"  ❌ {source}: ya no se usa, quítelo de cache_policy.py")
+            problems.append(f"script-src admite {source} sin que ninguna página cargue scripts de ahí")
+    for origin in sorted(script_origins - set(allowed)):
+        print(f"  ⚠️ {origin}: la página lo carga pero la CSP lo bloquea")
+
+    if not args.check and not refused:
+        for page in pages:
+            if new_pages[page] == pages_html[page]:
+                continue
+            loaded = loaded_scripts(page, pages_html[page])
+            edit = lambda text, page=page, loaded=loaded: rewrite_page(page, text, chosen, loaded=loaded)[0]
+            if not update_page(page, new_pages[page], edit=edit):
+                problems.append(f"{page}: el renderizado desde templates/ no reproduce la reescritura")
+    elif totals["changed"]:
+        problems.append(f"{totals['changed']} etiquetas <script> pendientes de reescribir")
+
+    saved = totals["before"] - totals["after"]
+    print(f"\n📊 Ahorro total: {saved / 1024:.1f} KB de JavaScript y {totals['connections']} conexiones a CDN"
+          f" (suma de una carga en frío de cada página)")
+    if totals["unknown"]:
+        print(f"   {totals['unknown']} scripts remotos sin tamaño conocido no cuentan en el ahorro (use --remote)")
+
+    if problems:
+        print("\n❌ PROBLEMAS:")
+        for problem in problems:
+            print(f"  • {problem}")
+        print("🔧 Tras editar cache_policy.py ejecute: python generate_headers.py")
+        sys.exit(1)
+    print("🎉 jQuery y Bootstrap se sirven desde vendor/")
+
+
+if __name__ == "__main__":
+    main()
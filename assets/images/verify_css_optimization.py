@@ -8,6 +8,8 @@ import os
 import re
 import glob
 
+from build_profiler import stage
+
 def check_bootstrap_optimization():
     """Verifica la optimización de Bootstrap en todos los archivos HTML"""
     print("🎯 VERIFICACIÓN CSS RENDER-BLOCKING OPTIMIZATION")
@@ -21,15 +23,17 @@ def check_bootstrap_optimization():
     for file_path in html_files:
         file_name = os.path.basename(file_path)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Verificar si tiene preload de Bootstrap
-        has_preload = 'rel="preload"' in content and 'bootstrap' in content and 'as="style"' in content
-        # Verificar si tiene noscript fallback
-        has_noscript = '<noscript>' in content and 'bootstrap' in content
-        # Verificar si tiene render-blocking tradicional
-        has_blocking = re.search(r'<link[^>]+href[^>]*bootstrap[^>]*rel="stylesheet"', content)
+        with stage("scan", "verify", path=file_name) as s:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            s.bytes_in = os.path.getsize(file_path)
+            
+            # Verificar si tiene preload de Bootstrap
+            has_preload = 'rel="preload"' in content and 'bootstrap' in content and 'as="style"' in content
+            # Verificar si tiene noscript fallback
+            has_noscript = '<noscript>' in content and 'bootstrap' in content
+            # Verificar si tiene render-blocking tradicional
+            has_blocking = re.search(r'<link[^>]+href[^>]*bootstrap[^>]*rel="stylesheet"', content)
         
         print(f"\n📄 {file_name}:")
         
@@ -58,12 +62,14 @@ def check_other_css_blocking():
     for file_path in html_files:
         file_name = os.path.basename(file_path)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Buscar todos los links CSS
-        css_links = re.findall(r'<link[^>]*rel="stylesheet"[^>]*>', content)
-        preload_links = re.findall(r'<link[^>]*rel="preload"[^>]*as="style"[^>]*>', content)
+        with stage("scan", "verify", path=file_name) as s:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            s.bytes_in = os.path.getsize(file_path)
+            
+            # Buscar todos los links CSS
+            css_links = re.findall(r'<link[^>]*rel="stylesheet"[^>]*>', content)
+            preload_links = re.findall(r'<link[^>]*rel="preload"[^>]*as="style"[^>]*>', content)
         
         print(f"\n📄 {file_name}:")
         print(f"  🔗 CSS tradicional (render-blocking): {len(css_links)}")
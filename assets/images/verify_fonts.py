@@ -8,6 +8,8 @@ import os
 import re
 import glob
 
+from build_profiler import stage
+
 def find_font_declarations():
     """Busca todas las declaraciones @font-face en los archivos CSS"""
     print("🔤 VERIFICACIÓN DE OPTIMIZACIONES DE FUENTES")
@@ -24,11 +26,13 @@ def find_font_declarations():
     
     for css_file in css_files:
         if os.path.exists(css_file):
-            with open(css_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Buscar declaraciones @font-face
-            font_faces = re.finditer(r'@font-face\s*\{([^}]*)\}', content, re.DOTALL)
+            with stage("scan", "verify", path=css_file) as s:
+                with open(css_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                s.bytes_in = os.path.getsize(css_file)
+                
+                # Buscar declaraciones @font-face
+                font_faces = list(re.finditer(r'@font-face\s*\{([^}]*)\}', content, re.DOTALL))
             
             for match in font_faces:
                 declaration = match.group(1)
@@ -60,11 +64,13 @@ def analyze_google_fonts():
     google_fonts = {}
     
     for html_file in html_files:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Buscar enlaces a Google Fonts
-        google_font_links = re.finditer(r'<link[^>]*fonts\.googleapis\.com[^>]*>', content)
+        with stage("scan", "verify", path=html_file) as s:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            s.bytes_in = os.path.getsize(html_file)
+            
+            # Buscar enlaces a Google Fonts
+            google_font_links = list(re.finditer(r'<link[^>]*fonts\.googleapis\.com[^>]*>', content))
         
         for match in google_font_links:
             link = match.group(0)
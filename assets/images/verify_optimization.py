@@ -7,6 +7,8 @@ Confirma que las optimizaciones de imágenes están implementadas correctamente
 import os
 import glob
 
+from build_profiler import stage
+
 def check_webp_files():
     """Verifica que los archivos WebP optimizados existen"""
     print("🔍 VERIFICACIÓN DE ARCHIVOS WebP OPTIMIZADOS")
@@ -29,8 +31,9 @@ def check_css_references():
     css_file = "../../css/templatemo-finance-business.css"
     
     if os.path.exists(css_file):
-        with open(css_file, 'r', encoding='utf-8') as f:
+        with stage("scan", "verify", path=css_file) as s, open(css_file, 'r', encoding='utf-8') as f:
             content = f.read()
+            s.bytes_in = os.path.getsize(css_file)
             
         webp_refs = ["slide_01.webp", "slide_02.webp", "slide_03.webp"]
         
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Modo watch con reconstrucción incremental
+Vigila el árbol del sitio (inotify en Linux, sondeo como alternativa) y, a
+partir del grafo de dependencias, reconstruye solo lo afectado por cada
+lote de cambios: WebP derivados, .min.js, páginas HTML (las generadas se
+renderizan de nuevo desde templates/ si cambia una plantilla o un recurso
+que usan) y `_headers`/.htaccess/sw.js si cambian las páginas, sus recursos
+críticos, el conjunto de archivos o la política
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+import importlib
+
+import cache_policy
+import early_hints
+import service_worker
+import generate_headers
+from site_refs import ROOT_DIR, iter_site_files, load_gitignore_patterns, is_ignored, read_text, write_text
+from dependency_graph import SITE_OUTPUTS, build_graph, extract_refs, derived_output, link_site_outputs
+from generate_headers import sync_security_meta
+from render_pages import (PAGE_TRANSFORMS, Renderer, TemplateError, site_variables, pages_affected,
+                          list_template_pages, render_all)
+
+POLICY_FILE = "assets/images/cache_policy.py"
+TEMPLATES_PREFIX = "templates/"
+
+# Transformaciones de las páginas sin plantilla, que se editan en su sitio
+# (contenido, página → contenido); las generadas desde templates/ se renderizan
+PAGE_BUILDERS = [("security-meta", lambda html, page: sync_security_meta(html))] + PAGE_TRANSFORMS
+
+
+def reload_policy():
+    """
+    Vuelve a cargar cache_policy.py y los módulos que copian sus valores al
+    importarse; reload() reutiliza el espacio de nombres de cada módulo, así
+    que las funciones ya importadas en otros módulos ven la política nueva
+    """
+    for module in (cache_policy, early_hints, service_worker, generate_headers):
+        importlib.reload(module)
+
+
+class PollingWatcher:
+    """Detecta cambios comparando instantáneas de (mtime, tamaño)"""
+
+    name = "polling"
+
+    def __init__(self, root, interval=0.25):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        # Las plantillas no se publican, pero sus cambios regeneran páginas
+        for rel_path in iter_site_files(self.root, skip_dirs=("dist",)):
+            try:
+                stat = os.stat(os.path.join(self.root, rel_path))
+            except FileNotFoundError:
+                continue
+            snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = {p for p in current.keys() | self.snapshot.keys()
+                   if current.get(p) != self.snapshot.get(p)}
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Vigilancia recursiva con inotify (Linux) vía ctypes, sin dependencias externas"""
+
+    name = "inotify"
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify no disponible en esta plataforma")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.ignored = load_gitignore_patterns(root)
+        self.watches = {}
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if self._watchable(os.path.join(dirpath, d))]
+            self._add_watch(dirpath)
+
+    def _watchable(self, full_path):
+        rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        name = os.path.basename(full_path)
+        return not (name.startswith(".") or name == "__pycache__" or rel_path == "dist"
+                    or is_ignored(rel_path, self.ignored))
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def poll(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    break
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", errors="replace")
+                offset += length
+                directory = self.watches.get(wd)
+                if directory is None or not name:
+                    continue
+                full_path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO) and self._watchable(full_path):
+                        self._add_watch(full_path)
+                    continue
+                if name.startswith("."):
+                    continue
+                changed.add(os.path.relpath(full_path, self.root).replace(os.sep, "/"))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(root, force_polling=False, interval=0.25):
+    """Usa inotify cuando está disponible y sondeo en caso contrario"""
+    if not force_polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+def rebuild_webp(source, output, root):
+    """Regenera el WebP derivado de una imagen con optimize_image()"""
+    try:
+        from optimize_images import optimize_image, IMAGES_TO_OPTIMIZE, DEFAULT_QUALITY
+    except ImportError:
+        print(f"  ⚠️ Pillow no instalado: {output} queda desactualizado")
+        return False
+    qualities = {src: quality for src, _, quality in IMAGES_TO_OPTIMIZE}
+    quality = qualities.get(os.path.basename(source), DEFAULT_QUALITY)
+    optimize_image(os.path.join(root, source), os.path.join(root, output), quality=quality)
+    return True
+
+
+def rebuild_min_js(source, output, root):
+    """Regenera un .min.js (requiere rjsmin; si falta solo se avisa)"""
+    try:
+        import rjsmin
+    except ImportError:
+        print(f"  ⚠️ rjsmin no instalado: {output} queda desactualizado")
+        return False
+    write_text(os.path.join(root, output), rjsmin.jsmin(read_text(os.path.join(root, source))))
+    return True
+
+
+OUTPUT_BUILDERS = {
+    ".webp": rebuild_webp,
+    ".min.js": rebuild_min_js,
+}
+
+
+class IncrementalBuilder:
+    """Mantiene el grafo en memoria y reconstruye solo lo afectado por cada lote"""
+
+    def __init__(self, root=ROOT_DIR):
+        self.root = root
+        self.files = set(iter_site_files(root))
+        self.graph = build_graph(root, sorted(self.files))
+        self.own_writes = {}  # ruta -> (mtime_ns, tamaño) de lo escrito por el propio build
+        self.renderer = Renderer(site_vars=site_variables())
+
+    def _signature(self, rel_path):
+        try:
+            stat = os.stat(os.path.join(self.root, rel_path))
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _record_write(self, rel_path):
+        self.own_writes[rel_path] = self._signature(rel_path)
+
+    def filter_own_writes(self, changed):
+        """Descarta los eventos provocados por las escrituras del propio build"""
+        external = set()
+        for rel_path in changed:
+            if rel_path in self.own_writes and self.own_writes[rel_path] == self._signature(rel_path):
+                continue
+            self.own_writes.pop(rel_path, None)
+            external.add(rel_path)
+        return external
+
+    def build(self, changed):
+        """
+        Reconstruye lo afectado por `changed` (rutas relativas a la raíz)
+
+        Returns:
+            Diccionario con las salidas, páginas y archivos de sitio reconstruidos
+        """
+        started = time.perf_counter()
+        ignored = load_gitignore_patterns(self.root)
+        changed = {p for p in changed if p == POLICY_FILE or not is_ignored(p, ignored)}
+        templates = {p[len(TEMPLATES_PREFIX):] for p in changed if p.startswith(TEMPLATES_PREFIX)}
+        site_changed = {p for p in changed if not p.startswith(TEMPLATES_PREFIX)}
+        existing_now = {p for p in site_changed if os.path.isfile(os.path.join(self.root, p))}
+        added = existing_now - self.files
+        removed = {p for p in site_changed if p in self.files and p not in existing_now}
+        self.files = (self.files | added) - removed
+        report = {"outputs": [], "pages": [], "site": [], "changed": sorted(changed)}
+
+        # 1. Actualizar el grafo para los archivos tocados
+        for rel_path in removed:
+            self.graph.remove_node(rel_path)
+        for rel_path in existing_now:
+            self.graph.set_refs(rel_path, extract_refs(rel_path, self.root))
+            output = derived_output(rel_path, self.files)
+            if output:
+                self.graph.add_output(rel_path, output)
+
+        # 2. Salidas derivadas (WebP, .min.js) de las fuentes modificadas
+        for rel_path in sorted(existing_now):
+            for output in sorted(self.graph.outputs.get(rel_path, ())):
+                builder = next((b for suffix, b in OUTPUT_BUILDERS.items() if output.endswith(suffix)), None)
+                if builder and builder(rel_path, output, self.root):
+                    self._record_write(output)
+                    report["outputs"].append(output)
+
+        # 3. Páginas afectadas: las que dependen de las plantillas modificadas y las
+        # que usan (transitivamente) los archivos cambiados. Las generadas desde
+        # templates/ se renderizan de nuevo; el resto se transforma en su sitio
+        self.renderer.invalidate(templates)
+        affected = set(self.graph.pages_affected(site_changed))
+        templated = set(list_template_pages(self.renderer.templates_dir))
+        written = set()
+        try:
+            if templates:
+                affected |= set(pages_affected(templates, self.renderer))
+            results = render_all(sorted(affected & templated), renderer=self.renderer, root=self.root)
+        except TemplateError as e:
+            print(f"  ❌ Plantillas: {e}")
+            results = {}
+        for page, (current, generated, _) in results.items():
+            if current != generated:
+                written.add(page)
+        for page in sorted(affected - templated):
+            full_path = os.path.join(self.root, page)
+            if not os.path.isfile(full_path):
+                continue
+            content = read_text(full_path)
+            new_content = content
+            for _, transform in PAGE_BUILDERS:
+                new_content = transform(new_content, page)
+            if new_content != content:
+                write_text(full_path, new_content)
+                written.add(page)
+        for page in written:
+            self._record_write(page)
+            self.graph.set_refs(page, extract_refs(page, self.root))
+        report["pages"] = sorted(affected)
+
+        # 4. Archivos de sitio: los Early Hints de _headers y el precache de sw.js
+        # dependen de las páginas y de sus recursos críticos (aristas del grafo);
+        # .htaccess y las meta tags, de la política. Se regeneran en el proceso
+        if POLICY_FILE in changed:
+            reload_policy()
+            self.renderer = Renderer(site_vars=site_variables())
+        link_site_outputs(self.graph, self.root)
+        stale = set(SITE_OUTPUTS) & self.graph.affected(site_changed | written)
+        if added or removed or POLICY_FILE in changed or stale:
+            try:
+                results = generate_headers.generate()
+            except ValueError as e:
+                print(f"  ❌ {e}")
+                results = {}
+            # generate() también reescribe páginas (meta tags de seguridad): se registran
+            # todas sus escrituras para que no disparen otra reconstrucción
+            for rel_path, (current, generated) in results.items():
+                if current != generated:
+                    self._record_write(rel_path)
+                    report["site"].append(rel_path)
+                    if rel_path.endswith(".html"):
+                        self.graph.set_refs(rel_path, extract_refs(rel_path, self.root))
+
+        report["elapsed_ms"] = (time.perf_counter() - started) * 1000
+        return report
+
+
+def print_report(report):
+    """Resume un lote reconstruido en una línea por tipo de salida"""
+    print(f"\n✏️ Cambios: {', '.join(report['changed'])}")
+    if report["outputs"]:
+        print(f"  🖼️ Salidas: {', '.join(report['outputs'])}")
+    if report["pages"]:
+        print(f"  📄 Páginas: {', '.join(report['pages'])}")
+    if report["site"]:
+        print(f"  🛡️ Sitio: {', '.join(report['site'])}")
+    if not (report["outputs"] or report["pages"] or report["site"]):
+        print("  ✓ Nada que reconstruir")
+    print(f"  ⏱️ {report['elapsed_ms']:.0f} ms")
+
+
+def watch(builder, watcher, debounce):
+    """Bucle principal: agrupa eventos durante `debounce` segundos y reconstruye"""
+    pending = set()
+    deadline = None
+    while True:
+        timeout = max(0.0, deadline - time.monotonic()) if deadline else 1.0
+        changes = builder.filter_own_writes(watcher.poll(timeout))
+        if changes:
+            pending |= changes
+            deadline = time.monotonic() + debounce
+        if pending and deadline and time.monotonic() >= deadline:
+            print_report(builder.build(pending))
+            pending = set()
+            deadline = None
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Reconstrucción incremental del sitio en modo watch")
+    parser.add_argument("--once", nargs="+", metavar="RUTA",
+                        help="Reconstruir una sola vez lo afectado por estas rutas (relativas a la raíz) y salir")
+    parser.add_argument("--debounce", type=float, default=0.15, help="Segundos de espera para agrupar eventos")
+    parser.add_argument("--poll", action="store_true", help="Forzar sondeo en lugar de inotify")
+    parser.add_argument("--interval", type=float, default=0.25, help="Intervalo de sondeo en segundos")
+    args = parser.parse_args()
+
+    builder = IncrementalBuilder(ROOT_DIR)
+
+    if args.once:
+        print_report(builder.build(set(args.once)))
+        return
+
+    watcher = create_watcher(ROOT_DIR, force_polling=args.poll, interval=args.interval)
+    print("👀 MODO WATCH")
+    print("=" * 60)
+    print(f"📁 Raíz: {ROOT_DIR}")
+    print(f"🔔 Detector: {watcher.name} | debounce: {args.debounce * 1000:.0f} ms")
+    print(f"🕸️ Grafo: {len(builder.files)} archivos, {sum(len(v) for v in builder.graph.uses.values())} referencias")
+    try:
+        watch(builder, watcher, args.debounce)
+    except KeyboardInterrupt:
+        print("\n⏹️ Watch detenido")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -128,7 +128,47 @@ jQuery( document ).ready(function( $ ) {
         });
     }
 
-    $(".Modern-Slider").slick({
+    // Carga diferida de las diapositivas 2-3: su fondo viene en data-bg y se
+    // solicita en tiempo ocioso antes de que roten (la 1 es la imagen LCP)
+    var $modernSlider = $(".Modern-Slider");
+
+    function loadSlideBackground(slick, index) {
+        slick.$slides.eq(index).find(".img-fill[data-bg]").each(function() {
+            var src = $(this).attr("data-bg");
+            // Incluye los clones que slick crea para el modo infinito
+            $modernSlider.find('.img-fill[data-bg="' + src + '"]')
+                .css("background-image", 'url("' + src + '")')
+                .removeAttr("data-bg");
+        });
+    }
+
+    function whenIdle(callback) {
+        var schedule = function() {
+            if ("requestIdleCallback" in window) {
+                window.requestIdleCallback(callback, { timeout: 2000 });
+            } else {
+                setTimeout(callback, 200);
+            }
+        };
+        // No competir con la imagen LCP: esperar al evento load
+        if (document.readyState === "complete") {
+            schedule();
+        } else {
+            $(window).one("load", schedule);
+        }
+    }
+
+    $modernSlider.on("init afterChange", function(event, slick) {
+        whenIdle(function() {
+            loadSlideBackground(slick, (slick.currentSlide + 1) % slick.slideCount);
+        });
+    });
+
+    $modernSlider.on("beforeChange", function(event, slick, currentSlide, nextSlide) {
+        loadSlideBackground(slick, nextSlide);
+    });
+
+    $modernSlider.slick({
         autoplay:true,
         autoplaySpeed:10000,
         speed:600,
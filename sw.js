@@ -1,75 +1,218 @@
-const CACHE_NAME = 'josetraderx-cache-v1';
-const urlsToCache = [
-  '/',
-  '/index.html',
-  '/about.html',
-  '/contact.html',
-  '/one-page.html',
-  '/portfolio.html',
-  '/services.html',
-  '/trading-strategies.html',
-  '/vendor/bootstrap/css/bootstrap.min.css',
-  '/assets/css/fontawesome.css',
-  '/assets/css/owl.css',
-  '/assets/css/templatemo-finance-business.css',
-  '/assets/css/custom-styles.css',
-  '/vendor/jquery/jquery.min.js',
-  '/vendor/bootstrap/js/bootstrap.bundle.min.js',
-  '/assets/js/custom.js',
-  '/assets/js/owl.js',
-  '/assets/js/slick.js',
-  '/assets/js/accordions.js',
-  '/assets/js/jquery.singlePageNav.min.js',
-  '/assets/images/page-heading-bg.webp',
-  '/assets/images/slide_01.webp',
-  '/assets/images/slide_02.webp',
-  '/assets/images/slide_03.webp',
-  '/assets/images/service_01.webp',
-  '/assets/images/service_02.webp',
-  '/assets/images/service_03.webp',
-  '/assets/images/about-image.webp',
-  '/assets/images/more-info.webp',
-  '/assets/images/client-01.png',
-  '/assets/images/client-02.png',
-  '/assets/images/client-03.png',
-  '/assets/images/client-04.png',
-  '/assets/fonts/fontawesome-webfont.woff2?v=4.7.0',
-  '/assets/fonts/Flaticon.woff'
+// Generado por assets/images/generate_headers.py desde cache_policy.py - no editar a mano
+// Estrategias por ruta: SERVICE_WORKER_ROUTES en assets/images/cache_policy.py
+
+const CACHE_PREFIX = 'josetraderx';
+const ROUTES = [
+  {
+    "name": "pages",
+    "pattern": "(?:/|\\.html)$",
+    "navigate": true,
+    "strategy": "network-first",
+    "timeout_ms": 3000,
+    "max_entries": null,
+    "max_bytes": null,
+    "version": "f2293529c7"
+  },
+  {
+    "name": "images",
+    "pattern": "\\.(?:png|jpe?g|gif|webp|svg|ico)$",
+    "navigate": false,
+    "strategy": "cache-first",
+    "timeout_ms": null,
+    "max_entries": 60,
+    "max_bytes": 8388608,
+    "version": "69b35fc46e"
+  },
+  {
+    "name": "static",
+    "pattern": "\\.(?:css|js|woff2?|ttf|otf|eot)$",
+    "navigate": false,
+    "strategy": "stale-while-revalidate",
+    "timeout_ms": null,
+    "max_entries": null,
+    "max_bytes": null,
+    "version": "6af9201bcd"
+  }
 ];
+const PRECACHE = {
+  "pages": [
+    "/",
+    "/about.html",
+    "/contact.html",
+    "/index.html",
+    "/one-page.html",
+    "/portfolio.html",
+    "/services.html",
+    "/trading-strategies.html"
+  ],
+  "images": [
+    "/assets/images/page-heading-bg.jpg",
+    "/assets/images/slide_01.webp"
+  ],
+  "static": [
+    "/assets/css/fontawesome.css",
+    "/assets/css/templatemo-finance-business.css",
+    "/assets/css/owl.css",
+    "/assets/css/custom-nav.css",
+    "/assets/css/custom-styles.css",
+    "/assets/fonts/fontawesome-webfont.woff2?v=4.3.0",
+    "/assets/js/custom.min.js",
+    "/vendor/bootstrap/css/bootstrap.min.css",
+    "/assets/js/custom.js"
+  ]
+};
+const SIZE_HEADER = 'x-sw-size';
+
+for (const route of ROUTES) {
+  route.regexp = new RegExp(route.pattern);
+}
+
+function routeFor(request, url) {
+  return ROUTES.find(route =>
+    (route.navigate && request.mode === 'navigate') || route.regexp.test(url.pathname)) || null;
+}
+
+function cacheName(route) {
+  return `${CACHE_PREFIX}-${route.name}-${route.version}`;
+}
+
+// Guarda una copia con su tamaño en bytes (necesario para el límite LRU)
+async function putEntry(cache, request, response) {
+  const body = await response.blob();
+  const headers = new Headers(response.headers);
+  headers.set(SIZE_HEADER, String(body.size));
+  await cache.put(request, new Response(body, {
+    status: response.status,
+    statusText: response.statusText,
+    headers
+  }));
+}
+
+// Expulsa las entradas menos usadas: cache.keys() respeta el orden de inserción
+// y cada acierto se vuelve a insertar al final
+async function trimCache(route) {
+  if (!route.max_entries && !route.max_bytes) {
+    return;
+  }
+  const cache = await caches.open(cacheName(route));
+  const keys = await cache.keys();
+  const sizes = await Promise.all(keys.map(async key => {
+    const response = await cache.match(key);
+    return Number(response && response.headers.get(SIZE_HEADER)) || 0;
+  }));
+  let entries = keys.length;
+  let bytes = sizes.reduce((total, size) => total + size, 0);
+  for (let i = 0; i < keys.length; i++) {
+    if ((!route.max_entries || entries <= route.max_entries) && (!route.max_bytes || bytes <= route.max_bytes)) {
+      break;
+    }
+    await cache.delete(keys[i]);
+    entries -= 1;
+    bytes -= sizes[i];
+  }
+}
+
+async function cacheResponse(route, request, response) {
+  if (!response || !response.ok || response.type !== 'basic') {
+    return;
+  }
+  const cache = await caches.open(cacheName(route));
+  await putEntry(cache, request, response);
+  await trimCache(route);
+}
+
+function networkFirst(event, route) {
+  const request = event.request;
+  const network = Promise.resolve(event.preloadResponse)
+    .then(preloaded => preloaded || fetch(request));
+  // La copia se guarda aunque la respuesta llegue después del tiempo límite
+  event.waitUntil(network
+    .then(response => cacheResponse(route, request, response.clone()))
+    .catch(() => undefined));
+  const cached = caches.open(cacheName(route)).then(cache => cache.match(request));
+
+  // La copia en caché solo se usa si la red no responde a tiempo o falla
+  const timeout = new Promise(resolve => setTimeout(resolve, route.timeout_ms));
+  const fallback = timeout.then(() => cached).then(response => response || network);
+  return Promise.race([network, fallback])
+    .catch(() => cached.then(response => response || Response.error()));
+}
+
+async function cacheFirst(event, route) {
+  const request = event.request;
+  const cache = await caches.open(cacheName(route));
+  const cached = await cache.match(request);
+  if (cached) {
+    // Acierto: se reinserta para marcarlo como usado recientemente. La copia se
+    // toma antes de devolver la respuesta, cuyo cuerpo empieza a leerse enseguida
+    const copy = cached.clone();
+    event.waitUntil(cache.delete(request).then(() => cache.put(request, copy)));
+    return cached;
+  }
+  const response = await fetch(request);
+  event.waitUntil(cacheResponse(route, request, response.clone()));
+  return response;
+}
+
+async function staleWhileRevalidate(event, route) {
+  const request = event.request;
+  const cache = await caches.open(cacheName(route));
+  const cached = await cache.match(request);
+  const network = fetch(request).then(response => {
+    return cacheResponse(route, request, response.clone()).then(() => response);
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  return network;
+}
+
+const HANDLERS = {
+  'network-first': networkFirst,
+  'cache-first': cacheFirst,
+  'stale-while-revalidate': staleWhileRevalidate
+};
 
 self.addEventListener('install', event => {
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => {
-        console.log('Opened cache');
-        return cache.addAll(urlsToCache);
-      })
-  );
+  event.waitUntil(Promise.all(ROUTES.map(async route => {
+    const cache = await caches.open(cacheName(route));
+    await Promise.all((PRECACHE[route.name] || []).map(async url => {
+      const request = new Request(url, { cache: 'reload' });
+      const response = await fetch(request);
+      if (!response.ok) {
+        throw new Error(`Precache: ${url} respondió ${response.status}`);
+      }
+      await putEntry(cache, request, response);
+    }));
+  })).then(() => self.skipWaiting()));
 });
 
-self.addEventListener('fetch', event => {
-  event.respondWith(
-    caches.match(event.request)
-      .then(response => {
-        if (response) {
-          return response;
-        }
-        return fetch(event.request);
-      })
-  );
+self.addEventListener('activate', event => {
+  const current = ROUTES.map(cacheName);
+  event.waitUntil((async () => {
+    if (self.registration.navigationPreload) {
+      await self.registration.navigationPreload.enable();
+    }
+    const names = await caches.keys();
+    await Promise.all(names
+      .filter(name => name.startsWith(`${CACHE_PREFIX}-`) && !current.includes(name))
+      .map(name => caches.delete(name)));
+    await self.clients.claim();
+  })());
 });
 
-self.addEventListener('activate', event => {
-  const cacheWhitelist = [CACHE_NAME];
-  event.waitUntil(
-    caches.keys().then(cacheNames => {
-      return Promise.all(
-        cacheNames.map(cacheName => {
-          if (cacheWhitelist.indexOf(cacheName) === -1) {
-            return caches.delete(cacheName);
-          }
-        })
-      );
-    })
-  );
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') {
+    return;
+  }
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+  const route = routeFor(request, url);
+  if (route) {
+    event.respondWith(HANDLERS[route.strategy](event, route));
+  }
 });